@@ -8,7 +8,7 @@
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import TestExecution, TestResult
+from .models import CaseSnapshot, TestExecution, TestResult
 
 
 @admin.register(TestExecution)
@@ -39,10 +39,29 @@ class TestResultAdmin(admin.ModelAdmin):
     list_display = ('id', 'execution', 'case', 'status', 'executor', 'execution_time', 'created_at')
     list_filter = ('status', 'executor', 'execution_time')
     search_fields = ('case__name', 'executor__username', 'actual_result')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('snapshot', 'created_at', 'updated_at')
     fieldsets = (
-        (None, {'fields': ('execution', 'case', 'status', 'executor')}),
+        (None, {'fields': ('execution', 'case', 'snapshot', 'status', 'executor')}),
         (_('结果信息'), {'fields': ('actual_result', 'remarks')}),
         (_('时间信息'), {'fields': ('execution_time', 'created_at', 'updated_at')}),
     )
-    date_hierarchy = 'execution_time' 
\ No newline at end of file
+    date_hierarchy = 'execution_time'
+
+
+@admin.register(CaseSnapshot)
+class CaseSnapshotAdmin(admin.ModelAdmin):
+    """
+    用例快照管理员配置
+    
+    快照创建后不再修改，管理界面中只读显示
+    """
+    list_display = ('id', 'name', 'priority', 'snapshot_hash', 'created_at')
+    list_filter = ('priority',)
+    search_fields = ('name', 'snapshot_hash')
+    readonly_fields = ('snapshot_hash', 'name', 'priority', 'expected_results', 'steps_hash', 'created_at')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -16,4 +16,16 @@ class ExecutionsConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.executions'
-    verbose_name = _('测试执行管理') 
\ No newline at end of file
+    verbose_name = _('测试执行管理')
+
+    def ready(self):
+        """
+        注册查询计划检查和信号处理函数，登记列表计数会被缓存的模型
+        """
+        from utils.pagination import track_table_versions
+        from . import checks, signals  # noqa: F401
+        from .models import TestExecution, TestResult
+
+        track_table_versions(TestExecution)
+        # 测试结果多随测试执行或测试用例级联删除，由删除路径递增表版本号
+        track_table_versions(TestResult, deletes=False)
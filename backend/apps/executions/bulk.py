@@ -0,0 +1,319 @@
+"""
+测试结果批量操作模块
+
+创建测试执行时为计划中的每个用例生成一条待执行的测试结果，并引用创建时的用例快照:
+- 用例数不超过阈值时在请求中按批bulk_create
+- 用例数较多时由后台任务按用例ID分批bulk_create，并记录创建进度
+
+批量更新测试结果时按批读取和写入，查询次数和锁定时间只与批数有关；
+按条件批量更新时用一条UPDATE语句完成
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import logging
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.testplans.models import TestPlanCase
+from utils.pagination import bump_table_version
+from .events import EVENT_BULK_UPDATE, EVENT_STATUS, publish_event, publish_result_changes
+from .models import TestExecution, TestResult
+from .snapshots import freeze_case_snapshots
+from .stats import reconcile_counters, record_status_changes, repair_counters
+
+logger = logging.getLogger(__name__)
+
+
+# 默认的后台创建阈值和每批创建的行数，可通过settings.EXECUTION_RESULTS_ASYNC_THRESHOLD和
+# settings.EXECUTION_RESULTS_BATCH_SIZE配置
+DEFAULT_RESULTS_ASYNC_THRESHOLD = 5000
+DEFAULT_RESULTS_BATCH_SIZE = 2000
+
+# 批量更新时每批处理的测试结果数
+BATCH_UPDATE_CHUNK_SIZE = 500
+
+# 批量更新允许修改的字段
+BATCH_UPDATE_FIELDS = ('status', 'remarks', 'actual_result')
+
+
+def get_plan_cases(plan_id):
+    """
+    获取计划中的用例，按执行顺序排列
+
+    Args:
+        plan_id: 测试计划ID
+
+    Returns:
+        QuerySet: 测试计划-用例关联查询集
+    """
+    return TestPlanCase.objects.filter(plan_id=plan_id).order_by('order', 'id')
+
+
+def create_results(execution_id, case_ids):
+    """
+    为一批用例生成快照并创建测试结果，已存在的结果会被跳过
+
+    Args:
+        execution_id: 测试执行ID
+        case_ids (list): 用例ID列表
+    """
+    snapshot_ids = freeze_case_snapshots(case_ids)
+    TestResult.objects.bulk_create(
+        [
+            TestResult(execution_id=execution_id, case_id=case_id, snapshot_id=snapshot_ids.get(case_id), status='pending')
+            for case_id in case_ids
+        ],
+        ignore_conflicts=True
+    )
+
+
+def insert_results(execution):
+    """
+    为计划中的全部用例创建测试结果，调用方负责把新结果计入测试执行的待执行计数
+
+    Args:
+        execution: 测试执行对象
+
+    Returns:
+        int: 创建的测试结果数
+    """
+    batch_size = getattr(settings, 'EXECUTION_RESULTS_BATCH_SIZE', DEFAULT_RESULTS_BATCH_SIZE)
+    case_ids = list(get_plan_cases(execution.plan_id).values_list('case_id', flat=True))
+    for start in range(0, len(case_ids), batch_size):
+        create_results(execution.id, case_ids[start:start + batch_size])
+    bump_table_version(TestResult)
+    return len(case_ids)
+
+
+def create_results_in_batches(execution, batch_size=None):
+    """
+    按用例ID分批为计划中的用例创建测试结果
+
+    每批读取用例内容生成快照后写入；已存在的结果会被跳过，任务重试时可从中断处继续。
+    每批写入后更新执行的已创建结果数，全部写入后重新统计各状态的结果数
+
+    Args:
+        execution: 测试执行对象
+        batch_size (int): 每批创建的行数
+
+    Returns:
+        int: 计划中的用例数
+    """
+    batch_size = batch_size or getattr(settings, 'EXECUTION_RESULTS_BATCH_SIZE', DEFAULT_RESULTS_BATCH_SIZE)
+    case_ids = list(get_plan_cases(execution.plan_id).values_list('case_id', flat=True))
+    TestExecution.objects.filter(id=execution.id).update(results_total=len(case_ids))
+
+    for start in range(0, len(case_ids), batch_size):
+        batch = case_ids[start:start + batch_size]
+        with transaction.atomic():
+            create_results(execution.id, batch)
+            TestExecution.objects.filter(id=execution.id).update(
+                results_created=start + len(batch), updated_at=timezone.now()
+            )
+            publish_event(execution.id, EVENT_STATUS, {
+                'results_status': 'creating', 'results_total': len(case_ids), 'results_created': start + len(batch)
+            })
+
+    reconcile_counters([execution.id])
+    bump_table_version(TestResult)
+    return len(case_ids)
+
+
+def initialize_results(execution):
+    """
+    为新建的测试执行创建测试结果
+
+    用例数不超过settings.EXECUTION_RESULTS_ASYNC_THRESHOLD时同步创建；
+    否则把执行标记为创建中，事务提交后交给后台任务分批创建
+
+    Args:
+        execution: 测试执行对象
+
+    Returns:
+        bool: 是否已交给后台任务
+    """
+    from .tasks import create_execution_results
+
+    total = get_plan_cases(execution.plan_id).count()
+    threshold = getattr(settings, 'EXECUTION_RESULTS_ASYNC_THRESHOLD', DEFAULT_RESULTS_ASYNC_THRESHOLD)
+
+    if total > threshold:
+        execution.results_status = 'creating'
+        execution.results_total = total
+        execution.results_created = 0
+        execution.save(update_fields=['results_status', 'results_total', 'results_created', 'updated_at'])
+        transaction.on_commit(lambda: create_execution_results.delay(execution.id))
+        return True
+
+    created = insert_results(execution)
+    execution.results_status = 'ready'
+    execution.results_total = total
+    execution.results_created = created
+    execution.pending_count = created
+    execution.save(update_fields=['results_status', 'results_total', 'results_created', 'pending_count', 'updated_at'])
+    logger.info(f"已创建测试结果: execution_id={execution.id}, count={created}")
+    return False
+
+
+def validate_batch_items(items):
+    """
+    校验批量更新的数据项
+
+    Args:
+        items (list): 数据项列表，每项包含id以及status、remarks、actual_result中的若干字段
+
+    Returns:
+        tuple: (以测试结果ID为键、以待修改字段为值的字典, 错误列表)
+    """
+    valid_statuses = {key for key, _ in TestResult.STATUS_CHOICES}
+    changes = {}
+    errors = []
+
+    for item in items:
+        if not isinstance(item, dict):
+            errors.append({'id': None, 'message': '数据项格式不正确'})
+            continue
+
+        result_id = item.get('id')
+        try:
+            result_id = int(result_id)
+        except (TypeError, ValueError):
+            errors.append({'id': result_id, 'message': '测试结果ID无效'})
+            continue
+
+        if result_id in changes:
+            errors.append({'id': result_id, 'message': '测试结果ID重复'})
+            continue
+
+        if 'status' in item and item['status'] not in valid_statuses:
+            errors.append({'id': result_id, 'message': f"无效的结果状态: {item['status']}"})
+            continue
+
+        changes[result_id] = {field: item[field] for field in BATCH_UPDATE_FIELDS if field in item}
+
+    return changes, errors
+
+
+def batch_update_results(items, user, chunk_size=BATCH_UPDATE_CHUNK_SIZE):
+    """
+    批量更新测试结果
+
+    每批用一次id__in查询锁定并读取目标行，用一条bulk_update只写入被修改的字段，
+    并在同一事务中更新所属测试执行的计数
+
+    Args:
+        items (list): 数据项列表
+        user: 执行者
+        chunk_size (int): 每批处理的测试结果数
+
+    Returns:
+        tuple: (更新的测试结果数, 错误列表)
+    """
+    changes, errors = validate_batch_items(items)
+    # 按ID顺序分批并加锁，并发的批量更新以相同顺序获取行锁，不会互相死锁
+    result_ids = sorted(changes)
+    updated_count = 0
+
+    for start in range(0, len(result_ids), chunk_size):
+        chunk = result_ids[start:start + chunk_size]
+        now = timezone.now()
+        with transaction.atomic():
+            results = {
+                result.id: result
+                for result in TestResult.objects.select_for_update()
+                .filter(id__in=chunk)
+                .order_by('id')
+                .only('id', 'execution_id', *BATCH_UPDATE_FIELDS)
+            }
+
+            fields = {'execution_time', 'executor', 'updated_at'}
+            status_changes = []
+            events = defaultdict(list)
+            for result_id in chunk:
+                result = results.get(result_id)
+                if result is None:
+                    errors.append({'id': result_id, 'message': '测试结果不存在'})
+                    continue
+
+                old_status = result.status
+                for field, value in changes[result_id].items():
+                    setattr(result, field, value)
+                    fields.add(field)
+                result.execution_time = now
+                result.executor = user
+                result.updated_at = now
+                status_changes.append((result.execution_id, old_status, result.status))
+                events[result.execution_id].append(
+                    {'id': result.id, 'status': result.status, 'previous_status': old_status}
+                )
+
+            updated = [results[result_id] for result_id in chunk if result_id in results]
+            if updated:
+                TestResult.objects.bulk_update(updated, sorted(fields))
+                record_status_changes(status_changes)
+                for execution_id, execution_events in events.items():
+                    publish_result_changes(execution_id, execution_events)
+                updated_count += len(updated)
+
+    if updated_count:
+        bump_table_version(TestResult)
+    return updated_count, errors
+
+
+def filter_results(execution, status=None, priority=None, case_name=None):
+    """
+    按条件筛选测试执行下的测试结果
+
+    用例条件匹配创建执行时的用例快照，与结果列表展示的内容一致
+
+    Args:
+        execution: 测试执行对象
+        status (str): 当前结果状态
+        priority (str): 用例快照中的优先级
+        case_name (str): 用例快照中的名称关键字
+
+    Returns:
+        QuerySet: 测试结果查询集
+    """
+    queryset = TestResult.objects.filter(execution=execution)
+    if status:
+        queryset = queryset.filter(status=status)
+    if priority:
+        queryset = queryset.filter(snapshot__priority=priority)
+    if case_name:
+        queryset = queryset.filter(snapshot__name__icontains=case_name)
+    return queryset
+
+
+def update_results_by_filter(filters, status, user, **values):
+    """
+    按条件批量更新测试结果的状态
+
+    用一条UPDATE语句修改全部匹配的结果，再在同一事务中重新统计测试执行的计数
+
+    Args:
+        filters (dict): 过滤条件，必须包含execution
+        status (str): 更新后的结果状态
+        user: 执行者
+        values: 其他需要修改的字段，如remarks
+
+    Returns:
+        int: 更新的测试结果数
+    """
+    execution = filters['execution']
+    now = timezone.now()
+    with transaction.atomic():
+        updated_count = filter_results(**filters).update(
+            status=status, executor=user, execution_time=now, updated_at=now, **values
+        )
+        if updated_count:
+            repair_counters(execution.id)
+            publish_event(execution.id, EVENT_BULK_UPDATE, {'status': status, 'count': updated_count})
+
+    if updated_count:
+        bump_table_version(TestResult)
+    return updated_count
@@ -0,0 +1,44 @@
+"""
+测试执行查询计划检查
+
+检查执行列表、结果统计和用例历史等热点查询能否使用索引，
+执行manage.py check --database default时运行
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.core import checks
+from utils.query_plan import check_query_plans
+
+
+def hot_queries():
+    """
+    测试执行的热点查询
+
+    Returns:
+        list: (名称, 查询集)元组列表
+    """
+    from .models import TestExecution, TestResult
+
+    return [
+        ('按计划和状态过滤的执行列表',
+         TestExecution.objects.filter(plan_id=1, status='running').order_by('-created_at')),
+        ('按状态过滤的执行列表',
+         TestExecution.objects.filter(status='running').order_by('-created_at')),
+        ('按执行和状态统计结果',
+         TestResult.objects.filter(execution_id=1, status='passed')),
+        ('用例的历史执行结果',
+         TestResult.objects.filter(case_id=1).order_by('-execution_time')),
+        ('结果列表键集分页',
+         TestResult.objects.order_by('-updated_at', '-id')),
+    ]
+
+
+@checks.register(checks.Tags.database)
+def check_execution_query_plans(app_configs=None, databases=None, **kwargs):
+    """
+    检查测试执行热点查询的执行计划
+    """
+    return check_query_plans(hot_queries, 'executions.E001', databases)
@@ -0,0 +1,359 @@
+"""
+测试执行事件推送模块
+
+测试结果变化和执行进度以事件的形式发布到按测试执行划分的频道，
+由Server-Sent Events接口推送给订阅的客户端，客户端只接收增量:
+- LocalBroker: 进程内的内存发布订阅，用于开发、单进程部署和测试
+- RedisBroker: Redis发布订阅，多进程或多机部署时在各进程间分发事件
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import json
+import queue
+import time
+import logging
+import threading
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from rest_framework.renderers import BaseRenderer
+
+logger = logging.getLogger(__name__)
+
+
+# 默认的消息代理，可通过settings.EXECUTION_EVENTS_BROKER配置为local或redis
+DEFAULT_EVENTS_BROKER = 'local'
+
+# 每个订阅者最多缓存的事件数，消费过慢时丢弃最旧的事件
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# 事件类型
+EVENT_RESULTS = 'results'
+EVENT_PROGRESS = 'progress'
+EVENT_STATUS = 'status'
+EVENT_BULK_UPDATE = 'bulk_update'
+
+
+def get_channel(execution_id):
+    """
+    获取测试执行的事件频道名称
+
+    Args:
+        execution_id: 测试执行ID
+
+    Returns:
+        str: 频道名称
+    """
+    return f'execution_events:{execution_id}'
+
+
+class Subscription:
+    """
+    事件订阅
+
+    get()等待下一条事件，close()取消订阅
+    """
+
+    def get(self, timeout=None):
+        """
+        获取下一条事件
+
+        Args:
+            timeout (float): 最长等待秒数
+
+        Returns:
+            dict: 事件，超时返回None
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        取消订阅
+        """
+        raise NotImplementedError
+
+
+class LocalSubscription(Subscription):
+    """
+    进程内订阅
+    """
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, event):
+        """
+        投递事件，队列已满时丢弃最旧的事件
+
+        Args:
+            event (dict): 事件
+        """
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    进程内的内存消息代理
+
+    只在同一进程内分发事件
+    """
+    name = 'local'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channel, event):
+        """
+        发布事件
+
+        Args:
+            channel (str): 频道名称
+            event (dict): 事件
+        """
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, channel):
+        """
+        订阅频道
+
+        Args:
+            channel (str): 频道名称
+
+        Returns:
+            Subscription: 订阅对象
+        """
+        subscription = LocalSubscription(self, channel)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        取消订阅
+
+        Args:
+            subscription (LocalSubscription): 订阅对象
+        """
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.channel]
+
+
+class RedisSubscription(Subscription):
+    """
+    Redis频道订阅
+    """
+
+    def __init__(self, client, channel):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout=None):
+        message = self.pubsub.get_message(timeout=timeout or 0)
+        if message is None or message.get('type') != 'message':
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        self.pubsub.close()
+
+
+class RedisBroker:
+    """
+    Redis发布订阅消息代理
+
+    各进程通过同一个Redis频道交换事件，订阅者各自持有一个连接
+    """
+    name = 'redis'
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, event):
+        self.client.publish(channel, json.dumps(event, cls=DjangoJSONEncoder))
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.client, channel)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    SSE渲染器
+
+    事件流由StreamingHttpResponse直接输出，这里只用于内容协商，
+    使Accept: text/event-stream的请求不被拒绝；错误响应按JSON文本输出
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode(self.charset)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    获取消息代理
+
+    Returns:
+        LocalBroker|RedisBroker: 根据settings.EXECUTION_EVENTS_BROKER创建的消息代理，进程内共享
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                name = getattr(settings, 'EXECUTION_EVENTS_BROKER', DEFAULT_EVENTS_BROKER)
+                if name == 'redis':
+                    _broker = RedisBroker(settings.EXECUTION_EVENTS_REDIS_URL)
+                else:
+                    _broker = LocalBroker()
+    return _broker
+
+
+def publish_event(execution_id, event_type, data):
+    """
+    发布测试执行事件
+
+    在事务提交后发布，回滚的修改不会推送给客户端；发布失败只记录日志
+
+    Args:
+        execution_id: 测试执行ID
+        event_type (str): 事件类型
+        data (dict): 事件数据
+    """
+    event = {'type': event_type, 'execution': execution_id, 'data': data}
+
+    def publish():
+        try:
+            get_broker().publish(get_channel(execution_id), event)
+        except Exception as e:
+            logger.error(f"发布测试执行事件失败: execution_id={execution_id}, error={str(e)}")
+
+    transaction.on_commit(publish)
+
+
+def publish_result_changes(execution_id, results):
+    """
+    发布测试结果变化事件
+
+    Args:
+        execution_id: 测试执行ID
+        results (list): 变化的测试结果，每项包含id、status和previous_status
+    """
+    if results:
+        publish_event(execution_id, EVENT_RESULTS, {'results': results})
+
+
+def publish_progress(execution_id, deltas=None, stats=None):
+    """
+    发布执行进度事件
+
+    Args:
+        execution_id: 测试执行ID
+        deltas (dict): 各状态结果数的增量
+        stats (dict): 重新统计后的各状态结果数，替换客户端的统计
+    """
+    data = {}
+    if deltas:
+        data['deltas'] = deltas
+    if stats is not None:
+        data['stats'] = stats
+    if data:
+        publish_event(execution_id, EVENT_PROGRESS, data)
+
+
+def format_sse(event, event_id=None):
+    """
+    把事件格式化为Server-Sent Events消息
+
+    Args:
+        event (dict): 事件
+        event_id (int): 事件序号
+
+    Returns:
+        str: SSE消息文本
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def iter_sse(execution_id, get_snapshot, heartbeat=15, max_duration=300):
+    """
+    生成测试执行的SSE事件流
+
+    先订阅频道再读取当前统计作为快照，订阅之后提交的变化都会作为增量推送，
+    不会在快照和订阅之间丢失；之后只推送增量，空闲时发送注释行保持连接，
+    超过最长时长后结束，由客户端按retry间隔自动重连
+
+    Args:
+        execution_id: 测试执行ID
+        get_snapshot: 返回当前状态和统计的函数，在订阅之后调用
+        heartbeat (int): 心跳间隔秒数
+        max_duration (int): 单个连接的最长秒数
+
+    Yields:
+        str: SSE消息文本
+    """
+    subscription = get_broker().subscribe(get_channel(execution_id))
+    try:
+        snapshot = get_snapshot()
+        # 事件流不再访问数据库，先释放本线程的数据库连接，长连接不占用数据库连接数
+        connections.close_all()
+        deadline = time.monotonic() + max_duration
+        event_id = 0
+
+        yield 'retry: 3000\n\n'
+        yield format_sse({'type': 'snapshot', 'execution': execution_id, 'data': snapshot}, event_id)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = subscription.get(timeout=min(heartbeat, remaining))
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            event_id += 1
+            yield format_sse(event, event_id)
+    finally:
+        subscription.close()
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0002_testexecution_testresult'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['updated_at', 'id'], name='testresult_updated_id_idx'),
+        ),
+    ]
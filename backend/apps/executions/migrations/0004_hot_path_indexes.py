@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0003_testresult_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testexecution',
+            index=models.Index(fields=['plan', 'status', 'created_at'], name='execution_plan_stat_crt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testexecution',
+            index=models.Index(fields=['status', 'created_at'], name='execution_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['execution', 'status'], name='testresult_exec_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testresult',
+            index=models.Index(fields=['case', 'execution_time'], name='testresult_case_time_idx'),
+        ),
+    ]
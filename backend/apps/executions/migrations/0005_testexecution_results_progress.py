@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testexecution',
+            name='results_created',
+            field=models.IntegerField(default=0, verbose_name='已创建结果数'),
+        ),
+        migrations.AddField(
+            model_name='testexecution',
+            name='results_status',
+            field=models.CharField(choices=[('creating', '创建中'), ('ready', '已就绪'), ('failed', '创建失败')], default='ready', max_length=20, verbose_name='结果创建状态'),
+        ),
+        migrations.AddField(
+            model_name='testexecution',
+            name='results_total',
+            field=models.IntegerField(default=0, verbose_name='待创建结果数'),
+        ),
+    ]
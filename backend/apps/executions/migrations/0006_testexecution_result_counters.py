@@ -0,0 +1,54 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_result_counters(apps, schema_editor):
+    """
+    按已有的测试结果统计各测试执行的结果数
+    """
+    TestExecution = apps.get_model('executions', 'TestExecution')
+    TestResult = apps.get_model('executions', 'TestResult')
+    counts = {}
+    rows = TestResult.objects.order_by().values_list('execution_id', 'status').annotate(count=Count('id'))
+    for execution_id, status, count in rows:
+        counts.setdefault(execution_id, {})[f'{status}_count'] = count
+    for execution_id, fields in counts.items():
+        TestExecution.objects.filter(id=execution_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0005_testexecution_results_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testexecution',
+            name='blocked_count',
+            field=models.IntegerField(default=0, verbose_name='阻塞结果数'),
+        ),
+        migrations.AddField(
+            model_name='testexecution',
+            name='failed_count',
+            field=models.IntegerField(default=0, verbose_name='失败结果数'),
+        ),
+        migrations.AddField(
+            model_name='testexecution',
+            name='passed_count',
+            field=models.IntegerField(default=0, verbose_name='通过结果数'),
+        ),
+        migrations.AddField(
+            model_name='testexecution',
+            name='pending_count',
+            field=models.IntegerField(default=0, verbose_name='待执行结果数'),
+        ),
+        migrations.AddField(
+            model_name='testexecution',
+            name='skipped_count',
+            field=models.IntegerField(default=0, verbose_name='跳过结果数'),
+        ),
+        migrations.RunPython(fill_result_counters, migrations.RunPython.noop),
+    ]
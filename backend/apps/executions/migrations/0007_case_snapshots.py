@@ -0,0 +1,75 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:13
+
+import hashlib
+from collections import defaultdict
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_case_snapshots(apps, schema_editor):
+    """
+    为已有的测试结果按用例的当前内容生成快照
+    """
+    TestCase = apps.get_model('testcases', 'TestCase')
+    TestResult = apps.get_model('executions', 'TestResult')
+    CaseSnapshot = apps.get_model('executions', 'CaseSnapshot')
+
+    case_ids = sorted(set(TestResult.objects.order_by().values_list('case_id', flat=True)))
+    for start in range(0, len(case_ids), 1000):
+        rows = TestCase.objects.filter(id__in=case_ids[start:start + 1000]).values_list(
+            'id', 'name', 'priority', 'expected_results', 'steps'
+        )
+        case_hashes = {}
+        snapshots = {}
+        for case_id, name, priority, expected_results, steps in rows:
+            steps_hash = hashlib.sha256((steps or '').encode('utf-8')).hexdigest()
+            parts = [value or '' for value in (name, priority, expected_results, steps_hash)]
+            snapshot_hash = hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+            case_hashes[case_id] = snapshot_hash
+            snapshots[snapshot_hash] = CaseSnapshot(
+                snapshot_hash=snapshot_hash, name=name, priority=priority,
+                expected_results=expected_results or '', steps_hash=steps_hash
+            )
+
+        CaseSnapshot.objects.bulk_create(snapshots.values(), ignore_conflicts=True)
+        snapshot_ids = dict(
+            CaseSnapshot.objects.filter(snapshot_hash__in=list(snapshots)).values_list('snapshot_hash', 'id')
+        )
+        cases_by_snapshot = defaultdict(list)
+        for case_id, snapshot_hash in case_hashes.items():
+            cases_by_snapshot[snapshot_ids[snapshot_hash]].append(case_id)
+        for snapshot_id, snapshot_case_ids in cases_by_snapshot.items():
+            TestResult.objects.filter(case_id__in=snapshot_case_ids, snapshot__isnull=True).update(snapshot_id=snapshot_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('executions', '0006_testexecution_result_counters'),
+        ('testcases', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_hash', models.CharField(max_length=64, unique=True, verbose_name='内容哈希')),
+                ('name', models.CharField(max_length=200, verbose_name='用例名称')),
+                ('priority', models.CharField(choices=[('P0', '最高'), ('P1', '高'), ('P2', '中'), ('P3', '低')], max_length=2, verbose_name='优先级')),
+                ('expected_results', models.TextField(verbose_name='预期结果')),
+                ('steps_hash', models.CharField(max_length=64, verbose_name='测试步骤哈希')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': '用例快照',
+                'verbose_name_plural': '用例快照',
+            },
+        ),
+        migrations.AddField(
+            model_name='testresult',
+            name='snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='results', to='executions.casesnapshot', verbose_name='用例快照'),
+        ),
+        migrations.RunPython(fill_case_snapshots, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@
 最后修改: 2023-06-10
 """
 
+import hashlib
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from apps.users.models import User
@@ -13,6 +14,60 @@ from apps.testplans.models import TestPlan
 from apps.testcases.models import TestCase
 
 
+def compute_steps_hash(steps):
+    """
+    计算测试步骤的哈希
+
+    Args:
+        steps (str): 测试步骤
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    return hashlib.sha256((steps or '').encode('utf-8')).hexdigest()
+
+
+def compute_snapshot_hash(name, priority, expected_results, steps_hash):
+    """
+    计算用例快照的内容哈希
+
+    与用例的content_hash不同，这里不做规范化，只有内容完全相同的用例才共用一份快照
+
+    Args:
+        name (str): 用例名称
+        priority (str): 优先级
+        expected_results (str): 预期结果
+        steps_hash (str): 测试步骤的哈希
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    parts = [value or '' for value in (name, priority, expected_results, steps_hash)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class CaseSnapshot(models.Model):
+    """
+    用例快照模型
+
+    创建测试执行时冻结用例的内容，之后修改用例不影响历史结果的展示；
+    快照按内容哈希去重，内容相同的用例在各次执行中共用同一行，创建后不再修改
+    """
+    snapshot_hash = models.CharField(_('内容哈希'), max_length=64, unique=True)
+    name = models.CharField(_('用例名称'), max_length=200)
+    priority = models.CharField(_('优先级'), max_length=2, choices=TestCase.PRIORITY_CHOICES)
+    expected_results = models.TextField(_('预期结果'))
+    steps_hash = models.CharField(_('测试步骤哈希'), max_length=64)
+    created_at = models.DateTimeField(_('创建时间'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('用例快照')
+        verbose_name_plural = _('用例快照')
+
+    def __str__(self):
+        return self.name
+
+
 class TestExecution(models.Model):
     """
     测试执行模型
@@ -31,6 +86,19 @@ class TestExecution(models.Model):
     status = models.CharField(_('执行状态'), max_length=20, choices=STATUS_CHOICES, default='pending')
     start_time = models.DateTimeField(_('开始时间'), blank=True, null=True)
     end_time = models.DateTimeField(_('结束时间'), blank=True, null=True)
+    RESULTS_STATUS_CHOICES = (
+        ('creating', _('创建中')),
+        ('ready', _('已就绪')),
+        ('failed', _('创建失败')),
+    )
+    results_status = models.CharField(_('结果创建状态'), max_length=20, choices=RESULTS_STATUS_CHOICES, default='ready')
+    results_total = models.IntegerField(_('待创建结果数'), default=0)
+    results_created = models.IntegerField(_('已创建结果数'), default=0)
+    pending_count = models.IntegerField(_('待执行结果数'), default=0)
+    passed_count = models.IntegerField(_('通过结果数'), default=0)
+    failed_count = models.IntegerField(_('失败结果数'), default=0)
+    blocked_count = models.IntegerField(_('阻塞结果数'), default=0)
+    skipped_count = models.IntegerField(_('跳过结果数'), default=0)
     created_at = models.DateTimeField(_('创建时间'), auto_now_add=True)
     updated_at = models.DateTimeField(_('更新时间'), auto_now=True)
 
@@ -38,6 +106,12 @@ class TestExecution(models.Model):
         verbose_name = _('测试执行')
         verbose_name_plural = _('测试执行')
         ordering = ['-created_at']
+        indexes = [
+            # 按计划和状态过滤执行记录并按创建时间排序
+            models.Index(fields=['plan', 'status', 'created_at'], name='execution_plan_stat_crt_idx'),
+            # 不指定计划时按状态过滤并按创建时间排序
+            models.Index(fields=['status', 'created_at'], name='execution_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.plan.name} - {self.get_status_display()}"
@@ -51,6 +125,7 @@ class TestResult(models.Model):
     """
     execution = models.ForeignKey(TestExecution, verbose_name=_('测试执行'), on_delete=models.CASCADE, related_name='results')
     case = models.ForeignKey(TestCase, verbose_name=_('测试用例'), on_delete=models.CASCADE, related_name='results')
+    snapshot = models.ForeignKey(CaseSnapshot, verbose_name=_('用例快照'), on_delete=models.PROTECT, related_name='results', blank=True, null=True)
     STATUS_CHOICES = (
         ('pending', _('待执行')),
         ('passed', _('通过')),
@@ -71,6 +146,24 @@ class TestResult(models.Model):
         verbose_name_plural = _('测试结果')
         ordering = ['-updated_at']
         unique_together = ('execution', 'case')
+        indexes = [
+            # 列表键集分页按(updated_at, id)排序
+            models.Index(fields=['updated_at', 'id'], name='testresult_updated_id_idx'),
+            # 按执行统计各状态的结果数
+            models.Index(fields=['execution', 'status'], name='testresult_exec_status_idx'),
+            # 查询用例的历史执行结果并按执行时间排序
+            models.Index(fields=['case', 'execution_time'], name='testresult_case_time_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.case.name} - {self.get_status_display()}" 
\ No newline at end of file
+        return f"{self.case_info.name} - {self.get_status_display()}"
+
+    @property
+    def case_info(self):
+        """
+        结果对应的用例内容
+
+        Returns:
+            CaseSnapshot: 创建执行时冻结的用例快照，没有快照的结果返回当前的用例
+        """
+        return self.snapshot if self.snapshot_id else self.case 
\ No newline at end of file
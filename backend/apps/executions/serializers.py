@@ -6,6 +6,7 @@
 最后修改: 2023-06-10
 """
 
+from django.db import transaction
 from rest_framework import serializers
 from .models import TestExecution, TestResult
 from apps.testplans.models import TestPlan
@@ -13,6 +14,10 @@ from apps.testcases.models import TestCase
 from apps.users.serializers import UserSerializer
 from django.utils import timezone
 from apps.testplans.serializers import TestPlanSerializer
+from utils.serializers import SparseFieldsetsMixin
+from .bulk import initialize_results
+from .stats import COUNTER_FIELDS, get_result_stats
+from .transitions import TRANSITIONS
 
 
 class TestPlanNestedSerializer(serializers.ModelSerializer):
@@ -28,24 +33,35 @@ class TestPlanNestedSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'project', 'project_name', 'status', 'start_time', 'end_time']
 
 
-class TestExecutionSerializer(serializers.ModelSerializer):
+class TestExecutionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试执行序列化器
     
-    用于测试执行数据的序列化和反序列化
+    用于测试执行数据的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     executor_name = serializers.ReadOnlyField(source='executor.username')
     plan_name = serializers.ReadOnlyField(source='plan.name')
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     results_count = serializers.SerializerMethodField()
+    results_stats = serializers.SerializerMethodField()
+    results_status_display = serializers.CharField(source='get_results_status_display', read_only=True)
     plan_detail = TestPlanNestedSerializer(source='plan', read_only=True)
     
     class Meta:
         model = TestExecution
         fields = ['id', 'plan', 'plan_name', 'plan_detail', 'executor', 'executor_name', 'status', 
-                  'status_display', 'start_time', 'end_time', 'results_count', 
-                  'created_at', 'updated_at']
-        read_only_fields = ['executor', 'created_at', 'updated_at']
+                  'status_display', 'start_time', 'end_time', 'results_count', 'results_stats', 'results_status', 
+                  'results_status_display', 'results_total', 'results_created', 'created_at', 'updated_at']
+        read_only_fields = ['executor', 'results_status', 'results_total', 'results_created', 
+                            'created_at', 'updated_at']
+        # 紧凑模式下返回的字段
+        compact_fields = ['id', 'plan', 'plan_name', 'executor_name', 'status', 'start_time', 
+                          'end_time', 'results_status', 'created_at']
+        # 方法字段用到的模型字段
+        field_sources = {
+            'results_count': COUNTER_FIELDS,
+            'results_stats': COUNTER_FIELDS,
+        }
     
     def get_results_count(self, obj):
         """
@@ -57,7 +73,21 @@ class TestExecutionSerializer(serializers.ModelSerializer):
         Returns:
             int: 测试结果数量
         """
-        return obj.results.count()
+        return get_result_stats(obj)['total']
+    
+    def get_results_stats(self, obj):
+        """
+        获取测试执行下各状态的测试结果数量
+        
+        直接读取测试执行上的计数列，不查询测试结果表
+        
+        Args:
+            obj: 测试执行对象
+            
+        Returns:
+            dict: 包含total和各状态结果数的字典
+        """
+        return get_result_stats(obj)
     
     def create(self, validated_data):
         """
@@ -72,35 +102,25 @@ class TestExecutionSerializer(serializers.ModelSerializer):
         # 设置执行者为当前用户
         validated_data['executor'] = self.context['request'].user
         
-        # 创建测试执行
-        execution = super().create(validated_data)
-        
-        # 获取测试计划
-        plan = execution.plan
-        
-        # 获取测试计划下的所有测试用例
-        plan_cases = plan.testplancase_set.all().order_by('order')
-        
-        # 为每个测试用例创建测试结果
-        for plan_case in plan_cases:
-            TestResult.objects.create(
-                execution=execution,
-                case=plan_case.case,
-                status='pending'
-            )
+        with transaction.atomic():
+            # 创建测试执行
+            execution = super().create(validated_data)
+            
+            # 为计划中的用例批量创建测试结果，用例较多时由后台任务分批创建
+            initialize_results(execution)
         
         return execution
 
 
-class TestResultSerializer(serializers.ModelSerializer):
+class TestResultSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试结果序列化器
     
-    用于测试结果数据的序列化和反序列化
+    用于测试结果数据的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     execution_id = serializers.ReadOnlyField(source='execution.id')
-    case_id = serializers.ReadOnlyField(source='case.id')
-    case_name = serializers.ReadOnlyField(source='case.name')
+    case_id = serializers.ReadOnlyField()
+    case_name = serializers.ReadOnlyField(source='case_info.name')
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     executor_name = serializers.ReadOnlyField(source='executor.username')
     case = serializers.SerializerMethodField()
@@ -112,22 +132,33 @@ class TestResultSerializer(serializers.ModelSerializer):
                   'executor', 'executor_name', 'execution_time', 
                   'created_at', 'updated_at']
         read_only_fields = ['execution', 'case', 'created_at', 'updated_at']
+        # 紧凑模式下不返回嵌套的用例信息和大文本字段
+        compact_fields = ['id', 'execution', 'case_id', 'case_name', 'status', 'executor_name', 
+                          'execution_time', 'updated_at']
+        # 方法字段用到的模型字段，用例信息读取创建执行时的用例快照
+        field_sources = {
+            'case_name': ('snapshot__name',),
+            'case': ('case', 'snapshot__name', 'snapshot__priority', 'snapshot__expected_results'),
+        }
     
     def get_case(self, obj):
         """
         获取测试用例的简要信息
         
+        读取创建执行时的用例快照，之后修改用例不影响历史结果
+        
         Args:
             obj: 测试结果对象
             
         Returns:
             dict: 测试用例信息
         """
+        case_info = obj.case_info
         return {
-            'id': obj.case.id,
-            'name': obj.case.name,
-            'priority': obj.case.priority,
-            'expected_results': obj.case.expected_results
+            'id': obj.case_id,
+            'name': case_info.name,
+            'priority': case_info.priority,
+            'expected_results': case_info.expected_results
         }
     
     def update(self, instance, validated_data):
@@ -141,9 +172,52 @@ class TestResultSerializer(serializers.ModelSerializer):
         Returns:
             TestResult: 更新后的测试结果对象
         """
-        # 如果状态从pending变为其他状态，设置执行时间和执行者
-        if instance.status == 'pending' and validated_data.get('status') != 'pending':
-            validated_data['execution_time'] = timezone.now()
-            validated_data['executor'] = self.context['request'].user
-        
-        return super().update(instance, validated_data) 
\ No newline at end of file
+        # 保存结果与更新测试执行的计数在同一事务中完成
+        with transaction.atomic():
+            # 锁定结果后读取当前状态，并发修改同一结果时按实际的原状态计算计数增量
+            current_status = TestResult.objects.select_for_update().values_list('status', flat=True).get(pk=instance.pk)
+            instance.status = current_status
+            instance._counted_status = current_status
+            
+            # 如果状态从pending变为其他状态，设置执行时间和执行者
+            if current_status == 'pending' and validated_data.get('status', current_status) != 'pending':
+                validated_data['execution_time'] = timezone.now()
+                validated_data['executor'] = self.context['request'].user
+            
+            return super().update(instance, validated_data)
+
+class TestResultFilterSerializer(serializers.Serializer):
+    """
+    测试结果过滤条件序列化器
+    
+    用于按条件批量更新测试结果时选择目标结果
+    """
+    execution = serializers.PrimaryKeyRelatedField(queryset=TestExecution.objects.all(), help_text='测试执行ID')
+    status = serializers.ChoiceField(choices=TestResult.STATUS_CHOICES, required=False, help_text='当前结果状态')
+    priority = serializers.ChoiceField(choices=TestCase.PRIORITY_CHOICES, required=False, help_text='用例快照中的优先级')
+    case_name = serializers.CharField(required=False, allow_blank=True, help_text='用例快照中的名称关键字')
+
+
+class TestResultBulkStatusSerializer(serializers.Serializer):
+    """
+    测试结果按条件批量更新序列化器
+    
+    用于验证按条件批量更新测试结果状态的数据
+    """
+    filter = TestResultFilterSerializer(help_text='过滤条件')
+    status = serializers.ChoiceField(choices=TestResult.STATUS_CHOICES, help_text='更新后的结果状态')
+    remarks = serializers.CharField(required=False, allow_blank=True, allow_null=True, help_text='备注')
+
+
+class TestExecutionBulkTransitionSerializer(serializers.Serializer):
+    """
+    测试执行批量状态流转序列化器
+    
+    用于验证批量开始、暂停、完成或中止测试执行的数据
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000, help_text='测试执行ID列表'
+    )
+    action = serializers.ChoiceField(choices=list(TRANSITIONS), help_text='操作: start、pause、complete或abort')
+    auto_generate_report = serializers.BooleanField(default=True, help_text='完成时是否自动生成测试报告')
+    report_type = serializers.CharField(default='allure', help_text='自动生成的报告类型')
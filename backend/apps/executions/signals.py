@@ -0,0 +1,96 @@
+"""
+测试执行信号处理模块
+
+测试结果单条保存时按状态变化更新所属测试执行的计数，删除测试用例时批量扣减其结果的计数，
+测试结果和测试执行的状态变化发布到执行事件流
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.db.models import Count
+from django.dispatch import receiver
+from apps.testcases.models import testcases_deleting
+from utils.pagination import bump_table_version
+from .events import EVENT_STATUS, publish_event, publish_progress, publish_result_changes
+from .models import TestExecution, TestResult
+from .stats import adjust_counters, record_status_changes, reconcile_counters
+
+
+@receiver(post_init, sender=TestResult)
+def remember_result_status(sender, instance, **kwargs):
+    """
+    记录测试结果加载时的状态
+
+    状态字段被延迟加载时不触发查询，保存时改为对账
+    """
+    instance._counted_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=TestResult)
+def update_result_counters(sender, instance, created, update_fields=None, **kwargs):
+    """
+    测试结果保存后更新测试执行的计数
+    """
+    if update_fields is not None and 'status' not in update_fields:
+        return
+
+    if created:
+        record_status_changes([(instance.execution_id, None, instance.status)])
+    elif instance._counted_status is None:
+        reconcile_counters([instance.execution_id])
+    else:
+        record_status_changes([(instance.execution_id, instance._counted_status, instance.status)])
+    publish_result_changes(instance.execution_id, [
+        {'id': instance.id, 'status': instance.status, 'previous_status': instance._counted_status}
+    ])
+    instance._counted_status = instance.status
+
+
+@receiver(post_save, sender=TestExecution)
+def publish_execution_status(sender, instance, created, update_fields=None, **kwargs):
+    """
+    测试执行保存后发布状态事件
+    """
+    if created:
+        return
+    publish_event(instance.id, EVENT_STATUS, {
+        'status': instance.status,
+        'results_status': instance.results_status,
+        'start_time': instance.start_time,
+        'end_time': instance.end_time,
+    })
+
+
+@receiver(post_delete, sender=TestExecution)
+def invalidate_result_counts(sender, instance, **kwargs):
+    """
+    测试执行删除后使测试结果的缓存计数失效
+
+    测试结果随测试执行级联删除，不逐行触发信号
+    """
+    bump_table_version(TestResult)
+
+
+@receiver(testcases_deleting)
+def discount_deleted_case_results(sender, queryset, **kwargs):
+    """
+    删除测试用例前扣减其测试结果的计数
+
+    测试结果随测试用例级联删除，不逐行触发信号；这里按测试执行和状态分组统计一次，
+    每个测试执行执行一条UPDATE
+    """
+    rows = (
+        TestResult.objects.filter(case__in=queryset).order_by()
+        .values_list('execution_id', 'status').annotate(count=Count('id'))
+    )
+    deltas = {}
+    for execution_id, status, count in rows:
+        deltas.setdefault(execution_id, {})[status] = -count
+    for execution_id, execution_deltas in deltas.items():
+        adjust_counters(execution_id, execution_deltas)
+        publish_progress(execution_id, deltas=execution_deltas)
+    if deltas:
+        bump_table_version(TestResult)
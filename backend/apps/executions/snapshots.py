@@ -0,0 +1,91 @@
+"""
+用例快照模块
+
+创建测试结果前为用例生成快照，测试结果引用快照而不是当前的用例:
+- 快照保存用例名称、优先级、预期结果和测试步骤的哈希
+- 按内容哈希去重，已有相同内容的快照时直接复用
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from apps.testcases.models import TestCase
+from .models import CaseSnapshot, compute_snapshot_hash, compute_steps_hash
+
+
+def build_snapshot(name, priority, expected_results, steps):
+    """
+    根据用例内容构建快照对象
+
+    Args:
+        name (str): 用例名称
+        priority (str): 优先级
+        expected_results (str): 预期结果
+        steps (str): 测试步骤
+
+    Returns:
+        CaseSnapshot: 未保存的快照对象
+    """
+    steps_hash = compute_steps_hash(steps)
+    return CaseSnapshot(
+        snapshot_hash=compute_snapshot_hash(name, priority, expected_results, steps_hash),
+        name=name,
+        priority=priority,
+        expected_results=expected_results or '',
+        steps_hash=steps_hash,
+    )
+
+
+def save_snapshots(snapshots):
+    """
+    保存快照并返回各内容哈希对应的快照ID
+
+    先查询已有的快照，只插入缺少的部分；并发插入相同内容时由唯一索引忽略冲突
+
+    Args:
+        snapshots: 快照对象的可迭代对象
+
+    Returns:
+        dict: 以内容哈希为键、以快照ID为值的字典
+    """
+    snapshots = {snapshot.snapshot_hash: snapshot for snapshot in snapshots}
+    if not snapshots:
+        return {}
+
+    snapshot_ids = dict(
+        CaseSnapshot.objects.filter(snapshot_hash__in=list(snapshots)).values_list('snapshot_hash', 'id')
+    )
+    missing = [snapshot for snapshot_hash, snapshot in snapshots.items() if snapshot_hash not in snapshot_ids]
+    if missing:
+        CaseSnapshot.objects.bulk_create(missing, ignore_conflicts=True)
+        snapshot_ids.update(
+            CaseSnapshot.objects.filter(snapshot_hash__in=[snapshot.snapshot_hash for snapshot in missing])
+            .values_list('snapshot_hash', 'id')
+        )
+    return snapshot_ids
+
+
+def freeze_case_snapshots(case_ids):
+    """
+    为一批用例生成快照
+
+    Args:
+        case_ids (list): 用例ID列表
+
+    Returns:
+        dict: 以用例ID为键、以快照ID为值的字典
+    """
+    rows = (
+        TestCase.objects.filter(id__in=list(case_ids)).order_by()
+        .values_list('id', 'name', 'priority', 'expected_results', 'steps')
+    )
+    case_hashes = {}
+    snapshots = []
+    for case_id, name, priority, expected_results, steps in rows:
+        snapshot = build_snapshot(name, priority, expected_results, steps)
+        case_hashes[case_id] = snapshot.snapshot_hash
+        snapshots.append(snapshot)
+
+    snapshot_ids = save_snapshots(snapshots)
+    return {case_id: snapshot_ids[snapshot_hash] for case_id, snapshot_hash in case_hashes.items()}
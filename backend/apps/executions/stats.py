@@ -0,0 +1,179 @@
+"""
+测试结果统计模块
+
+每个测试执行在自身的计数列中保存各状态的结果数，读取进度时不再统计测试结果表:
+- 单条保存通过信号按状态变化增减计数
+- 批量创建、批量更新等不触发信号的路径显式调用record_status_changes或reconcile_counters
+- 对账任务按测试结果表重新统计，修复计数偏差
+
+计数变化同时作为进度事件发布，订阅执行事件流的客户端据此更新统计
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from .events import publish_progress
+from .models import TestExecution, TestResult
+
+
+# 参与统计的结果状态
+RESULT_STATUSES = [key for key, _ in TestResult.STATUS_CHOICES]
+
+# 对账时每批处理的测试执行数
+RECONCILE_CHUNK_SIZE = 500
+
+
+def counter_field(status):
+    """
+    获取某状态结果数对应的计数列
+
+    Args:
+        status (str): 结果状态
+
+    Returns:
+        str: TestExecution上的字段名
+    """
+    return f'{status}_count'
+
+
+# 全部计数列
+COUNTER_FIELDS = [counter_field(status) for status in RESULT_STATUSES]
+
+
+def get_result_stats(execution):
+    """
+    获取测试执行的结果统计
+
+    Args:
+        execution: 测试执行对象
+
+    Returns:
+        dict: 包含total和各状态结果数的字典
+    """
+    stats = {status: getattr(execution, counter_field(status)) for status in RESULT_STATUSES}
+    return {'total': sum(stats.values()), **stats}
+
+
+def adjust_counters(execution_id, deltas):
+    """
+    按状态增减测试执行的计数
+
+    用一条UPDATE语句完成，调用方负责把它与修改测试结果放在同一事务中
+
+    Args:
+        execution_id: 测试执行ID
+        deltas (dict): 以状态为键、以增量为值的字典
+    """
+    updates = {
+        counter_field(status): F(counter_field(status)) + delta
+        for status, delta in deltas.items()
+        if delta and status in RESULT_STATUSES
+    }
+    if updates:
+        TestExecution.objects.filter(id=execution_id).update(**updates)
+
+
+def record_status_changes(changes):
+    """
+    记录一批测试结果的状态变化
+
+    按测试执行汇总后，每个测试执行只执行一条UPDATE，并发布一条进度增量事件
+
+    Args:
+        changes: (测试执行ID, 原状态, 新状态)元组的可迭代对象，
+            新建的结果原状态为None，删除的结果新状态为None
+    """
+    deltas = defaultdict(Counter)
+    for execution_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status is not None:
+            deltas[execution_id][old_status] -= 1
+        if new_status is not None:
+            deltas[execution_id][new_status] += 1
+
+    for execution_id, execution_deltas in deltas.items():
+        adjust_counters(execution_id, execution_deltas)
+        publish_progress(execution_id, deltas={status: delta for status, delta in execution_deltas.items() if delta})
+
+
+def count_results(execution_ids):
+    """
+    按测试结果表统计测试执行的各状态结果数
+
+    Args:
+        execution_ids: 测试执行ID列表
+
+    Returns:
+        dict: 以测试执行ID为键、以各状态结果数字典为值
+    """
+    counts = {execution_id: dict.fromkeys(RESULT_STATUSES, 0) for execution_id in execution_ids}
+    rows = (
+        TestResult.objects.filter(execution_id__in=execution_ids).order_by()
+        .values_list('execution_id', 'status').annotate(count=Count('id'))
+    )
+    for execution_id, status, count in rows:
+        if status in RESULT_STATUSES:
+            counts[execution_id][status] = count
+    return counts
+
+
+def reconcile_counters(execution_ids=None):
+    """
+    按测试结果表重新统计并修复测试执行的计数
+
+    Args:
+        execution_ids: 需要对账的测试执行ID列表，为空时处理全部测试执行
+
+    Returns:
+        int: 计数被修复的测试执行数
+    """
+    queryset = TestExecution.objects.order_by('id').values_list('id', *COUNTER_FIELDS)
+    if execution_ids is not None:
+        queryset = queryset.filter(id__in=list(execution_ids))
+
+    repaired = 0
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id)[:RECONCILE_CHUNK_SIZE])
+        if not rows:
+            break
+        actual = count_results([row[0] for row in rows])
+        for execution_id, *stored in rows:
+            if stored != [actual[execution_id][status] for status in RESULT_STATUSES]:
+                repaired += repair_counters(execution_id)
+        last_id = rows[-1][0]
+    return repaired
+
+
+def repair_counters(execution_id):
+    """
+    锁定测试执行后重新统计并写入计数
+
+    统计只包含已提交的结果，并发事务的计数增量要等锁释放后才能写入，
+    因此会在修复后的计数上继续累加，不会被覆盖
+
+    Args:
+        execution_id: 测试执行ID
+
+    Returns:
+        int: 计数有变化时返回1，否则返回0
+    """
+    with transaction.atomic():
+        stored = TestExecution.objects.select_for_update().filter(id=execution_id).values_list(*COUNTER_FIELDS).first()
+        if stored is None:
+            return 0
+        counts = count_results([execution_id])[execution_id]
+        expected = [counts[status] for status in RESULT_STATUSES]
+        if list(stored) == expected:
+            return 0
+        TestExecution.objects.filter(id=execution_id).update(
+            updated_at=timezone.now(), **dict(zip(COUNTER_FIELDS, expected))
+        )
+        publish_progress(execution_id, stats={'total': sum(expected), **dict(zip(RESULT_STATUSES, expected))})
+    return 1
@@ -0,0 +1,72 @@
+"""
+测试执行异步任务模块
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import logging
+from celery import shared_task
+from django.utils import timezone
+from .models import TestExecution
+from .bulk import create_results_in_batches
+from .events import EVENT_STATUS, publish_event
+from .stats import reconcile_counters
+
+
+@shared_task
+def create_execution_results(execution_id):
+    """
+    异步为测试执行分批创建测试结果
+
+    Args:
+        execution_id: 测试执行ID
+
+    Returns:
+        dict: 操作结果
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"开始创建测试结果: execution_id={execution_id}")
+
+    execution = TestExecution.objects.get(id=execution_id)
+    try:
+        count = create_results_in_batches(execution)
+    except Exception as e:
+        logger.error(f"创建测试结果失败: execution_id={execution_id}, error={str(e)}")
+        TestExecution.objects.filter(id=execution_id).update(results_status='failed', updated_at=timezone.now())
+        publish_event(execution_id, EVENT_STATUS, {'results_status': 'failed'})
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+
+    TestExecution.objects.filter(id=execution_id).update(results_status='ready', updated_at=timezone.now())
+    publish_event(execution_id, EVENT_STATUS, {'results_status': 'ready', 'results_created': count})
+    logger.info(f"测试结果创建完成: execution_id={execution_id}, count={count}")
+    return {
+        'status': 'success',
+        'execution_id': execution_id,
+        'count': count
+    }
+
+
+@shared_task
+def reconcile_result_counters(execution_ids=None):
+    """
+    按测试结果表修复测试执行上的结果计数
+
+    Args:
+        execution_ids: 需要对账的测试执行ID列表，为空时处理全部测试执行
+
+    Returns:
+        dict: 操作结果
+    """
+    logger = logging.getLogger(__name__)
+    repaired = reconcile_counters(execution_ids)
+    if repaired:
+        logger.warning(f"已修复测试执行的结果计数: count={repaired}")
+    return {
+        'status': 'success',
+        'repaired': repaired
+    }
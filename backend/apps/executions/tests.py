@@ -0,0 +1,159 @@
+"""
+测试执行模块测试
+
+覆盖测试执行上的结果计数与状态流转:
+- 各种修改测试结果的路径执行后，计数与测试结果表一致，对账不需要修复
+- 重复的状态流转只有第一次生效，报告只提交一次
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from unittest import mock
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.testcases.models import Project, TestCase as Case
+from apps.testplans.models import TestPlan, TestPlanCase
+from apps.users.models import User
+from .bulk import batch_update_results, initialize_results, update_results_by_filter
+from .models import TestExecution, TestResult
+from .stats import count_results, get_result_stats, reconcile_counters
+from .transitions import transition_execution, transition_executions
+
+
+class ExecutionTestMixin:
+    """
+    创建项目、用例、测试计划和测试执行
+    """
+    case_count = 10
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='password')
+        self.project = Project.objects.create(name='项目', creator=self.user)
+        self.cases = [
+            Case.objects.create(project=self.project, name=f'用例{i}', steps=f'步骤{i}', creator=self.user)
+            for i in range(self.case_count)
+        ]
+        self.plan = TestPlan.objects.create(name='计划', project=self.project, creator=self.user)
+        TestPlanCase.objects.bulk_create([
+            TestPlanCase(plan=self.plan, case=case, order=i) for i, case in enumerate(self.cases)
+        ])
+        self.execution = TestExecution.objects.create(plan=self.plan, executor=self.user)
+        initialize_results(self.execution)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def result_ids(self):
+        return list(TestResult.objects.filter(execution=self.execution).order_by('id').values_list('id', flat=True))
+
+
+class ResultCounterTests(ExecutionTestMixin, TestCase):
+    """
+    测试结果计数
+    """
+
+    def assertCountersConsistent(self):
+        self.execution.refresh_from_db()
+        stats = get_result_stats(self.execution)
+        stats.pop('total')
+        self.assertEqual(stats, count_results([self.execution.id])[self.execution.id])
+        self.assertEqual(reconcile_counters([self.execution.id]), 0)
+
+    def test_initial_counters(self):
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.pending_count, self.case_count)
+        self.assertCountersConsistent()
+
+    def test_batch_update_results(self):
+        result_ids = self.result_ids()
+        items = [{'id': result_id, 'status': 'passed'} for result_id in reversed(result_ids[:4])]
+        items.append({'id': result_ids[4], 'status': 'failed'})
+        updated_count, errors = batch_update_results(items, self.user, chunk_size=2)
+
+        self.assertEqual((updated_count, errors), (5, []))
+        self.assertEqual(TestExecution.objects.get(id=self.execution.id).passed_count, 4)
+        self.assertCountersConsistent()
+
+        # 状态不变的重复更新不改变计数
+        batch_update_results(items, self.user)
+        self.assertCountersConsistent()
+
+    def test_update_results_by_filter(self):
+        batch_update_results([{'id': self.result_ids()[0], 'status': 'failed'}], self.user)
+        updated_count = update_results_by_filter(
+            {'execution': self.execution, 'status': 'pending'}, 'skipped', self.user
+        )
+
+        self.assertEqual(updated_count, self.case_count - 1)
+        self.assertCountersConsistent()
+
+    def test_patch_result(self):
+        result_id = self.result_ids()[0]
+        response = self.client.patch(f'/api/executions/results/{result_id}/', {'status': 'blocked'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertCountersConsistent()
+
+    def test_delete_result(self):
+        result_ids = self.result_ids()
+        batch_update_results([{'id': result_ids[0], 'status': 'passed'}], self.user)
+        for result_id in result_ids[:2]:
+            response = self.client.delete(f'/api/executions/results/{result_id}/')
+            self.assertEqual(response.status_code, 204)
+
+        self.execution.refresh_from_db()
+        self.assertEqual((self.execution.passed_count, self.execution.pending_count), (0, self.case_count - 2))
+        self.assertCountersConsistent()
+
+    def test_case_cascade_delete(self):
+        result_ids = self.result_ids()
+        batch_update_results([{'id': result_ids[0], 'status': 'passed'}], self.user)
+
+        # 单个删除和查询集删除都会级联删除测试结果
+        self.cases[0].delete()
+        Case.objects.filter(id__in=[case.id for case in self.cases[1:3]]).delete()
+
+        self.execution.refresh_from_db()
+        self.assertEqual((self.execution.passed_count, self.execution.pending_count), (0, self.case_count - 3))
+        self.assertCountersConsistent()
+
+
+class TransitionTests(ExecutionTestMixin, TestCase):
+    """
+    测试执行状态流转
+    """
+    case_count = 2
+
+    def test_repeated_transition_is_rejected(self):
+        self.assertTrue(transition_execution(self.execution.id, 'start'))
+        self.assertTrue(transition_execution(self.execution.id, 'complete'))
+        self.assertFalse(transition_execution(self.execution.id, 'complete'))
+
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, 'completed')
+        self.assertIsNotNone(self.execution.end_time)
+
+    def test_transition_from_invalid_status(self):
+        self.assertFalse(transition_execution(self.execution.id, 'pause'))
+        self.assertFalse(transition_execution(self.execution.id, 'complete'))
+
+    def test_bulk_transition_returns_applied_ids(self):
+        other = TestExecution.objects.create(plan=self.plan, executor=self.user, status='completed')
+
+        applied = transition_executions([other.id, self.execution.id, self.execution.id], 'start')
+
+        self.assertEqual(applied, [self.execution.id])
+        self.assertEqual(transition_executions([self.execution.id], 'start'), [])
+
+    @mock.patch('apps.executions.views.generate_report')
+    def test_repeated_complete_submits_report_once(self, generate_report):
+        self.assertTrue(transition_execution(self.execution.id, 'start'))
+
+        first = self.client.post(f'/api/executions/{self.execution.id}/complete/', format='json')
+        second = self.client.post(f'/api/executions/{self.execution.id}/complete/', format='json')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(generate_report.delay.call_count, 1)
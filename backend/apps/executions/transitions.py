@@ -0,0 +1,166 @@
+"""
+测试执行状态流转模块
+
+每个操作对应一次状态流转，用一条带状态条件的UPDATE语句完成:
+UPDATE ... WHERE id = ? AND status IN (...)，只有UPDATE实际修改了行才算流转成功。
+并发的重复操作中只有一个会成功，报告生成等副作用只需在成功时触发一次
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.db import transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .events import EVENT_STATUS, publish_event
+from .models import TestExecution
+
+
+# 各操作的名称、允许的原状态、目标状态和附加条件
+TRANSITIONS = {
+    'start': {
+        'label': '开始',
+        'sources': ('pending', 'paused'),
+        'target': 'running',
+        # 测试结果创建完成后才能开始执行
+        'conditions': {'results_status': 'ready'},
+    },
+    'pause': {
+        'label': '暂停',
+        'sources': ('running',),
+        'target': 'paused',
+    },
+    'complete': {
+        'label': '完成',
+        'sources': ('running', 'paused'),
+        'target': 'completed',
+    },
+    'abort': {
+        'label': '中止',
+        'sources': ('pending', 'running', 'paused'),
+        'target': 'aborted',
+    },
+}
+
+# 批量流转时每批处理的测试执行数
+BULK_TRANSITION_CHUNK_SIZE = 500
+
+
+def get_transition(action):
+    """
+    获取操作对应的状态流转
+
+    Args:
+        action (str): 操作名称，如start、pause、complete、abort
+
+    Returns:
+        dict: 状态流转定义
+
+    Raises:
+        ValueError: 操作不存在
+    """
+    if action not in TRANSITIONS:
+        raise ValueError(f'不支持的状态流转操作: {action}')
+    return TRANSITIONS[action]
+
+
+def get_transition_values(action, now):
+    """
+    获取状态流转需要写入的字段
+
+    Args:
+        action (str): 操作名称
+        now (datetime): 当前时间
+
+    Returns:
+        dict: 字段名到值或表达式的字典
+    """
+    values = {'status': get_transition(action)['target'], 'updated_at': now}
+    if action == 'start':
+        # 暂停后继续执行时保留首次开始的时间
+        values['start_time'] = Coalesce(F('start_time'), Value(now, output_field=DateTimeField()))
+    elif action in ('complete', 'abort'):
+        values['end_time'] = now
+    return values
+
+
+def get_transition_queryset(action, queryset=None):
+    """
+    获取可以执行状态流转的测试执行
+
+    Args:
+        action (str): 操作名称
+        queryset: 限定范围的查询集，默认为全部测试执行
+
+    Returns:
+        QuerySet: 满足原状态和附加条件的测试执行
+    """
+    transition = get_transition(action)
+    if queryset is None:
+        queryset = TestExecution.objects.all()
+    return queryset.filter(status__in=transition['sources'], **transition.get('conditions', {}))
+
+
+def publish_transition(execution_id, action):
+    """
+    发布状态流转事件
+
+    Args:
+        execution_id: 测试执行ID
+        action (str): 操作名称
+    """
+    publish_event(execution_id, EVENT_STATUS, {'status': get_transition(action)['target'], 'action': action})
+
+
+def transition_execution(execution_id, action):
+    """
+    对单个测试执行进行状态流转
+
+    Args:
+        execution_id: 测试执行ID
+        action (str): 操作名称
+
+    Returns:
+        bool: 状态流转是否生效，测试执行不存在或当前状态不允许时返回False
+    """
+    now = timezone.now()
+    applied = get_transition_queryset(action).filter(id=execution_id).update(
+        **get_transition_values(action, now)
+    ) == 1
+    if applied:
+        publish_transition(execution_id, action)
+    return applied
+
+
+def transition_executions(execution_ids, action, chunk_size=BULK_TRANSITION_CHUNK_SIZE):
+    """
+    批量进行状态流转
+
+    每批在事务中锁定满足条件的测试执行，再用一条UPDATE修改锁定的行，
+    返回的ID即为本次实际完成流转的测试执行，可据此逐个触发副作用
+
+    Args:
+        execution_ids: 测试执行ID列表
+        action (str): 操作名称
+        chunk_size (int): 每批处理的测试执行数
+
+    Returns:
+        list: 状态流转生效的测试执行ID
+    """
+    execution_ids = list(dict.fromkeys(execution_ids))
+    applied = []
+    for start in range(0, len(execution_ids), chunk_size):
+        chunk = execution_ids[start:start + chunk_size]
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = get_transition_queryset(action, TestExecution.objects.filter(id__in=chunk))
+            locked = list(queryset.select_for_update().order_by('id').values_list('id', flat=True))
+            if locked:
+                # 锁定后状态不会再变化，带上状态条件只是为了与单条流转保持一致
+                get_transition_queryset(action).filter(id__in=locked).update(**get_transition_values(action, now))
+                for execution_id in locked:
+                    publish_transition(execution_id, action)
+        applied.extend(locked)
+    return applied
@@ -11,9 +11,10 @@ from rest_framework.routers import DefaultRouter
 from .views import TestExecutionViewSet, TestResultViewSet
 
 # 创建路由器
+# 注意: 带前缀的视图集需先注册，否则会被测试执行详情路由匹配
 router = DefaultRouter()
-router.register(r'', TestExecutionViewSet, basename='execution')
 router.register(r'results', TestResultViewSet)
+router.register(r'', TestExecutionViewSet, basename='execution')
 
 # URL模式
 urlpatterns = [
@@ -7,78 +7,133 @@
 """
 
 from django.db import transaction
+from django.conf import settings
+from django.db.models import Count
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from .models import TestExecution, TestResult
-from .serializers import TestExecutionSerializer, TestResultSerializer
+from .bulk import batch_update_results, update_results_by_filter
+from .events import EventStreamRenderer, iter_sse
+from .serializers import (
+    TestExecutionSerializer, TestResultSerializer, TestResultBulkStatusSerializer,
+    TestExecutionBulkTransitionSerializer
+)
+from .stats import RESULT_STATUSES, get_result_stats, record_status_changes
+from .tasks import create_execution_results
+from .transitions import TRANSITIONS, transition_execution, transition_executions
 from apps.testplans.models import TestPlan, TestPlanCase
 from apps.testcases.models import TestCase
 from apps.reports.views import generate_report
-import logging
+from utils.pagination import StandardResultsSetPagination, bump_table_version
+from utils.serializers import SparseQuerysetMixin
 
 
-class TestExecutionViewSet(viewsets.ModelViewSet):
+class TestExecutionViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     测试执行视图集
     
     提供测试执行的增删改查功能
     """
-    queryset = TestExecution.objects.all()
+    queryset = TestExecution.objects.select_related('plan', 'plan__project', 'executor')
     serializer_class = TestExecutionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    # 键集分页的排序键，使用cursor参数或pagination=cursor时生效
+    cursor_ordering = ('-created_at', '-id')
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['plan__name', 'status']
     ordering_fields = ['created_at', 'start_time', 'end_time', 'status']
     ordering = ['-created_at']
     
-    def list(self, request, *args, **kwargs):
+    def get_queryset(self):
         """
-        获取测试执行列表
+        获取查询集
+        
+        关联查询计划、项目和执行者，各状态的结果数直接读取测试执行上的计数列；
+        列表支持按plan、plan_name和status过滤
         
-        Args:
-            request: 请求对象
-            
         Returns:
-            Response: 测试执行列表
+            QuerySet: 测试执行查询集
+            
+        Raises:
+            ValidationError: plan参数不是整数
         """
-        logger = logging.getLogger(__name__)
-        
-        # 获取查询参数
-        plan_name = request.query_params.get('plan_name', None)
-        status_param = request.query_params.get('status', None)
-        
-        # 详细记录请求参数
-        logger.info(f"获取测试执行列表请求参数: {request.query_params}")
-        logger.info(f"解析后的参数 - plan_name: {plan_name}, status: {status_param}")
-        
-        # 获取初始查询集
-        queryset = self.get_queryset()
-        logger.info(f"初始查询集数量: {queryset.count()}")
-        
-        # 根据参数过滤
-        if plan_name:
-            logger.info(f"根据计划名称过滤: {plan_name}")
-            queryset = queryset.filter(plan__name__icontains=plan_name)
-            logger.info(f"计划名称过滤后的查询集数量: {queryset.count()}")
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            params = self.request.query_params
+            plan_id = params.get('plan')
+            if plan_id:
+                try:
+                    plan_id = int(plan_id)
+                except ValueError:
+                    raise ValidationError({'plan': ['计划ID必须是整数']})
+                queryset = queryset.filter(plan_id=plan_id)
+            plan_name = params.get('plan_name')
+            if plan_name:
+                queryset = queryset.filter(plan__name__icontains=plan_name)
+            status_param = params.get('status')
+            if status_param:
+                queryset = queryset.filter(status=status_param)
+        return queryset
+    
+    def get_transition_error(self, execution_id, action_name):
+        """
+        获取状态流转未生效时的错误响应
         
-        if status_param:
-            logger.info(f"根据状态过滤: {status_param}")
-            queryset = queryset.filter(status=status_param)
-            logger.info(f"状态过滤后的查询集数量: {queryset.count()}")
+        重新读取测试执行的当前状态，说明操作被拒绝的原因
         
-        # 应用其他过滤器（排序等）
-        queryset = self.filter_queryset(queryset)
+        Args:
+            execution_id: 测试执行ID
+            action_name (str): 操作名称
+            
+        Returns:
+            Response: 错误响应
+        """
+        execution = TestExecution.objects.only(
+            'id', 'status', 'results_status', 'results_total', 'results_created'
+        ).get(id=execution_id)
+        transition = TRANSITIONS[action_name]
         
-        logger.info("过滤后的查询集数量: %d", queryset.count())
+        # 开始操作还要求测试结果已创建完成
+        if action_name == 'start' and execution.status in transition['sources'] and execution.results_status != 'ready':
+            return Response({
+                'message': f'测试结果{execution.get_results_status_display()}，暂时无法开始测试执行',
+                'results_total': execution.results_total,
+                'results_created': execution.results_created
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # 序列化数据
-        serializer = self.get_serializer(queryset, many=True)
-        logger.info(f"序列化后的数据数量: {len(serializer.data)}")
+        return Response({
+            'message': f"无法{transition['label']}状态为 {execution.get_status_display()} 的测试执行"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    def submit_report(self, execution_id, plan_name, report_type):
+        """
+        提交自动生成测试报告的任务
         
-        return Response(serializer.data)
+        Args:
+            execution_id: 测试执行ID
+            plan_name (str): 测试计划名称
+            report_type (str): 报告类型
+        """
+        # 生成默认报告名称
+        report_name = f"{plan_name} - 自动生成报告 - {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        # 生成默认描述
+        description = f"测试执行 {execution_id} 完成后自动生成的报告"
+        
+        # 异步生成报告
+        generate_report.delay(
+            execution_id=execution_id,
+            report_type=report_type,
+            name=report_name,
+            description=description,
+            user_id=self.request.user.id
+        )
     
     @action(detail=True, methods=['post'])
     def start(self, request, pk=None):
@@ -94,19 +149,41 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
         """
         execution = self.get_object()
         
-        if execution.status not in ['pending', 'paused']:
+        if not transition_execution(execution.id, 'start'):
+            return self.get_transition_error(execution.id, 'start')
+        
+        return Response({
+            'message': '测试执行已开始'
+        })
+    
+    @action(detail=True, methods=['post'], url_path='retry-results')
+    def retry_results(self, request, pk=None):
+        """
+        重新创建测试结果
+        
+        后台创建测试结果失败后重新提交任务，已创建的结果会被跳过
+        
+        Args:
+            request: 请求对象
+            pk: 测试执行ID
+            
+        Returns:
+            Response: 操作结果
+        """
+        execution = self.get_object()
+        
+        if execution.results_status != 'failed':
             return Response({
-                'message': f'无法开始状态为 {execution.get_status_display()} 的测试执行'
+                'message': f'测试结果{execution.get_results_status_display()}，无需重新创建'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        execution.status = 'running'
-        if not execution.start_time:
-            execution.start_time = timezone.now()
-        execution.save()
+        execution.results_status = 'creating'
+        execution.save(update_fields=['results_status', 'updated_at'])
+        create_execution_results.delay(execution.id)
         
         return Response({
-            'message': '测试执行已开始'
-        })
+            'message': '测试结果创建任务已重新提交'
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['post'])
     def pause(self, request, pk=None):
@@ -122,13 +199,8 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
         """
         execution = self.get_object()
         
-        if execution.status != 'running':
-            return Response({
-                'message': f'无法暂停状态为 {execution.get_status_display()} 的测试执行'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        execution.status = 'paused'
-        execution.save()
+        if not transition_execution(execution.id, 'pause'):
+            return self.get_transition_error(execution.id, 'pause')
         
         return Response({
             'message': '测试执行已暂停'
@@ -139,6 +211,8 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
         """
         完成测试执行
         
+        只有状态流转生效的请求会提交报告生成任务，重复点击不会生成重复的报告
+        
         Args:
             request: 请求对象
             pk: 测试执行ID
@@ -148,33 +222,13 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
         """
         execution = self.get_object()
         
-        if execution.status not in ['running', 'paused']:
-            return Response({
-                'message': f'无法完成状态为 {execution.get_status_display()} 的测试执行'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        execution.status = 'completed'
-        execution.end_time = timezone.now()
-        execution.save()
+        if not transition_execution(execution.id, 'complete'):
+            return self.get_transition_error(execution.id, 'complete')
         
-        # 自动生成测试报告
+        # 自动生成测试报告，默认生成Allure报告
         auto_generate_report = request.data.get('auto_generate_report', True)
         if auto_generate_report:
-            # 默认生成Allure报告
-            report_type = request.data.get('report_type', 'allure')
-            # 生成默认报告名称
-            report_name = f"{execution.plan.name} - 自动生成报告 - {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            # 生成默认描述
-            description = f"测试执行 {execution.id} 完成后自动生成的报告"
-            
-            # 异步生成报告
-            generate_report.delay(
-                execution_id=execution.id,
-                report_type=report_type,
-                name=report_name,
-                description=description,
-                user_id=request.user.id
-            )
+            self.submit_report(execution.id, execution.plan.name, request.data.get('report_type', 'allure'))
         
         return Response({
             'message': '测试执行已完成，报告生成任务已提交'
@@ -194,19 +248,93 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
         """
         execution = self.get_object()
         
-        if execution.status not in ['pending', 'running', 'paused']:
-            return Response({
-                'message': f'无法中止状态为 {execution.get_status_display()} 的测试执行'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        execution.status = 'aborted'
-        execution.end_time = timezone.now()
-        execution.save()
+        if not transition_execution(execution.id, 'abort'):
+            return self.get_transition_error(execution.id, 'abort')
         
         return Response({
             'message': '测试执行已中止'
         })
     
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        批量开始、暂停、完成或中止测试执行
+        
+        当前状态不允许该操作的测试执行会被跳过；批量完成时只为实际完成的测试执行生成报告
+        
+        Args:
+            request: 请求对象
+            
+        Returns:
+            Response: 状态流转生效和被跳过的测试执行ID
+        """
+        serializer = TestExecutionBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        action_name = data['action']
+        applied = transition_executions(data['ids'], action_name)
+        
+        if action_name == 'complete' and data['auto_generate_report']:
+            plan_names = TestExecution.objects.filter(id__in=applied).values_list('id', 'plan__name')
+            for execution_id, plan_name in plan_names:
+                self.submit_report(execution_id, plan_name, data['report_type'])
+        
+        applied_ids = set(applied)
+        return Response({
+            'message': f"已{TRANSITIONS[action_name]['label']} {len(applied)} 个测试执行",
+            'applied': applied,
+            'skipped': [execution_id for execution_id in dict.fromkeys(data['ids']) if execution_id not in applied_ids]
+        })
+    
+    @action(detail=True, methods=['get'], renderer_classes=[EventStreamRenderer, JSONRenderer])
+    def events(self, request, pk=None):
+        """
+        订阅测试执行的事件流
+        
+        以Server-Sent Events推送测试执行的变化，替代轮询结果列表:
+        - snapshot: 连接建立时的状态和统计
+        - results: 测试结果状态变化，包含id、status和previous_status
+        - progress: 统计增量deltas，或重新统计后的完整stats
+        - bulk_update: 按条件批量更新了多个结果，需要时重新读取结果列表
+        - status: 测试执行或结果创建状态变化
+        
+        连接超过settings.EXECUTION_EVENTS_MAX_DURATION后由服务端关闭，客户端自动重连并重新获取快照
+        
+        Args:
+            request: 请求对象
+            pk: 测试执行ID
+            
+        Returns:
+            StreamingHttpResponse: text/event-stream事件流
+        """
+        execution_id = self.get_object().id
+        
+        def get_snapshot():
+            # 订阅后重新读取测试执行，订阅前提交的变化都包含在快照中
+            execution = TestExecution.objects.get(id=execution_id)
+            return {
+                'status': execution.status,
+                'results_status': execution.results_status,
+                'results_total': execution.results_total,
+                'results_created': execution.results_created,
+                'stats': get_result_stats(execution)
+            }
+        
+        response = StreamingHttpResponse(
+            iter_sse(
+                execution_id,
+                get_snapshot,
+                heartbeat=getattr(settings, 'EXECUTION_EVENTS_HEARTBEAT', 15),
+                max_duration=getattr(settings, 'EXECUTION_EVENTS_MAX_DURATION', 300)
+            ),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # 禁止nginx缓冲，事件到达后立即发送给客户端
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
     @action(detail=True, methods=['get'])
     def results(self, request, pk=None):
         """
@@ -220,38 +348,43 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
             Response: 测试结果列表
         """
         execution = self.get_object()
-        results = execution.results.all()
+        # 用例信息读取创建执行时的用例快照，不再关联当前的用例
+        results = execution.results.select_related('snapshot', 'executor')
         
         # 过滤
         case_name = request.query_params.get('case_name')
         status = request.query_params.get('status')
         
         if case_name:
-            results = results.filter(case__name__icontains=case_name)
+            results = results.filter(snapshot__name__icontains=case_name)
         
         if status:
             results = results.filter(status=status)
         
         # 统计数据 - 在分页前计算，确保统计的是所有符合条件的结果
-        stats = {
-            'total': results.count(),
-            'passed': results.filter(status='passed').count(),
-            'failed': results.filter(status='failed').count(),
-            'blocked': results.filter(status='blocked').count(),
-            'skipped': results.filter(status='skipped').count(),
-            'pending': results.filter(status='pending').count(),
-        }
+        if case_name or status:
+            # 过滤后的统计用一次分组查询完成
+            counts = dict(results.order_by().values_list('status').annotate(count=Count('id')))
+            stats = {'total': sum(counts.values())}
+            stats.update({result_status: counts.get(result_status, 0) for result_status in RESULT_STATUSES})
+        else:
+            # 未过滤时直接读取测试执行上的计数
+            stats = get_result_stats(execution)
+        
+        # 按请求的字段裁剪查询的列
+        context = self.get_serializer_context()
+        results = self.sparse_queryset(results, TestResultSerializer(context=context))
         
         # 分页
         page = self.paginate_queryset(results)
         if page is not None:
-            serializer = TestResultSerializer(page, many=True)
+            serializer = TestResultSerializer(page, many=True, context=context)
             paginated_response = self.get_paginated_response(serializer.data)
             # 将统计数据添加到分页响应中
             paginated_response.data['stats'] = stats
             return paginated_response
         
-        serializer = TestResultSerializer(results, many=True)
+        serializer = TestResultSerializer(results, many=True, context=context)
         
         return Response({
             'results': serializer.data,
@@ -259,25 +392,42 @@ class TestExecutionViewSet(viewsets.ModelViewSet):
         })
 
 
-class TestResultViewSet(viewsets.ModelViewSet):
+class TestResultViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     测试结果视图集
     
     提供测试结果的增删改查功能
     """
-    queryset = TestResult.objects.all()
+    queryset = TestResult.objects.select_related('snapshot', 'executor')
     serializer_class = TestResultSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    # 键集分页的排序键，使用cursor参数或pagination=cursor时生效
+    cursor_ordering = ('-updated_at', '-id')
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['case__name', 'status', 'actual_result', 'remarks']
+    search_fields = ['snapshot__name', 'status', 'actual_result', 'remarks']
     ordering_fields = ['updated_at', 'execution_time', 'status']
     ordering = ['-updated_at']
     
+    def perform_destroy(self, instance):
+        """
+        删除测试结果，并在同一事务中扣减测试执行的计数
+        
+        Args:
+            instance: 测试结果对象
+        """
+        with transaction.atomic():
+            instance.delete()
+            record_status_changes([(instance.execution_id, instance.status, None)])
+        bump_table_version(TestResult)
+    
     @action(detail=False, methods=['post'])
     def batch_update(self, request):
         """
         批量更新测试结果
         
+        按批读取和写入，单项的错误不影响其他项的更新
+        
         Args:
             request: 请求对象
             
@@ -291,46 +441,37 @@ class TestResultViewSet(viewsets.ModelViewSet):
                 'message': '缺少有效的results参数'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        updated_count = 0
-        errors = []
-        
-        with transaction.atomic():
-            for result_data in results:
-                result_id = result_data.get('id')
-                
-                try:
-                    result = TestResult.objects.get(id=result_id)
-                    
-                    # 更新状态
-                    if 'status' in result_data:
-                        result.status = result_data['status']
-                    
-                    # 更新备注
-                    if 'remarks' in result_data:
-                        result.remarks = result_data['remarks']
-                    
-                    # 更新实际结果
-                    if 'actual_result' in result_data:
-                        result.actual_result = result_data['actual_result']
-                    
-                    # 设置执行时间和执行者
-                    result.execution_time = timezone.now()
-                    result.executor = request.user
-                    
-                    result.save()
-                    updated_count += 1
-                except TestResult.DoesNotExist:
-                    errors.append({
-                        'id': result_id,
-                        'message': '测试结果不存在'
-                    })
-                except Exception as e:
-                    errors.append({
-                        'id': result_id,
-                        'message': str(e)
-                    })
+        updated_count, errors = batch_update_results(results, request.user)
         
         return Response({
             'message': f'已更新 {updated_count} 个测试结果',
             'errors': errors
-        }) 
\ No newline at end of file
+        })
+    
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        按条件批量更新测试结果状态
+        
+        对测试执行下匹配status、priority和case_name条件的全部结果，
+        用一条UPDATE语句修改状态、备注和执行者，例如把剩余的待执行结果标记为跳过
+        
+        Args:
+            request: 请求对象
+            
+        Returns:
+            Response: 更新的结果数和更新后的统计数据
+        """
+        serializer = TestResultBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        values = {'remarks': data['remarks']} if 'remarks' in data else {}
+        updated_count = update_results_by_filter(data['filter'], data['status'], request.user, **values)
+        
+        execution = TestExecution.objects.get(id=data['filter']['execution'].id)
+        return Response({
+            'message': f'已更新 {updated_count} 个测试结果',
+            'updated_count': updated_count,
+            'stats': get_result_stats(execution)
+        })
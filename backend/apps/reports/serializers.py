@@ -8,13 +8,14 @@
 
 from rest_framework import serializers
 from .models import Report
+from utils.serializers import SparseFieldsetsMixin
 
 
-class ReportSerializer(serializers.ModelSerializer):
+class ReportSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试报告序列化器
     
-    用于测试报告数据的序列化和反序列化
+    用于测试报告数据的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     creator_name = serializers.ReadOnlyField(source='creator.username')
     execution_name = serializers.ReadOnlyField(source='execution.plan.name')
@@ -26,6 +27,8 @@ class ReportSerializer(serializers.ModelSerializer):
                   'report_type', 'report_type_display', 'file_path', 'is_public', 
                   'creator', 'creator_name', 'created_at', 'updated_at']
         read_only_fields = ['creator', 'created_at', 'updated_at']
+        # 紧凑模式下返回的字段
+        compact_fields = ['id', 'name', 'execution', 'report_type', 'is_public', 'created_at']
     
     def create(self, validated_data):
         """
@@ -42,7 +45,7 @@ class ReportSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ReportListSerializer(serializers.ModelSerializer):
+class ReportListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试报告列表序列化器
     
@@ -56,4 +59,6 @@ class ReportListSerializer(serializers.ModelSerializer):
         model = Report
         fields = ['id', 'name', 'description', 'execution', 'execution_name', 'report_type', 
                   'report_type_display', 'is_public', 'creator_name', 
-                  'created_at', 'updated_at'] 
\ No newline at end of file
+                  'created_at', 'updated_at']
+        # 紧凑模式下不返回描述
+        compact_fields = ['id', 'name', 'execution', 'report_type', 'is_public', 'created_at'] 
\ No newline at end of file
@@ -23,9 +23,10 @@ from .models import Report
 from .serializers import ReportSerializer, ReportListSerializer
 from apps.executions.models import TestExecution, TestResult
 from celery import shared_task
+from utils.serializers import SparseQuerysetMixin
 
 
-class ReportViewSet(viewsets.ModelViewSet):
+class ReportViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     测试报告视图集
     
@@ -244,8 +245,8 @@ def generate_report(execution_id, report_type, name, description, user_id):
         report_dir = os.path.join(reports_dir, f"report_{execution_id}_{timezone.now().strftime('%Y%m%d%H%M%S')}")
         os.makedirs(report_dir, exist_ok=True)
         
-        # 获取测试结果
-        results = TestResult.objects.filter(execution=execution)
+        # 获取测试结果，用例信息读取创建执行时的用例快照
+        results = TestResult.objects.filter(execution=execution).select_related('snapshot')
         
         if report_type == 'allure':
             # 生成Allure报告所需的JSON文件
@@ -255,7 +256,7 @@ def generate_report(execution_id, report_type, name, description, user_id):
             for i, result in enumerate(results):
                 # 创建Allure测试结果JSON
                 test_result = {
-                    "name": result.case.name,
+                    "name": result.case_info.name,
                     "status": result.status,
                     "statusDetails": {
                         "message": result.actual_result or "",
@@ -274,7 +275,7 @@ def generate_report(execution_id, report_type, name, description, user_id):
                         },
                         {
                             "name": "testcase",
-                            "value": result.case.name
+                            "value": result.case_info.name
                         }
                     ]
                 }
@@ -579,8 +580,8 @@ def generate_html_report(execution, results):
         
         html += f"""
                     <tr>
-                        <td>{result.case.id}</td>
-                        <td>{result.case.name}</td>
+                        <td>{result.case_id}</td>
+                        <td>{result.case_info.name}</td>
                         <td><span class="status-badge {status_class}">{status_display}</span></td>
                         <td>{result.actual_result or '-'}</td>
                         <td>{result.remarks or '-'}</td>
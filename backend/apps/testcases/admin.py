@@ -8,7 +8,7 @@
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Project, TestCase
+from .models import Project, TestCase, ExportJob, ImportJob
 
 
 @admin.register(Project)
@@ -45,4 +45,28 @@ class TestCaseAdmin(admin.ModelAdmin):
         (_('用例信息'), {'fields': ('priority', 'status', 'steps', 'expected_results')}),
         (_('时间信息'), {'fields': ('created_at', 'updated_at')}),
     )
-    date_hierarchy = 'created_at' 
\ No newline at end of file
+    date_hierarchy = 'created_at' 
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """
+    导出任务管理员配置
+    
+    配置导出任务在Django管理界面中的显示方式
+    """
+    list_display = ('id', 'export_format', 'status', 'row_count', 'creator', 'created_at', 'updated_at')
+    list_filter = ('export_format', 'status', 'created_at')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """
+    导入任务管理员配置
+    
+    配置导入任务在Django管理界面中的显示方式
+    """
+    list_display = ('id', 'project', 'mode', 'status', 'processed_count', 'created_count', 'updated_count', 'skipped_count', 'failed_count', 'creator', 'created_at')
+    list_filter = ('mode', 'status', 'created_at')
+    readonly_fields = ('created_at', 'updated_at')
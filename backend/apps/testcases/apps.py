@@ -16,4 +16,21 @@ class TestcasesConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.testcases'
-    verbose_name = _('测试用例管理') 
\ No newline at end of file
+    verbose_name = _('测试用例管理')
+
+    def ready(self):
+        """
+        注册信号处理函数和查询计划检查，登记列表计数会被缓存的模型
+
+        迁移完成后创建或修复全文索引
+        """
+        from django.db.models.signals import post_migrate
+        from utils.pagination import track_table_versions
+        from . import checks, signals  # noqa: F401
+        from .models import Project, TestCase
+        from .search import install_search_index
+
+        post_migrate.connect(install_search_index, sender=self)
+        track_table_versions(Project)
+        # 测试用例的删除路径统一经过prepare_testcase_delete，在那里递增一次表版本号
+        track_table_versions(TestCase, deletes=False)
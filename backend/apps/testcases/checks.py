@@ -0,0 +1,46 @@
+"""
+测试用例查询计划检查
+
+检查测试用例列表、分页和导入等热点查询能否使用索引，
+执行manage.py check --database default时运行
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.core import checks
+from django.utils import timezone
+from utils.query_plan import check_query_plans
+
+
+def hot_queries():
+    """
+    测试用例的热点查询
+
+    Returns:
+        list: (名称, 查询集)元组列表
+    """
+    from .models import TestCase
+
+    now = timezone.now()
+    return [
+        ('按项目、状态、优先级过滤的用例列表',
+         TestCase.objects.filter(project_id=1, status='active', priority='P0').order_by('-created_at')),
+        ('按状态过滤的用例列表',
+         TestCase.objects.filter(status='active').order_by('-created_at')),
+        ('用例列表键集分页',
+         TestCase.objects.filter(created_at__lt=now).order_by('-created_at', '-id')),
+        ('增量导出',
+         TestCase.objects.filter(updated_at__gt=now).order_by('updated_at', 'id')),
+        ('导入时按内容哈希查找已有用例',
+         TestCase.objects.filter(project_id=1, content_hash__in=['0' * 64])),
+    ]
+
+
+@checks.register(checks.Tags.database)
+def check_testcase_query_plans(app_configs=None, databases=None, **kwargs):
+    """
+    检查测试用例热点查询的执行计划
+    """
+    return check_query_plans(hot_queries, 'testcases.E001', databases)
@@ -0,0 +1,363 @@
+"""
+测试用例近似重复检测模块
+
+对用例名称、测试步骤和预期结果的字符3-gram计算MinHash签名，
+再把签名分段写入LSH桶。内容相似的用例大概率至少有一段落入同一个桶，
+查找候选时只需按桶做一次索引查询，不必与全部用例逐一比较
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import zlib
+import hashlib
+import itertools
+import unicodedata
+from collections import defaultdict
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from .models import TestCase, TestCaseSignature, TestCaseLshBucket
+
+
+# MinHash签名长度，等于LSH_BANDS * LSH_ROWS
+MINHASH_PERMUTATIONS = 128
+
+# LSH分段数和每段行数，相似度约为(1/LSH_BANDS)^(1/LSH_ROWS)≈0.7时成为候选的概率为50%
+LSH_BANDS = 16
+LSH_ROWS = 8
+
+# 字符n-gram长度
+SHINGLE_SIZE = 3
+
+# 默认的相似度阈值，可通过settings.TESTCASE_DUPLICATE_THRESHOLD配置
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+
+# 每批计算签名的用例数
+INDEX_CHUNK_SIZE = 1000
+
+# 每次IN查询的桶数量上限，避免超过数据库的参数个数限制
+LOOKUP_CHUNK_SIZE = 5000
+
+# 桶内两两比较的用例数上限，超过时其余用例只与桶内前MAX_BUCKET_PAIRWISE个用例比较
+MAX_BUCKET_PAIRWISE = 100
+
+# 固定种子生成的乘移哈希参数，保证签名在不同进程中一致
+_random = np.random.RandomState(20261018)
+_HASH_A = _random.randint(1, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2 ** 32) \
+    + _random.randint(0, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _random.randint(0, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2 ** 32) \
+    + _random.randint(0, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def get_duplicate_threshold(threshold=None):
+    """
+    获取相似度阈值
+
+    Args:
+        threshold (float): 请求中指定的阈值
+
+    Returns:
+        float: 相似度阈值
+    """
+    return threshold or getattr(settings, 'TESTCASE_DUPLICATE_THRESHOLD', DEFAULT_DUPLICATE_THRESHOLD)
+
+
+def normalize_text(*values):
+    """
+    规范化用于比较的文本
+
+    Args:
+        values: 多个字段的值
+
+    Returns:
+        str: Unicode规范化、转为小写并合并空白后的文本
+    """
+    text = ' '.join(value or '' for value in values)
+    return ' '.join(unicodedata.normalize('NFKC', text).lower().split())
+
+
+def compute_signature(name, steps, expected_results):
+    """
+    计算MinHash签名
+
+    Args:
+        name (str): 用例名称
+        steps (str): 测试步骤
+        expected_results (str): 预期结果
+
+    Returns:
+        ndarray: 长度为MINHASH_PERMUTATIONS的uint32数组，文本为空时返回None
+    """
+    text = normalize_text(name, steps, expected_results)
+    if not text:
+        return None
+
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    # 乘移哈希: 取(a * x + b) mod 2^64的高32位，每一列对应一个哈希函数
+    with np.errstate(over='ignore'):
+        permuted = (hashes[:, None] * _HASH_A[None, :] + _HASH_B[None, :]) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def signature_to_bytes(signature):
+    """
+    把签名转换为字节串
+
+    Args:
+        signature (ndarray): MinHash签名
+
+    Returns:
+        bytes: 小端序的字节串
+    """
+    return signature.astype('<u4').tobytes()
+
+
+def signature_from_bytes(value):
+    """
+    从字节串还原签名
+
+    Args:
+        value (bytes): 数据库中保存的签名
+
+    Returns:
+        ndarray: MinHash签名
+    """
+    return np.frombuffer(bytes(value), dtype='<u4')
+
+
+def band_keys(signature):
+    """
+    计算签名各段的LSH桶
+
+    Args:
+        signature (ndarray): MinHash签名
+
+    Returns:
+        list: 每段一个的64位有符号整数桶编号
+    """
+    data = signature.astype('<u4')
+    keys = []
+    for band in range(LSH_BANDS):
+        digest = hashlib.blake2b(
+            data[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes(),
+            digest_size=8,
+            salt=band.to_bytes(16, 'little')
+        ).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def estimate_similarity(signature_a, signature_b):
+    """
+    估算两个签名对应文本的Jaccard相似度
+
+    Args:
+        signature_a (ndarray): MinHash签名
+        signature_b (ndarray): MinHash签名
+
+    Returns:
+        float: 0到1之间的相似度
+    """
+    return float(np.mean(signature_a == signature_b))
+
+
+def index_cases(cases):
+    """
+    为测试用例建立或更新签名和LSH桶
+
+    Args:
+        cases: 已保存的测试用例对象列表
+    """
+    cases = [case for case in cases if case.id]
+    if not cases:
+        return
+
+    signatures = []
+    buckets = []
+    for case in cases:
+        signature = compute_signature(case.name, case.steps, case.expected_results)
+        if signature is None:
+            continue
+        signatures.append(TestCaseSignature(
+            case_id=case.id,
+            project_id=case.project_id,
+            signature=signature_to_bytes(signature)
+        ))
+        buckets.extend(
+            TestCaseLshBucket(case_id=case.id, project_id=case.project_id, bucket=key)
+            for key in band_keys(signature)
+        )
+
+    case_ids = [case.id for case in cases]
+    with transaction.atomic():
+        TestCaseSignature.objects.filter(case_id__in=case_ids).delete()
+        TestCaseLshBucket.objects.filter(case_id__in=case_ids).delete()
+        TestCaseSignature.objects.bulk_create(signatures, batch_size=INDEX_CHUNK_SIZE)
+        TestCaseLshBucket.objects.bulk_create(buckets, batch_size=INDEX_CHUNK_SIZE * LSH_BANDS)
+
+
+def rebuild_index(project_id=None, missing_only=False):
+    """
+    重建测试用例的签名和LSH桶
+
+    Args:
+        project_id: 项目ID，为空时重建全部用例
+        missing_only (bool): 只为还没有签名的用例建立索引，用于为建立索引之前已有的用例补建
+
+    Returns:
+        int: 处理的用例数
+    """
+    queryset = TestCase.objects.order_by('id').only('id', 'project_id', 'name', 'steps', 'expected_results')
+    if project_id:
+        queryset = queryset.filter(project_id=project_id)
+    if missing_only:
+        queryset = queryset.filter(minhash_signature__isnull=True)
+
+    count = 0
+    last_id = 0
+    while True:
+        cases = list(queryset.filter(id__gt=last_id)[:INDEX_CHUNK_SIZE])
+        if not cases:
+            break
+        index_cases(cases)
+        count += len(cases)
+        last_id = cases[-1].id
+    return count
+
+
+def find_similar(project_id, signatures, threshold=None, exclude_ids=()):
+    """
+    在项目中查找与给定签名相似的测试用例
+
+    所有签名的LSH桶合并为IN查询取出候选，再用签名估算相似度过滤
+
+    Args:
+        project_id: 项目ID
+        signatures (dict): 以任意键(如行号)为键的MinHash签名
+        threshold (float): 相似度阈值
+        exclude_ids: 不参与比较的用例ID
+
+    Returns:
+        dict: 以输入键为键的[(用例ID, 相似度)]列表，按相似度降序排列
+    """
+    threshold = get_duplicate_threshold(threshold)
+    key_owners = defaultdict(list)
+    for owner, signature in signatures.items():
+        for key in band_keys(signature):
+            key_owners[key].append(owner)
+    if not key_owners:
+        return {}
+
+    candidates = defaultdict(set)
+    keys = list(key_owners)
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        for case_id, key in TestCaseLshBucket.objects.filter(
+            project_id=project_id, bucket__in=keys[start:start + LOOKUP_CHUNK_SIZE]
+        ).exclude(case_id__in=list(exclude_ids)).values_list('case_id', 'bucket'):
+            for owner in key_owners[key]:
+                candidates[owner].add(case_id)
+    if not candidates:
+        return {}
+
+    candidate_ids = set().union(*candidates.values())
+    stored = {
+        case_id: signature_from_bytes(value)
+        for case_id, value in TestCaseSignature.objects.filter(case_id__in=candidate_ids).values_list('case_id', 'signature')
+    }
+
+    matches = {}
+    for owner, case_ids in candidates.items():
+        similar = []
+        for case_id in case_ids:
+            if case_id not in stored:
+                continue
+            similarity = estimate_similarity(signatures[owner], stored[case_id])
+            if similarity >= threshold:
+                similar.append((case_id, similarity))
+        if similar:
+            matches[owner] = sorted(similar, key=lambda item: (-item[1], item[0]))
+    return matches
+
+
+def find_duplicate_clusters(project_id, threshold=None):
+    """
+    查找项目中的近似重复用例簇
+
+    只比较共享LSH桶的用例，桶内的用例两两比较，再用并查集把相似的用例合并为簇
+
+    Args:
+        project_id: 项目ID
+        threshold (float): 相似度阈值
+
+    Returns:
+        list: 按簇大小降序排列的簇，每个簇包含用例ID列表和簇内最低相似度
+    """
+    threshold = get_duplicate_threshold(threshold)
+
+    # 只取出至少有两个用例的桶
+    buckets = TestCaseLshBucket.objects.filter(project_id=project_id)
+    shared = buckets.values('bucket').annotate(case_count=Count('id')).filter(case_count__gt=1).values('bucket')
+    groups = defaultdict(list)
+    for case_id, key in buckets.filter(bucket__in=shared).values_list('case_id', 'bucket'):
+        groups[key].append(case_id)
+
+    # 同一个桶中的用例两两组成候选对；桶过大时其余用例只与前MAX_BUCKET_PAIRWISE个用例组成候选对，
+    # 候选对数量随桶大小线性增长
+    pairs = set()
+    for case_ids in groups.values():
+        case_ids = sorted(case_ids)
+        heads, others = case_ids[:MAX_BUCKET_PAIRWISE], case_ids[MAX_BUCKET_PAIRWISE:]
+        pairs.update(itertools.combinations(heads, 2))
+        pairs.update((head, case_id) for head in heads for case_id in others)
+    if not pairs:
+        return []
+
+    candidate_ids = {case_id for pair in pairs for case_id in pair}
+    stored = {
+        case_id: signature_from_bytes(value)
+        for case_id, value in TestCaseSignature.objects.filter(case_id__in=candidate_ids).values_list('case_id', 'signature')
+    }
+
+    parent = {}
+
+    def find(case_id):
+        parent.setdefault(case_id, case_id)
+        while parent[case_id] != case_id:
+            parent[case_id] = parent[parent[case_id]]
+            case_id = parent[case_id]
+        return case_id
+
+    edges = []
+    for case_a, case_b in pairs:
+        if case_a not in stored or case_b not in stored:
+            continue
+        similarity = estimate_similarity(stored[case_a], stored[case_b])
+        if similarity < threshold:
+            continue
+        root_a, root_b = find(case_a), find(case_b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+        edges.append((case_a, similarity))
+
+    members = defaultdict(list)
+    for case_id in parent:
+        members[find(case_id)].append(case_id)
+
+    min_similarity = {}
+    for case_id, similarity in edges:
+        root = find(case_id)
+        min_similarity[root] = min(min_similarity.get(root, 1.0), similarity)
+
+    clusters = [
+        {'case_ids': sorted(case_ids), 'min_similarity': round(min_similarity[root], 3)}
+        for root, case_ids in members.items()
+        if len(case_ids) > 1
+    ]
+    return sorted(clusters, key=lambda cluster: (-len(cluster['case_ids']), cluster['case_ids'][0]))
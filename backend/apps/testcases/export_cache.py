@@ -0,0 +1,245 @@
+"""
+测试用例导出缓存模块
+
+把生成的导出文件缓存在本地磁盘，相同的过滤条件在数据未变化时直接返回缓存文件
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
+from .exporters import export_response
+
+logger = logging.getLogger(__name__)
+
+
+# 默认的缓存目录和缓存总大小上限，可通过settings.TESTCASE_EXPORT_CACHE_DIR和
+# settings.TESTCASE_EXPORT_CACHE_MAX_SIZE配置
+DEFAULT_EXPORT_CACHE_MAX_SIZE = 500 * 1024 * 1024
+
+# 不影响导出内容的查询参数，不参与缓存键计算
+EXPORT_CACHE_IGNORED_PARAMS = ('format', 'async', 'cache')
+
+
+def get_cache_dir():
+    """
+    获取导出缓存目录
+
+    Returns:
+        str: 缓存目录路径
+    """
+    return getattr(settings, 'TESTCASE_EXPORT_CACHE_DIR', os.path.join(settings.PRIVATE_MEDIA_ROOT, 'export_cache'))
+
+
+def get_cache_max_size():
+    """
+    获取导出缓存总大小上限
+
+    Returns:
+        int: 字节数
+    """
+    return getattr(settings, 'TESTCASE_EXPORT_CACHE_MAX_SIZE', DEFAULT_EXPORT_CACHE_MAX_SIZE)
+
+
+def normalize_params(params):
+    """
+    规范化查询参数
+
+    去掉不影响导出内容的参数和空值，并按参数名排序
+
+    Args:
+        params: 查询参数，支持QueryDict或普通字典
+
+    Returns:
+        list: (参数名, 取值列表)元组列表
+    """
+    if hasattr(params, 'lists'):
+        items = params.lists()
+    else:
+        items = ((key, [value]) for key, value in params.items())
+
+    normalized = []
+    for key, values in items:
+        if key in EXPORT_CACHE_IGNORED_PARAMS:
+            continue
+        values = sorted(str(value).strip() for value in values if str(value).strip())
+        if values:
+            normalized.append((key, values))
+    return sorted(normalized)
+
+
+def get_data_version(queryset):
+    """
+    获取查询集的数据版本
+
+    用一次聚合查询取出用例、所属项目和创建者的最大更新时间以及行数，
+    新增、修改或删除用例后都会变化；项目名称和创建者用户名也是导出列，重命名后同样会变化
+
+    Args:
+        queryset: 测试用例查询集
+
+    Returns:
+        list: [用例最大更新时间, 项目最大更新时间, 创建者最大更新时间, 行数]
+    """
+    version = queryset.order_by().aggregate(
+        max_updated_at=Max('updated_at'),
+        project_updated_at=Max('project__updated_at'),
+        creator_updated_at=Max('creator__updated_at'),
+        row_count=Count('id'),
+    )
+    timestamps = [version[name] for name in ('max_updated_at', 'project_updated_at', 'creator_updated_at')]
+    return [value.isoformat() if value else None for value in timestamps] + [version['row_count']]
+
+
+def build_cache_key(export_format, params, version):
+    """
+    计算缓存键
+
+    Args:
+        export_format (ExportFormat): 导出格式
+        params: 查询参数
+        version (list): 数据版本
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    payload = json.dumps({
+        'format': export_format.name,
+        'params': normalize_params(params),
+        'version': version,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def evict_cache(cache_dir, max_size):
+    """
+    淘汰缓存文件
+
+    按最近访问时间从旧到新删除文件，直到缓存总大小不超过上限
+
+    Args:
+        cache_dir (str): 缓存目录
+        max_size (int): 缓存总大小上限
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and not entry.name.startswith('.'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+
+def iter_and_cache(chunks, tmp_path, path):
+    """
+    边输出边写入缓存文件
+
+    全部内容输出完成后才把临时文件移动到缓存路径；客户端中途断开或生成出错时删除临时文件，
+    不会留下不完整的缓存
+
+    Args:
+        chunks: 导出内容的字符串块
+        tmp_path (str): 临时文件路径
+        path (str): 缓存文件路径
+
+    Yields:
+        str: 原样输出的导出内容
+    """
+    completed = False
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp_path, path)
+        completed = True
+        evict_cache(os.path.dirname(path), get_cache_max_size())
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached_export_response(request, queryset, export_format, filename='test_cases'):
+    """
+    构建带缓存的导出文件响应
+
+    命中缓存时直接返回缓存文件并刷新其访问时间。未命中时，可流式输出的格式
+    边查询边返回，同时写入临时文件，输出完成后再原子地移动到缓存目录，首字节时间不受缓存影响；
+    其他格式先写入临时文件再移动到缓存目录。请求头If-None-Match与ETag相同时返回304，
+    cache参数为0或false时跳过缓存
+
+    Args:
+        request: 请求对象
+        queryset: 测试用例查询集
+        export_format (ExportFormat): 导出格式
+        filename (str): 不含扩展名的下载文件名
+
+    Returns:
+        HttpResponseBase: 导出文件响应
+    """
+    if request.GET.get('cache') in ['0', 'false']:
+        return export_response(queryset, export_format, filename)
+
+    key = build_cache_key(export_format, request.GET, get_data_version(queryset))
+    etag = f'"{key}"'
+
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    cache_dir = get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'{key}.{export_format.extension}')
+
+    if os.path.exists(path):
+        # 使用修改时间记录最近访问时间，淘汰时按其排序
+        os.utime(path)
+        logger.info(f"导出缓存命中: key={key}")
+    elif export_format.streaming:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp_')
+        os.close(fd)
+        response = StreamingHttpResponse(
+            iter_and_cache(export_format.iter_content(queryset), tmp_path, path),
+            content_type=export_format.content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format.extension}"'
+        response['ETag'] = etag
+        return response
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp_')
+        try:
+            if export_format.binary:
+                with os.fdopen(fd, 'wb') as f:
+                    export_format.write(queryset, f)
+            else:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                    export_format.write(queryset, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # 先打开文件再淘汰，已打开的文件被删除后仍可读取
+    response = FileResponse(open(path, 'rb'), content_type=export_format.content_type)
+    evict_cache(cache_dir, get_cache_max_size())
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format.extension}"'
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,546 @@
+"""
+测试用例导出模块
+
+提供测试用例导出的行数据源、导出格式注册表和响应构建函数
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import csv
+import json
+import base64
+import datetime
+import itertools
+import tempfile
+import xlsxwriter
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.negotiation import BaseContentNegotiation
+from .models import TestCase, TestCaseTombstone
+
+
+# 导出文件的表头
+EXPORT_HEADERS = ['ID', '用例名称', '描述', '优先级', '状态', '测试步骤', '预期结果', '项目', '创建者', '创建时间', '更新时间']
+
+# 导出时读取的字段，项目名称和创建者通过JOIN一次性取出，避免逐行查询
+EXPORT_FIELDS = (
+    'id', 'name', 'description', 'priority', 'status', 'steps', 'expected_results',
+    'project__name', 'creator__username', 'created_at', 'updated_at'
+)
+
+# JSON Lines和Parquet等机器可读格式使用的字段名称，与EXPORT_FIELDS一一对应
+EXPORT_COLUMNS = (
+    'id', 'name', 'description', 'priority', 'status', 'steps', 'expected_results',
+    'project', 'creator', 'created_at', 'updated_at'
+)
+
+# 每批读取的行数
+EXPORT_CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# 计算列宽时采样的行数
+XLSX_WIDTH_SAMPLE_SIZE = 200
+
+# 列宽上限，避免长文本把列撑得过宽
+XLSX_MAX_COLUMN_WIDTH = 80
+
+# 临时文件超过该大小后转存到磁盘
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+# 增量导出每次返回的默认行数和最大行数
+DELTA_DEFAULT_LIMIT = 1000
+DELTA_MAX_LIMIT = 10000
+
+# 增量导出的安全窗口(秒)，可通过settings.TESTCASE_DELTA_SAFETY_WINDOW配置；
+# 只返回更新时间早于当前时间减去窗口的数据，窗口需大于最长事务时长与各应用服务器的时钟偏差之和
+DEFAULT_DELTA_SAFETY_WINDOW = 5
+
+
+class Echo:
+    """
+    伪文件对象
+
+    csv.writer只需要write方法，这里直接返回写入的内容供生成器产出
+    """
+
+    def write(self, value):
+        """
+        返回写入的内容
+
+        Args:
+            value: 写入的字符串
+
+        Returns:
+            str: 原样返回的字符串
+        """
+        return value
+
+
+def iter_chunked(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    按主键分批遍历查询集
+
+    使用 id < 上一批最小id 的键集条件逐批读取，每批都是一次索引范围扫描，
+    内存占用只与批大小有关，且不依赖数据库驱动是否支持服务端游标
+
+    Args:
+        queryset: 测试用例查询集
+        chunk_size (int): 每批读取的行数
+
+    Yields:
+        tuple: 按EXPORT_FIELDS顺序排列的字段值
+    """
+    queryset = queryset.order_by('-id').values_list(*EXPORT_FIELDS)
+    last_id = None
+    while True:
+        batch = queryset if last_id is None else queryset.filter(id__lt=last_id)
+        rows = list(batch[:chunk_size])
+        if not rows:
+            break
+        yield from rows
+        if len(rows) < chunk_size:
+            break
+        last_id = rows[-1][0]
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    生成导出用的数据行
+
+    Args:
+        queryset: 测试用例查询集
+        chunk_size (int): 每批读取的行数
+
+    Yields:
+        list: 与EXPORT_HEADERS对应的一行数据
+    """
+    # 提前解析选项的显示名称，避免逐行调用get_xxx_display
+    priority_labels = {key: str(label) for key, label in TestCase.PRIORITY_CHOICES}
+    status_labels = {key: str(label) for key, label in TestCase.STATUS_CHOICES}
+
+    for (case_id, name, description, priority, case_status, steps, expected_results,
+         project_name, creator_name, created_at, updated_at) in iter_chunked(queryset, chunk_size):
+        yield [
+            case_id,
+            name,
+            description,
+            priority_labels.get(priority, priority),
+            status_labels.get(case_status, case_status),
+            steps,
+            expected_results,
+            project_name,
+            creator_name,
+            created_at,
+            updated_at
+        ]
+
+
+def write_csv(queryset, fileobj):
+    """
+    把测试用例以CSV格式写入文件对象
+
+    Args:
+        queryset: 测试用例查询集
+        fileobj: 以文本模式打开的文件对象
+
+    Returns:
+        int: 写入的数据行数
+    """
+    writer = csv.writer(fileobj)
+    writer.writerow(EXPORT_HEADERS)
+    row_count = 0
+    for row in iter_export_rows(queryset):
+        writer.writerow(row)
+        row_count += 1
+    return row_count
+
+
+def write_xlsx(queryset, fileobj, sheet_name='测试用例'):
+    """
+    把测试用例以Excel格式写入文件对象
+
+    使用xlsxwriter的constant_memory模式逐行写出，已写出的行不会保留在内存中；
+    列宽根据表头和前XLSX_WIDTH_SAMPLE_SIZE行估算，不扫描全部数据
+
+    Args:
+        queryset: 测试用例查询集
+        fileobj: 以二进制模式打开的文件对象
+        sheet_name (str): 工作表名称
+
+    Returns:
+        int: 写入的数据行数
+    """
+    workbook = xlsxwriter.Workbook(fileobj, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'remove_timezone': True,
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True, 'border': 1})
+
+    rows = iter_export_rows(queryset)
+    sample = list(itertools.islice(rows, XLSX_WIDTH_SAMPLE_SIZE))
+
+    # 设置列宽为标题长度和采样内容最大长度的1.2倍
+    widths = [len(header) for header in EXPORT_HEADERS]
+    for row in sample:
+        for i, value in enumerate(row):
+            if value is not None:
+                widths[i] = max(widths[i], len(str(value)))
+    for i, width in enumerate(widths):
+        worksheet.set_column(i, i, min(width * 1.2, XLSX_MAX_COLUMN_WIDTH))
+
+    worksheet.write_row(0, 0, EXPORT_HEADERS, header_format)
+    row_count = 0
+    for row_count, row in enumerate(itertools.chain(sample, rows), start=1):
+        # Excel不支持带时区的时间，转换为本地时间后写入
+        worksheet.write_row(row_count, 0, [
+            timezone.localtime(value) if isinstance(value, datetime.datetime) else value
+            for value in row
+        ])
+
+    workbook.close()
+    return row_count
+
+
+class ExportFormat:
+    """
+    导出格式基类
+
+    每种导出格式声明文件扩展名、内容类型，并实现写入文件的方法；
+    streaming为True的格式还需要实现iter_content，以便边查询边输出
+    """
+    name = None
+    aliases = ()
+    extension = None
+    content_type = None
+    binary = False
+    streaming = False
+
+    def write(self, queryset, fileobj):
+        """
+        把测试用例写入文件对象
+
+        Args:
+            queryset: 测试用例查询集
+            fileobj: 文件对象，binary为True时以二进制模式打开
+
+        Returns:
+            int: 写入的数据行数
+        """
+        raise NotImplementedError
+
+    def iter_content(self, queryset):
+        """
+        逐块生成导出内容
+
+        Args:
+            queryset: 测试用例查询集
+
+        Yields:
+            str: 一块导出内容
+        """
+        raise NotImplementedError
+
+
+# 导出格式注册表，键为格式名称或别名
+EXPORT_FORMATS = {}
+
+DEFAULT_EXPORT_FORMAT = 'excel'
+
+
+def register_export_format(cls):
+    """
+    注册导出格式
+
+    Args:
+        cls: ExportFormat子类
+
+    Returns:
+        class: 原样返回的类，便于作为装饰器使用
+    """
+    instance = cls()
+    for name in (cls.name,) + tuple(cls.aliases):
+        EXPORT_FORMATS[name] = instance
+    return cls
+
+
+def get_export_format(name):
+    """
+    根据名称获取导出格式
+
+    Args:
+        name (str): 格式名称或别名，为空时使用默认格式
+
+    Returns:
+        ExportFormat: 导出格式，不支持时返回None
+    """
+    return EXPORT_FORMATS.get((name or DEFAULT_EXPORT_FORMAT).lower())
+
+
+@register_export_format
+class CsvExportFormat(ExportFormat):
+    """
+    CSV导出格式
+    """
+    name = 'csv'
+    extension = 'csv'
+    content_type = 'text/csv'
+    streaming = True
+
+    def write(self, queryset, fileobj):
+        return write_csv(queryset, fileobj)
+
+    def iter_content(self, queryset):
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_HEADERS)
+        for row in iter_export_rows(queryset):
+            yield writer.writerow(row)
+
+
+@register_export_format
+class XlsxExportFormat(ExportFormat):
+    """
+    Excel导出格式
+    """
+    name = 'excel'
+    aliases = ('xlsx',)
+    extension = 'xlsx'
+    content_type = XLSX_CONTENT_TYPE
+    binary = True
+
+    def write(self, queryset, fileobj):
+        return write_xlsx(queryset, fileobj)
+
+
+@register_export_format
+class JsonLinesExportFormat(ExportFormat):
+    """
+    JSON Lines导出格式
+
+    每行一个JSON对象，字段使用EXPORT_COLUMNS中的英文名称和原始取值
+    """
+    name = 'jsonl'
+    aliases = ('ndjson',)
+    extension = 'jsonl'
+    content_type = 'application/x-ndjson'
+    streaming = True
+
+    def write(self, queryset, fileobj):
+        row_count = 0
+        for line in self.iter_content(queryset):
+            fileobj.write(line)
+            row_count += 1
+        return row_count
+
+    def iter_content(self, queryset):
+        for values in iter_chunked(queryset):
+            yield json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+@register_export_format
+class ParquetExportFormat(ExportFormat):
+    """
+    Parquet导出格式
+
+    按EXPORT_CHUNK_SIZE行组装为pyarrow RecordBatch逐批写入，
+    字段使用EXPORT_COLUMNS中的英文名称和原始取值
+    """
+    name = 'parquet'
+    extension = 'parquet'
+    content_type = 'application/vnd.apache.parquet'
+    binary = True
+
+    def write(self, queryset, fileobj):
+        # pyarrow体积较大，仅在导出Parquet时加载
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('name', pa.string()),
+            ('description', pa.string()),
+            ('priority', pa.string()),
+            ('status', pa.string()),
+            ('steps', pa.string()),
+            ('expected_results', pa.string()),
+            ('project', pa.string()),
+            ('creator', pa.string()),
+            ('created_at', pa.timestamp('us', tz='UTC')),
+            ('updated_at', pa.timestamp('us', tz='UTC')),
+        ])
+
+        rows = iter_chunked(queryset)
+        row_count = 0
+        writer = pq.ParquetWriter(fileobj, schema, compression='snappy')
+        try:
+            while True:
+                batch = list(itertools.islice(rows, EXPORT_CHUNK_SIZE))
+                if not batch:
+                    break
+                columns = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+                writer.write_batch(pa.record_batch(columns, schema=schema))
+                row_count += len(batch)
+        finally:
+            writer.close()
+        return row_count
+
+
+def export_response(queryset, export_format, filename='test_cases'):
+    """
+    构建导出文件响应
+
+    可流式输出的格式边查询边返回；其他格式先写入SpooledTemporaryFile，
+    超过SPOOL_MAX_SIZE后自动转存磁盘，再由FileResponse分块发送
+
+    Args:
+        queryset: 测试用例查询集
+        export_format (ExportFormat): 导出格式
+        filename (str): 不含扩展名的下载文件名
+
+    Returns:
+        HttpResponseBase: 导出文件响应
+    """
+    if export_format.streaming:
+        response = StreamingHttpResponse(export_format.iter_content(queryset), content_type=export_format.content_type)
+    else:
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        export_format.write(queryset, output)
+        output.seek(0)
+        response = FileResponse(output, content_type=export_format.content_type)
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format.extension}"'
+    return response
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    导出接口的内容协商类
+
+    导出接口用format参数指定文件格式，与DRF的URL_FORMAT_OVERRIDE同名，
+    这里忽略该参数，始终使用第一个渲染器，避免返回404
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+def encode_delta_cursor(updated_at, case_id, tombstone_id):
+    """
+    编码增量导出游标
+
+    Args:
+        updated_at (datetime): 已导出的最后一条用例的更新时间
+        case_id (int): 已导出的最后一条用例的ID
+        tombstone_id (int): 已导出的最后一条删除记录的ID
+
+    Returns:
+        str: URL安全的游标字符串
+    """
+    payload = {
+        'updated_at': updated_at.isoformat() if updated_at else None,
+        'id': case_id,
+        'tombstone_id': tombstone_id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_delta_cursor(cursor):
+    """
+    解码增量导出游标
+
+    Args:
+        cursor (str): 游标字符串
+
+    Returns:
+        tuple: (更新时间, 用例ID, 删除记录ID)
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        updated_at = parse_datetime(payload['updated_at']) if payload['updated_at'] else None
+        return updated_at, int(payload['id'] or 0), int(payload['tombstone_id'] or 0)
+    except (TypeError, KeyError, ValueError, AttributeError) as e:
+        raise ValueError('无效的游标') from e
+
+
+def export_delta(queryset, cursor=None, limit=DELTA_DEFAULT_LIMIT, project_id=None):
+    """
+    增量导出测试用例
+
+    按(updated_at, id)键集返回游标之后新增或修改的用例，以及游标之后的删除记录。
+    不带游标时从头导出全部用例，删除记录从安全窗口之前的位置开始计算；
+    has_more为True时应使用next_cursor继续请求
+
+    updated_at由应用写入，晚提交的事务可能带有更早的时间戳。为避免游标越过这些行，
+    只返回updated_at(删除记录为deleted_at)早于当前时间减去安全窗口的数据，
+    窗口内的修改在之后的请求中返回；删除记录可能重复返回，客户端按用例ID处理即可
+
+    Args:
+        queryset: 测试用例查询集
+        cursor (str): 上次返回的next_cursor
+        limit (int): 每次返回的最大行数
+        project_id: 项目ID，用于过滤删除记录
+
+    Returns:
+        dict: 包含修改的用例、删除记录、下一页游标和是否还有数据的字典
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    tombstones = TestCaseTombstone.objects.all()
+    if project_id:
+        tombstones = tombstones.filter(project_id=project_id)
+
+    safety_window = getattr(settings, 'TESTCASE_DELTA_SAFETY_WINDOW', DEFAULT_DELTA_SAFETY_WINDOW)
+    visible_before = timezone.now() - datetime.timedelta(seconds=safety_window)
+    tombstones = tombstones.filter(deleted_at__lt=visible_before)
+
+    if cursor:
+        updated_at, case_id, tombstone_id = decode_delta_cursor(cursor)
+    else:
+        updated_at, case_id = None, 0
+        tombstone_id = TestCaseTombstone.objects.filter(
+            deleted_at__lt=visible_before
+        ).order_by('-id').values_list('id', flat=True).first() or 0
+
+    changed = queryset.filter(updated_at__lt=visible_before).order_by('updated_at', 'id').values_list(*EXPORT_FIELDS)
+    if updated_at is not None:
+        changed = changed.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=case_id))
+    rows = list(changed[:limit + 1])
+
+    deleted = list(
+        tombstones.filter(id__gt=tombstone_id)
+        .order_by('id')
+        .values_list('id', 'case_id', 'deleted_at')[:limit + 1]
+    )
+
+    has_more = len(rows) > limit or len(deleted) > limit
+    rows, deleted = rows[:limit], deleted[:limit]
+
+    if rows:
+        case_id = rows[-1][0]
+        updated_at = rows[-1][-1]
+    if deleted:
+        tombstone_id = deleted[-1][0]
+
+    return {
+        'results': [dict(zip(EXPORT_COLUMNS, values)) for values in rows],
+        'deleted': [{'id': deleted_id, 'deleted_at': deleted_at} for _, deleted_id, deleted_at in deleted],
+        'next_cursor': encode_delta_cursor(updated_at, case_id, tombstone_id),
+        'has_more': has_more,
+    }
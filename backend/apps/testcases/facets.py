@@ -0,0 +1,110 @@
+"""
+测试用例分面统计模块
+
+用一次条件聚合查询统计当前过滤条件下各状态、优先级和项目的用例数，
+结果按过滤条件缓存，测试用例或项目数据变化后自动失效
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import json
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from utils.pagination import get_table_version
+from .models import Project, TestCase
+
+
+# 默认的缓存有效期(秒)，可通过settings.TESTCASE_FACETS_CACHE_TIMEOUT配置
+DEFAULT_FACETS_CACHE_TIMEOUT = 300
+
+FACETS_CACHE_PREFIX = 'testcase_facets'
+
+
+def get_facets_cache_key(params):
+    """
+    计算分面统计的缓存键
+
+    缓存键包含规范化的过滤参数，以及测试用例表和项目表的版本号，
+    任一表通过save或delete修改后版本号变化，旧的缓存不再被命中
+
+    Args:
+        params (dict): 过滤参数
+
+    Returns:
+        str: 缓存键
+    """
+    payload = json.dumps({
+        'params': sorted((key, str(value)) for key, value in params.items()),
+        'versions': [get_table_version(model._meta.db_table) for model in (TestCase, Project)],
+    })
+    return f'{FACETS_CACHE_PREFIX}:{hashlib.sha1(payload.encode()).hexdigest()}'
+
+
+def compute_facets(queryset):
+    """
+    统计分面数据
+
+    按项目分组，同时用条件聚合统计每个项目中各状态和优先级的用例数，
+    一次查询即可得到全部分面，状态和优先级的总数由各项目汇总得到
+
+    Args:
+        queryset: 已过滤的测试用例查询集
+
+    Returns:
+        dict: 包含总数以及按状态、优先级和项目统计的用例数
+    """
+    status_keys = [key for key, _ in TestCase.STATUS_CHOICES]
+    priority_keys = [key for key, _ in TestCase.PRIORITY_CHOICES]
+
+    aggregates = {'total': Count('id')}
+    aggregates.update({f'status_{key}': Count('id', filter=Q(status=key)) for key in status_keys})
+    aggregates.update({f'priority_{key}': Count('id', filter=Q(priority=key)) for key in priority_keys})
+
+    rows = list(
+        queryset.order_by()
+        .values('project_id', 'project__name')
+        .annotate(**aggregates)
+        .order_by('-total', 'project_id')
+    )
+
+    status_labels = dict(TestCase.STATUS_CHOICES)
+    priority_labels = dict(TestCase.PRIORITY_CHOICES)
+
+    return {
+        'total': sum(row['total'] for row in rows),
+        'status': [
+            {'value': key, 'label': str(status_labels[key]), 'count': sum(row[f'status_{key}'] for row in rows)}
+            for key in status_keys
+        ],
+        'priority': [
+            {'value': key, 'label': str(priority_labels[key]), 'count': sum(row[f'priority_{key}'] for row in rows)}
+            for key in priority_keys
+        ],
+        'project': [
+            {'value': row['project_id'], 'label': row['project__name'], 'count': row['total']}
+            for row in rows
+        ],
+    }
+
+
+def get_facets(queryset, params):
+    """
+    获取分面统计，优先读取缓存
+
+    Args:
+        queryset: 已过滤的测试用例查询集
+        params (dict): 生成该查询集使用的过滤参数
+
+    Returns:
+        dict: 分面统计数据
+    """
+    key = get_facets_cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, getattr(settings, 'TESTCASE_FACETS_CACHE_TIMEOUT', DEFAULT_FACETS_CACHE_TIMEOUT))
+    return facets
@@ -0,0 +1,86 @@
+"""
+测试用例过滤模块
+
+提供测试用例查询参数过滤逻辑，供视图和后台任务共用
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from rest_framework.filters import SearchFilter
+from .search import SEARCH_RANK, search_testcases, split_terms
+
+
+# 支持的过滤参数
+TESTCASE_FILTER_PARAMS = ('project', 'status', 'priority', 'keyword')
+
+
+def filter_testcases(queryset, params):
+    """
+    根据查询参数过滤测试用例
+
+    Args:
+        queryset: 测试用例查询集
+        params: 查询参数，支持QueryDict或普通字典
+
+    Returns:
+        QuerySet: 过滤后的测试用例查询集
+    """
+    # 项目过滤
+    project_id = params.get('project')
+    if project_id:
+        queryset = queryset.filter(project_id=project_id)
+
+    # 状态过滤
+    status = params.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+
+    # 优先级过滤
+    priority = params.get('priority')
+    if priority:
+        queryset = queryset.filter(priority=priority)
+
+    # 关键字搜索
+    keyword = params.get('keyword')
+    if keyword:
+        queryset = search_testcases(queryset, keyword)
+
+    return queryset
+
+
+def extract_filter_params(params):
+    """
+    提取支持的过滤参数
+
+    用于把请求中的过滤条件保存下来，在后台任务中重新构建查询集
+
+    Args:
+        params: 查询参数
+
+    Returns:
+        dict: 仅包含非空过滤参数的字典
+    """
+    return {key: params.get(key) for key in TESTCASE_FILTER_PARAMS if params.get(key)}
+
+
+class TestCaseSearchFilter(SearchFilter):
+    """
+    测试用例全文检索过滤器
+
+    search参数使用全文检索代替多字段icontains查询；
+    使用search或keyword检索且未指定ordering时按相关度排序，
+    因此需放在OrderingFilter之后
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        keyword = request.query_params.get(self.search_param)
+        if split_terms(keyword):
+            queryset = search_testcases(queryset, keyword)
+        elif not split_terms(request.query_params.get('keyword')):
+            return queryset
+
+        if not request.query_params.get('ordering'):
+            queryset = queryset.order_by(f'-{SEARCH_RANK}', '-id')
+        return queryset
@@ -0,0 +1,566 @@
+"""
+测试用例导入模块
+
+提供测试用例批量导入的解析、校验和写入逻辑
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import csv
+import codecs
+import itertools
+import openpyxl
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from utils.pagination import bump_table_version
+from .models import TestCase, ImportJob, compute_content_hash
+from .duplicates import compute_signature, find_similar, index_cases
+
+
+# 导入文件中读取的列
+IMPORT_COLUMNS = ('name', 'description', 'priority', 'status', 'steps', 'expected_results')
+
+# 列为空时使用的默认值
+IMPORT_DEFAULTS = {
+    'description': '',
+    'priority': 'P2',
+    'status': 'draft',
+}
+
+# 导入模式
+IMPORT_MODE_ATOMIC = 'atomic'
+IMPORT_MODE_BEST_EFFORT = 'best_effort'
+IMPORT_MODE_UPSERT = 'upsert'
+IMPORT_MODE_CHOICES = ImportJob.MODE_CHOICES
+
+# 第一行是表头，数据从第2行开始
+FIRST_DATA_ROW = 2
+
+# 默认每批写入的行数，可通过settings.TESTCASE_IMPORT_BATCH_SIZE配置
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+
+NAME_MAX_LENGTH = TestCase._meta.get_field('name').max_length
+PRIORITY_VALUES = [key for key, _ in TestCase.PRIORITY_CHOICES]
+STATUS_VALUES = [key for key, _ in TestCase.STATUS_CHOICES]
+
+# upsert模式下内容哈希相同时可被更新的字段
+UPSERT_UPDATE_FIELDS = ('description', 'priority', 'status')
+
+
+class ImportReport:
+    """
+    导入结果报告
+
+    汇总成功导入的数量和每个错误行的行号及原因
+    """
+
+    def __init__(self):
+        self.total_count = None
+        self.processed_count = 0
+        self.created_count = 0
+        self.updated_count = 0
+        self.skipped_count = 0
+        self.row_errors = {}
+        self.similar_cases = {}
+
+    def add_error(self, row, message):
+        """
+        记录某一行的错误
+
+        Args:
+            row (int): 文件中的行号
+            message (str): 错误原因
+        """
+        self.row_errors.setdefault(row, []).append(message)
+
+    def add_similar(self, row, matches):
+        """
+        记录某一行与已有用例近似重复
+
+        Args:
+            row (int): 文件中的行号
+            matches (list): (用例ID, 相似度)元组列表
+        """
+        self.similar_cases[row] = matches
+
+    @property
+    def error_count(self):
+        """
+        获取出错的行数
+
+        Returns:
+            int: 出错的行数
+        """
+        return len(self.row_errors)
+
+    def to_dict(self):
+        """
+        转换为接口返回的数据
+
+        Returns:
+            dict: 包含导入数量和错误明细的字典
+        """
+        rows = sorted(self.row_errors)
+        return {
+            'created_count': self.created_count,
+            'updated_count': self.updated_count,
+            'skipped_count': self.skipped_count,
+            'error_count': self.error_count,
+            'errors': [f"行 {row}: {'；'.join(self.row_errors[row])}" for row in rows],
+            'error_details': [{'row': row, 'errors': self.row_errors[row]} for row in rows],
+            'similar_count': len(self.similar_cases),
+            'similar_cases': [
+                {
+                    'row': row,
+                    'cases': [{'id': case_id, 'similarity': round(similarity, 3)} for case_id, similarity in matches],
+                }
+                for row, matches in sorted(self.similar_cases.items())
+            ],
+        }
+
+
+def get_import_batch_size(batch_size=None):
+    """
+    获取每批写入的行数
+
+    Args:
+        batch_size (int): 请求中指定的批大小
+
+    Returns:
+        int: 批大小
+    """
+    return batch_size or getattr(settings, 'TESTCASE_IMPORT_BATCH_SIZE', DEFAULT_IMPORT_BATCH_SIZE)
+
+
+def iter_text_lines(file, encoding='utf-8-sig'):
+    """
+    增量解码文本文件
+
+    按块读取上传文件并用增量解码器解码，只在内存中保留当前块和未结束的一行
+
+    Args:
+        file: 上传的文件对象
+        encoding (str): 文件编码，utf-8-sig可兼容带BOM的文件
+
+    Yields:
+        str: 以换行符结尾的一行文本
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    for chunk in file.chunks():
+        pending += decoder.decode(chunk)
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def cell_to_str(value):
+    """
+    把单元格的值转换为字符串
+
+    Args:
+        value: 单元格的值
+
+    Returns:
+        str: 字符串形式的值，空单元格返回空字符串
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def iter_csv_rows(file):
+    """
+    逐行读取CSV文件
+
+    Args:
+        file: 上传的CSV文件
+
+    Yields:
+        tuple: (行号, 以表头为键的行数据)
+    """
+    reader = csv.reader(iter_text_lines(file))
+    header = [column.strip() for column in next(reader, [])]
+    for row_number, values in enumerate(reader, start=FIRST_DATA_ROW):
+        yield row_number, dict(zip(header, values))
+
+
+def iter_xlsx_rows(file):
+    """
+    逐行读取xlsx文件
+
+    使用openpyxl的只读模式按行迭代，不会把整个工作表加载到内存
+
+    Args:
+        file: 上传的xlsx文件
+
+    Yields:
+        tuple: (行号, 以表头为键的行数据)
+    """
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [cell_to_str(value).strip() for value in next(rows, ())]
+        for row_number, values in enumerate(rows, start=FIRST_DATA_ROW):
+            yield row_number, dict(zip(header, (cell_to_str(value) for value in values)))
+    finally:
+        workbook.close()
+
+
+def iter_xls_rows(file):
+    """
+    读取旧版xls文件
+
+    openpyxl不支持xls格式，仍由pandas整体读取
+
+    Args:
+        file: 上传的xls文件
+
+    Yields:
+        tuple: (行号, 以表头为键的行数据)
+    """
+    df = pd.read_excel(file, dtype=str)
+    for row_number, record in enumerate(df.to_dict('records'), start=FIRST_DATA_ROW):
+        yield row_number, record
+
+
+def iter_import_rows(file):
+    """
+    根据文件类型逐行读取导入文件
+
+    Args:
+        file: 上传的CSV或Excel文件
+
+    Returns:
+        iterator: (行号, 行数据)迭代器
+    """
+    ext = file.name.split('.')[-1].lower()
+    if ext == 'csv':
+        return iter_csv_rows(file)
+    if ext == 'xlsx':
+        return iter_xlsx_rows(file)
+    return iter_xls_rows(file)
+
+
+def iter_frames(rows, batch_size):
+    """
+    把逐行读取的数据按批组装为DataFrame
+
+    Args:
+        rows: (行号, 行数据)迭代器
+        batch_size (int): 每批的行数
+
+    Yields:
+        DataFrame: 以文件行号为索引的一批数据
+    """
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        row_numbers, records = zip(*batch)
+        yield pd.DataFrame.from_records(list(records), index=list(row_numbers), columns=IMPORT_COLUMNS)
+
+
+def prepare_frame(df):
+    """
+    规范化导入数据
+
+    补齐缺失列，去除首尾空白，填充默认值，并丢弃空行
+
+    Args:
+        df: 以文件行号为索引的原始数据
+
+    Returns:
+        DataFrame: 规范化后的数据
+    """
+    df = df.reindex(columns=IMPORT_COLUMNS)
+    df = df.fillna('').astype(str).apply(lambda column: column.str.strip())
+
+    # 丢弃所有列都为空的行，行号保持不变
+    df = df[(df != '').any(axis=1)].copy()
+
+    for column, default in IMPORT_DEFAULTS.items():
+        df[column] = df[column].mask(df[column] == '', default)
+    return df
+
+
+def validate_frame(df, report):
+    """
+    校验导入数据
+
+    每条规则对整列做一次向量化判断，错误按行号写入报告
+
+    Args:
+        df: 规范化后的数据
+        report (ImportReport): 导入结果报告
+
+    Returns:
+        DataFrame: 校验通过的数据
+    """
+    checks = [
+        (df['name'] == '', lambda row: '用例名称不能为空'),
+        (df['name'].str.len() > NAME_MAX_LENGTH, lambda row: f'用例名称不能超过{NAME_MAX_LENGTH}个字符'),
+        (df['steps'] == '', lambda row: '测试步骤不能为空'),
+        (df['expected_results'] == '', lambda row: '预期结果不能为空'),
+        (~df['priority'].isin(PRIORITY_VALUES), lambda row: f"无效的优先级: {df.at[row, 'priority']}"),
+        (~df['status'].isin(STATUS_VALUES), lambda row: f"无效的状态: {df.at[row, 'status']}"),
+    ]
+
+    invalid = pd.Series(False, index=df.index)
+    for mask, message in checks:
+        for row in mask[mask].index:
+            report.add_error(int(row), message(row))
+        invalid |= mask
+
+    return df[~invalid]
+
+
+def build_cases(batch, project, creator):
+    """
+    根据一批数据构建测试用例对象
+
+    Args:
+        batch: 一批数据
+        project: 所属项目
+        creator: 创建者
+
+    Returns:
+        list: (行号, TestCase)元组列表
+    """
+    return [
+        (int(row), TestCase(
+            project=project,
+            creator=creator,
+            content_hash=compute_content_hash(record['name'], record['steps'], record['expected_results']),
+            **record
+        ))
+        for row, record in zip(batch.index, batch.to_dict('records'))
+    ]
+
+
+def check_similar_cases(cases, project, report):
+    """
+    检查待写入的用例是否与项目中已有用例近似重复
+
+    只记录提示，不阻止写入；可通过settings.TESTCASE_DUPLICATE_CHECK关闭
+
+    Args:
+        cases (list): (行号, TestCase)元组列表
+        project: 所属项目
+        report (ImportReport): 导入结果报告
+    """
+    if not cases or not getattr(settings, 'TESTCASE_DUPLICATE_CHECK', True):
+        return
+
+    signatures = {}
+    for row, case in cases:
+        signature = compute_signature(case.name, case.steps, case.expected_results)
+        if signature is not None:
+            signatures[row] = signature
+
+    for row, matches in find_similar(project.id, signatures).items():
+        report.add_similar(row, matches)
+
+
+def index_inserted_cases(cases, project):
+    """
+    为批量写入的用例建立MinHash签名
+
+    bulk_create不会触发信号，也不一定回填主键，按内容哈希查出尚未建立签名的新用例
+
+    Args:
+        cases (list): (行号, TestCase)元组列表
+        project: 所属项目
+    """
+    hashes = list({case.content_hash for _, case in cases})
+    index_cases(list(
+        TestCase.objects.filter(project=project, content_hash__in=hashes, minhash_signature__isnull=True)
+        .only('id', 'project_id', 'name', 'steps', 'expected_results')
+    ))
+
+
+def insert_batch_best_effort(cases, project, report):
+    """
+    尽力写入一批测试用例
+
+    写入前检查近似重复，整批写入失败时逐行重试，定位具体出错的行
+
+    Args:
+        cases (list): (行号, TestCase)元组列表
+        project: 所属项目
+        report (ImportReport): 导入结果报告
+    """
+    if not cases:
+        return
+
+    check_similar_cases(cases, project, report)
+    try:
+        with transaction.atomic():
+            TestCase.objects.bulk_create([case for _, case in cases])
+            index_inserted_cases(cases, project)
+        report.created_count += len(cases)
+        return
+    except Exception:
+        pass
+
+    for row, case in cases:
+        try:
+            with transaction.atomic():
+                case.save()
+            report.created_count += 1
+        except Exception as e:
+            report.add_error(row, str(e))
+
+
+def update_batch_best_effort(cases, report):
+    """
+    尽力更新一批测试用例
+
+    整批更新失败时逐行重试，定位具体出错的行
+
+    Args:
+        cases (list): (行号, TestCase)元组列表
+        report (ImportReport): 导入结果报告
+    """
+    if not cases:
+        return
+
+    fields = list(UPSERT_UPDATE_FIELDS) + ['updated_at']
+    try:
+        with transaction.atomic():
+            TestCase.objects.bulk_update([case for _, case in cases], fields)
+        report.updated_count += len(cases)
+        return
+    except Exception:
+        pass
+
+    for row, case in cases:
+        try:
+            with transaction.atomic():
+                case.save(update_fields=fields)
+            report.updated_count += 1
+        except Exception as e:
+            report.add_error(row, str(e))
+
+
+def upsert_batch(batch, project, creator, report):
+    """
+    按内容哈希写入一批测试用例
+
+    用一次IN查询找出项目中内容哈希相同的已有用例:
+    - 没有相同内容的用例时新增
+    - 有相同内容的用例且其他字段不同时更新
+    - 其他字段也相同或与本批前面的行重复时跳过
+
+    Args:
+        batch: 校验通过的一批数据
+        project: 所属项目
+        creator: 创建者
+        report (ImportReport): 导入结果报告
+    """
+    hashes = pd.Series([
+        compute_content_hash(name, steps, expected_results)
+        for name, steps, expected_results in zip(batch['name'], batch['steps'], batch['expected_results'])
+    ], index=batch.index, dtype=object)
+
+    # 同一批中内容相同的行只保留第一行
+    duplicated = hashes.duplicated()
+    report.skipped_count += int(duplicated.sum())
+    batch, hashes = batch[~duplicated], hashes[~duplicated]
+
+    existing = {
+        case.content_hash: case
+        for case in TestCase.objects.filter(project=project, content_hash__in=list(hashes)).order_by('id')
+        .only('id', 'content_hash', *UPSERT_UPDATE_FIELDS)
+    }
+
+    is_existing = hashes.isin(list(existing))
+    insert_batch_best_effort(build_cases(batch[~is_existing], project, creator), project, report)
+
+    now = timezone.now()
+    changed = []
+    for row, record in zip(batch.index[is_existing], batch[is_existing].to_dict('records')):
+        case = existing[hashes[row]]
+        if all((getattr(case, field) or '') == record[field] for field in UPSERT_UPDATE_FIELDS):
+            report.skipped_count += 1
+            continue
+        for field in UPSERT_UPDATE_FIELDS:
+            setattr(case, field, record[field])
+        # bulk_update不会触发auto_now，显式更新修改时间以便增量导出识别
+        case.updated_at = now
+        changed.append((int(row), case))
+    update_batch_best_effort(changed, report)
+
+
+def import_testcases(file, project, creator, mode=IMPORT_MODE_BEST_EFFORT, batch_size=None, progress=None):
+    """
+    批量导入测试用例
+
+    文件被逐行解析并按批组装，每批先做向量化校验，再使用bulk_create写入，
+    新增的用例会与项目中已有用例做近似重复检查，内存占用只与批大小有关:
+    - atomic模式下所有批次在同一个事务中写入，出现错误行后不再写入，
+      继续校验剩余数据以报告全部错误，最后整体回滚
+    - best_effort模式下跳过错误行，每批单独提交
+    - upsert模式下跳过错误行，按内容哈希决定新增、更新或跳过，每批单独提交
+
+    Args:
+        file: 上传的CSV或Excel文件
+        project: 所属项目
+        creator: 创建者
+        mode (str): 导入模式
+        batch_size (int): 每批写入的行数
+        progress: 进度回调，每处理完一批后以ImportReport为参数调用；
+            atomic模式下事务提交前的进度对其他连接不可见，只在结束时回调
+
+    Returns:
+        ImportReport: 导入结果报告
+    """
+    batch_size = get_import_batch_size(batch_size)
+    report = ImportReport()
+    frames = iter_frames(iter_import_rows(file), batch_size)
+
+    if mode == IMPORT_MODE_ATOMIC:
+        with transaction.atomic():
+            for frame in frames:
+                frame = prepare_frame(frame)
+                report.processed_count += len(frame)
+                valid = validate_frame(frame, report)
+                if not report.error_count:
+                    cases = build_cases(valid, project, creator)
+                    check_similar_cases(cases, project, report)
+                    TestCase.objects.bulk_create([case for _, case in cases])
+                    index_inserted_cases(cases, project)
+                    report.created_count += len(cases)
+            if report.error_count:
+                transaction.set_rollback(True)
+                report.created_count = 0
+        report.total_count = report.processed_count
+        bump_table_version(TestCase)
+        if progress:
+            progress(report)
+        return report
+
+    for frame in frames:
+        frame = prepare_frame(frame)
+        report.processed_count += len(frame)
+        valid = validate_frame(frame, report)
+        if mode == IMPORT_MODE_UPSERT:
+            upsert_batch(valid, project, creator, report)
+        else:
+            insert_batch_best_effort(build_cases(valid, project, creator), project, report)
+        if progress:
+            progress(report)
+    report.total_count = report.processed_count
+    # bulk_create和bulk_update不会触发信号，手动使缓存的计数和分面统计失效
+    bump_table_version(TestCase)
+    return report
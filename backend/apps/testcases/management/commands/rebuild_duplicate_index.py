@@ -0,0 +1,28 @@
+"""
+重建测试用例近似重复索引的管理命令
+
+迁移0008只创建签名表和LSH桶表，已有的测试用例需要执行本命令建立索引:
+    python manage.py rebuild_duplicate_index --missing
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.core.management.base import BaseCommand
+from apps.testcases.duplicates import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    重建测试用例的MinHash签名和LSH桶
+    """
+    help = '重建测试用例的近似重复索引，--missing只为缺少签名的用例补建'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='只处理指定项目的用例')
+        parser.add_argument('--missing', action='store_true', help='只处理还没有签名的用例')
+
+    def handle(self, *args, **options):
+        count = rebuild_index(options['project'], missing_only=options['missing'])
+        self.stdout.write(f'已建立索引的用例数: {count}')
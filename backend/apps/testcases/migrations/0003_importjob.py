@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 14:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('testcases', '0002_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='导入文件')),
+                ('mode', models.CharField(choices=[('atomic', '全部成功或全部回滚'), ('best_effort', '跳过错误行继续导入')], default='best_effort', max_length=20, verbose_name='导入模式')),
+                ('batch_size', models.PositiveIntegerField(blank=True, null=True, verbose_name='批大小')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '执行中'), ('completed', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('total_count', models.IntegerField(blank=True, null=True, verbose_name='总行数')),
+                ('processed_count', models.IntegerField(default=0, verbose_name='已处理行数')),
+                ('created_count', models.IntegerField(default=0, verbose_name='成功行数')),
+                ('failed_count', models.IntegerField(default=0, verbose_name='失败行数')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='错误明细')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name='错误信息')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='创建者')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='testcases.project', verbose_name='所属项目')),
+            ],
+            options={
+                'verbose_name': '导入任务',
+                'verbose_name_plural': '导入任务',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
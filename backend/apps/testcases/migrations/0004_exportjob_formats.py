@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0003_importjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='export_format',
+            field=models.CharField(choices=[('excel', 'Excel'), ('csv', 'CSV'), ('jsonl', 'JSON Lines'), ('parquet', 'Parquet')], default='excel', max_length=20, verbose_name='导出格式'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0004_exportjob_formats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestCaseTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case_id', models.BigIntegerField(verbose_name='用例ID')),
+                ('project_id', models.BigIntegerField(db_index=True, verbose_name='项目ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='删除时间')),
+            ],
+            options={
+                'verbose_name': '测试用例删除记录',
+                'verbose_name_plural': '测试用例删除记录',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='testcase',
+            index=models.Index(fields=['updated_at', 'id'], name='testcase_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:47
+
+import hashlib
+import unicodedata
+from django.db import migrations, models
+
+
+def compute_content_hash(name, steps, expected_results):
+    """
+    计算测试用例的内容哈希
+
+    复制自迁移创建时的apps.testcases.models.compute_content_hash，
+    之后修改模型中的算法不会影响本迁移的结果
+    """
+    parts = [' '.join(unicodedata.normalize('NFKC', value or '').split()) for value in (name, steps, expected_results)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def fill_content_hash(apps, schema_editor):
+    """
+    为已有的测试用例计算内容哈希
+    """
+    TestCase = apps.get_model('testcases', 'TestCase')
+    last_id = 0
+    while True:
+        cases = list(
+            TestCase.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'name', 'steps', 'expected_results')[:1000]
+        )
+        if not cases:
+            break
+        for case in cases:
+            case.content_hash = compute_content_hash(case.name, case.steps, case.expected_results)
+        TestCase.objects.bulk_update(cases, ['content_hash'])
+        last_id = cases[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0005_testcase_delta_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='skipped_count',
+            field=models.IntegerField(default=0, verbose_name='跳过行数'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='updated_count',
+            field=models.IntegerField(default=0, verbose_name='更新行数'),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64, verbose_name='内容哈希'),
+        ),
+        migrations.AlterField(
+            model_name='importjob',
+            name='mode',
+            field=models.CharField(choices=[('atomic', '全部成功或全部回滚'), ('best_effort', '跳过错误行继续导入'), ('upsert', '按内容去重，新增或更新')], default='best_effort', max_length=20, verbose_name='导入模式'),
+        ),
+        migrations.AddIndex(
+            model_name='testcase',
+            index=models.Index(fields=['project', 'content_hash'], name='testcase_project_hash_idx'),
+        ),
+        migrations.RunPython(fill_content_hash, migrations.RunPython.noop),
+    ]
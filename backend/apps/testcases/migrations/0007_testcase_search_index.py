@@ -0,0 +1,83 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:20
+
+from django.db import migrations
+
+# 本迁移创建时的检索字段和索引名称，之后修改apps.testcases.search不会影响本迁移
+SEARCH_COLUMNS = 'name, description, steps, expected_results'
+SQLITE_FTS_TABLE = 'testcases_testcase_fts'
+MYSQL_INDEX_NAME = 'testcase_fulltext_idx'
+
+SQLITE_INSTALL_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5({SEARCH_COLUMNS}, "
+    f"content='testcases_testcase', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON testcases_testcase BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {SEARCH_COLUMNS}) "
+    f"VALUES (new.id, new.name, new.description, new.steps, new.expected_results); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON testcases_testcase BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {SEARCH_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.name, old.description, old.steps, old.expected_results); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE ON testcases_testcase BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {SEARCH_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.name, old.description, old.steps, old.expected_results); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {SEARCH_COLUMNS}) "
+    f"VALUES (new.id, new.name, new.description, new.steps, new.expected_results); END",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL_SQL = [
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}",
+]
+
+MYSQL_INDEX_EXISTS_SQL = (
+    "SELECT 1 FROM information_schema.statistics "
+    "WHERE table_schema = DATABASE() AND table_name = 'testcases_testcase' AND index_name = %s"
+)
+
+
+def install_search_index(apps, schema_editor):
+    """
+    创建全文索引
+
+    SQLite创建FTS5外部内容表和同步触发器，MySQL创建ngram分词的FULLTEXT索引，其他数据库不需要索引
+    """
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for sql in SQLITE_INSTALL_SQL:
+                cursor.execute(sql)
+        elif connection.vendor == 'mysql':
+            cursor.execute(MYSQL_INDEX_EXISTS_SQL, [MYSQL_INDEX_NAME])
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    f"ALTER TABLE testcases_testcase ADD FULLTEXT INDEX {MYSQL_INDEX_NAME} "
+                    f"({SEARCH_COLUMNS}) WITH PARSER ngram"
+                )
+
+
+def uninstall_search_index(apps, schema_editor):
+    """
+    删除全文索引
+    """
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for sql in SQLITE_UNINSTALL_SQL:
+                cursor.execute(sql)
+        elif connection.vendor == 'mysql':
+            cursor.execute(MYSQL_INDEX_EXISTS_SQL, [MYSQL_INDEX_NAME])
+            if cursor.fetchone() is not None:
+                cursor.execute(f"ALTER TABLE testcases_testcase DROP INDEX {MYSQL_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0006_testcase_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
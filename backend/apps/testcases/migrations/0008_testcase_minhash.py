@@ -0,0 +1,43 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0007_testcase_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestCaseSignature',
+            fields=[
+                ('case', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='minhash_signature', serialize=False, to='testcases.testcase', verbose_name='测试用例')),
+                ('project_id', models.BigIntegerField(verbose_name='项目ID')),
+                ('signature', models.BinaryField(verbose_name='签名')),
+            ],
+            options={
+                'verbose_name': '测试用例签名',
+                'verbose_name_plural': '测试用例签名',
+            },
+        ),
+        migrations.CreateModel(
+            name='TestCaseLshBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.BigIntegerField(verbose_name='项目ID')),
+                ('bucket', models.BigIntegerField(verbose_name='桶编号')),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='testcases.testcase', verbose_name='测试用例')),
+            ],
+            options={
+                'verbose_name': '测试用例LSH桶',
+                'verbose_name_plural': '测试用例LSH桶',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='testcaselshbucket',
+            index=models.Index(fields=['project_id', 'bucket'], name='lshbucket_project_bucket_idx'),
+        ),
+    ]
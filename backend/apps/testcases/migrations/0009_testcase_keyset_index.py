@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0008_testcase_minhash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testcase',
+            index=models.Index(fields=['created_at', 'id'], name='testcase_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0009_testcase_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testcase',
+            index=models.Index(fields=['project', 'status', 'priority', 'created_at'], name='testcase_proj_stat_prio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testcase',
+            index=models.Index(fields=['status', 'created_at'], name='testcase_status_created_idx'),
+        ),
+    ]
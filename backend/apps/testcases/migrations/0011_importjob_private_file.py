@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:31
+
+import apps.testcases.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcases', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importjob',
+            name='file',
+            field=models.FileField(storage=apps.testcases.models.get_private_storage, upload_to='imports/', verbose_name='导入文件'),
+        ),
+    ]
@@ -6,9 +6,96 @@
 最后修改: 2023-06-10
 """
 
-from django.db import models
+import hashlib
+import unicodedata
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import connections, models, router, transaction
+from django.db.models import DateTimeField, Value
+from django.dispatch import Signal
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.users.models import User
+from utils.pagination import bump_table_version
+
+
+# 参与计算内容哈希的字段
+CONTENT_HASH_FIELDS = ('name', 'steps', 'expected_results')
+
+
+def get_private_storage():
+    """
+    获取不对外公开的文件存储
+
+    文件保存在PRIVATE_MEDIA_ROOT下，不能通过媒体文件URL访问
+
+    Returns:
+        FileSystemStorage: 文件存储
+    """
+    return FileSystemStorage(location=settings.PRIVATE_MEDIA_ROOT)
+
+
+def compute_content_hash(name, steps, expected_results):
+    """
+    计算测试用例的内容哈希
+
+    各字段先做Unicode规范化并合并连续空白，只有格式差异的用例得到相同的哈希
+
+    Args:
+        name (str): 用例名称
+        steps (str): 测试步骤
+        expected_results (str): 预期结果
+
+    Returns:
+        str: SHA-256十六进制摘要
+    """
+    parts = [' '.join(unicodedata.normalize('NFKC', value or '').split()) for value in (name, steps, expected_results)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+# 删除测试用例前发送，queryset参数为将被删除的测试用例；
+# 测试用例没有逐行的删除信号，级联删除时仍可使用快速删除，其他应用通过该信号批量处理关联数据
+testcases_deleting = Signal()
+
+
+def prepare_testcase_delete(queryset):
+    """
+    删除测试用例前的批量处理
+
+    用一条INSERT ... SELECT语句为将被删除的用例写入删除记录，发送testcases_deleting信号，
+    并使测试用例的缓存计数失效；
+    调用方负责把它与删除放在同一事务中
+
+    Args:
+        queryset: 将被删除的测试用例查询集
+    """
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    select = queryset.order_by().values_list(
+        'id', 'project_id', Value(timezone.now(), output_field=DateTimeField())
+    )
+    sql, params = select.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(TestCaseTombstone._meta.db_table)} "
+            f"({quote('case_id')}, {quote('project_id')}, {quote('deleted_at')}) {sql}",
+            params
+        )
+    testcases_deleting.send(sender=TestCase, queryset=queryset)
+    bump_table_version(TestCase)
+
+
+class TestCaseQuerySet(models.QuerySet):
+    """
+    测试用例查询集
+
+    批量删除时先批量写入删除记录
+    """
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            prepare_testcase_delete(self)
+            return super().delete()
 
 
 class Project(models.Model):
@@ -62,15 +149,193 @@ class TestCase(models.Model):
     status = models.CharField(_('状态'), max_length=20, choices=STATUS_CHOICES, default='draft')
     steps = models.TextField(_('测试步骤'))
     expected_results = models.TextField(_('预期结果'))
+    content_hash = models.CharField(_('内容哈希'), max_length=64, blank=True, default='', editable=False)
     project = models.ForeignKey(Project, verbose_name=_('所属项目'), on_delete=models.CASCADE, related_name='test_cases')
     creator = models.ForeignKey(User, verbose_name=_('创建者'), on_delete=models.CASCADE, related_name='created_test_cases')
     created_at = models.DateTimeField(_('创建时间'), auto_now_add=True)
     updated_at = models.DateTimeField(_('更新时间'), auto_now=True)
 
+    objects = TestCaseQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('测试用例')
         verbose_name_plural = _('测试用例')
         ordering = ['-created_at']
+        indexes = [
+            # 增量导出按(updated_at, id)键集分页
+            models.Index(fields=['updated_at', 'id'], name='testcase_updated_id_idx'),
+            # 列表键集分页按(created_at, id)排序
+            models.Index(fields=['created_at', 'id'], name='testcase_created_id_idx'),
+            # 按内容哈希导入时在项目内查找已有用例
+            models.Index(fields=['project', 'content_hash'], name='testcase_project_hash_idx'),
+            # 列表按项目、状态、优先级过滤并按创建时间排序
+            models.Index(fields=['project', 'status', 'priority', 'created_at'], name='testcase_proj_stat_prio_idx'),
+            # 不指定项目时按状态过滤并按创建时间排序
+            models.Index(fields=['status', 'created_at'], name='testcase_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.name 
+
+    def save(self, *args, **kwargs):
+        """
+        保存测试用例
+
+        保存前重新计算内容哈希
+        """
+        self.content_hash = compute_content_hash(self.name, self.steps, self.expected_results)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(CONTENT_HASH_FIELDS):
+            kwargs['update_fields'] = set(update_fields) | {'content_hash'}
+        super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        删除测试用例
+
+        删除前写入删除记录
+        """
+        using = using or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            prepare_testcase_delete(TestCase.objects.using(using).filter(pk=self.pk))
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class TestCaseTombstone(models.Model):
+    """
+    测试用例删除记录模型
+    
+    测试用例被删除时写入一条记录，供增量导出告知下游删除了哪些用例
+    """
+    case_id = models.BigIntegerField(_('用例ID'))
+    project_id = models.BigIntegerField(_('项目ID'), db_index=True)
+    deleted_at = models.DateTimeField(_('删除时间'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('测试用例删除记录')
+        verbose_name_plural = _('测试用例删除记录')
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.case_id} - {self.deleted_at}"
+
+class TestCaseSignature(models.Model):
+    """
+    测试用例MinHash签名模型
+    
+    保存用例文本的MinHash签名，用于估算用例之间的相似度
+    """
+    case = models.OneToOneField(TestCase, verbose_name=_('测试用例'), on_delete=models.CASCADE,
+                                primary_key=True, related_name='minhash_signature')
+    project_id = models.BigIntegerField(_('项目ID'))
+    signature = models.BinaryField(_('签名'))
+
+    class Meta:
+        verbose_name = _('测试用例签名')
+        verbose_name_plural = _('测试用例签名')
+
+    def __str__(self):
+        return str(self.case_id)
+
+
+class TestCaseLshBucket(models.Model):
+    """
+    测试用例LSH桶模型
+    
+    每个用例的签名分段后各写入一个桶，同一项目中落入相同桶的用例互为相似候选
+    """
+    case = models.ForeignKey(TestCase, verbose_name=_('测试用例'), on_delete=models.CASCADE, related_name='lsh_buckets')
+    project_id = models.BigIntegerField(_('项目ID'))
+    bucket = models.BigIntegerField(_('桶编号'))
+
+    class Meta:
+        verbose_name = _('测试用例LSH桶')
+        verbose_name_plural = _('测试用例LSH桶')
+        indexes = [
+            models.Index(fields=['project_id', 'bucket'], name='lshbucket_project_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.case_id} - {self.bucket}"
+
+
+class ExportJob(models.Model):
+    """
+    导出任务模型
+    
+    存储后台导出任务的过滤条件、执行状态和生成的文件
+    """
+    FORMAT_CHOICES = (
+        ('excel', 'Excel'),
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+        ('parquet', 'Parquet'),
+    )
+    export_format = models.CharField(_('导出格式'), max_length=20, choices=FORMAT_CHOICES, default='excel')
+    params = models.JSONField(_('过滤参数'), default=dict, blank=True)
+    STATUS_CHOICES = (
+        ('pending', _('等待中')),
+        ('running', _('执行中')),
+        ('completed', _('已完成')),
+        ('failed', _('失败')),
+    )
+    status = models.CharField(_('状态'), max_length=20, choices=STATUS_CHOICES, default='pending')
+    file_path = models.CharField(_('文件路径'), max_length=500, blank=True, default='')
+    row_count = models.IntegerField(_('导出行数'), default=0)
+    error_message = models.TextField(_('错误信息'), blank=True, null=True)
+    creator = models.ForeignKey(User, verbose_name=_('创建者'), on_delete=models.CASCADE, related_name='export_jobs')
+    created_at = models.DateTimeField(_('创建时间'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('更新时间'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('导出任务')
+        verbose_name_plural = _('导出任务')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_export_format_display()} - {self.get_status_display()}"
+
+
+
+class ImportJob(models.Model):
+    """
+    导入任务模型
+    
+    存储后台导入任务的上传文件、导入选项和执行进度
+    """
+    # 导入文件只在导入期间保留，任务结束后删除
+    file = models.FileField(_('导入文件'), upload_to='imports/', storage=get_private_storage)
+    project = models.ForeignKey(Project, verbose_name=_('所属项目'), on_delete=models.CASCADE, related_name='import_jobs')
+    MODE_CHOICES = (
+        ('atomic', _('全部成功或全部回滚')),
+        ('best_effort', _('跳过错误行继续导入')),
+        ('upsert', _('按内容去重，新增或更新')),
+    )
+    mode = models.CharField(_('导入模式'), max_length=20, choices=MODE_CHOICES, default='best_effort')
+    batch_size = models.PositiveIntegerField(_('批大小'), blank=True, null=True)
+    STATUS_CHOICES = (
+        ('pending', _('等待中')),
+        ('running', _('执行中')),
+        ('completed', _('已完成')),
+        ('failed', _('失败')),
+    )
+    status = models.CharField(_('状态'), max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_count = models.IntegerField(_('总行数'), blank=True, null=True)
+    processed_count = models.IntegerField(_('已处理行数'), default=0)
+    created_count = models.IntegerField(_('成功行数'), default=0)
+    updated_count = models.IntegerField(_('更新行数'), default=0)
+    skipped_count = models.IntegerField(_('跳过行数'), default=0)
+    failed_count = models.IntegerField(_('失败行数'), default=0)
+    errors = models.JSONField(_('错误明细'), default=list, blank=True)
+    error_message = models.TextField(_('错误信息'), blank=True, null=True)
+    creator = models.ForeignKey(User, verbose_name=_('创建者'), on_delete=models.CASCADE, related_name='import_jobs')
+    created_at = models.DateTimeField(_('创建时间'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('更新时间'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('导入任务')
+        verbose_name_plural = _('导入任务')
+        ordering = ['-created_at']
 
     def __str__(self):
-        return self.name 
\ No newline at end of file
+        return f"{self.project.name} - {self.get_status_display()}"
@@ -0,0 +1,306 @@
+"""
+测试用例全文检索模块
+
+根据数据库类型选择全文检索后端:
+- SQLite使用FTS5外部内容表和trigram分词，通过触发器与测试用例表同步
+- MySQL使用带ngram分词器的FULLTEXT索引，由InnoDB自动维护
+- 其他数据库或关键字过短时退回icontains查询
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import logging
+from django.conf import settings
+from django.db import connection as default_connection, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+logger = logging.getLogger(__name__)
+
+
+# 参与检索的字段
+SEARCH_FIELDS = ('name', 'description', 'steps', 'expected_results')
+
+# 退回icontains查询时各字段命中的权重
+FALLBACK_FIELD_WEIGHTS = {
+    'name': 3,
+    'description': 1,
+    'steps': 1,
+    'expected_results': 1,
+}
+
+# 相关度注解的名称
+SEARCH_RANK = 'search_rank'
+
+TESTCASE_TABLE = 'testcases_testcase'
+
+
+def split_terms(keyword):
+    """
+    把关键字拆分为检索词
+
+    Args:
+        keyword (str): 用户输入的关键字
+
+    Returns:
+        list: 去重后的检索词列表
+    """
+    terms = []
+    for term in (keyword or '').split():
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+class FallbackSearchBackend:
+    """
+    icontains检索后端
+
+    每个检索词需在任一字段中出现，按字段权重累加得到相关度
+    """
+    name = 'fallback'
+
+    # 检索词的最小长度，短于该长度时本后端也能处理
+    min_term_length = 1
+
+    def install(self, connection):
+        """
+        创建全文索引，本后端无需索引
+        """
+
+    def uninstall(self, connection):
+        """
+        删除全文索引，本后端无需索引
+        """
+
+    def search(self, queryset, terms):
+        """
+        检索测试用例
+
+        Args:
+            queryset: 测试用例查询集
+            terms (list): 检索词列表
+
+        Returns:
+            QuerySet: 过滤后并带有search_rank注解的查询集
+        """
+        rank = Value(0, output_field=IntegerField())
+        for term in terms:
+            condition = Q()
+            for field in SEARCH_FIELDS:
+                condition |= Q(**{f'{field}__icontains': term})
+                rank = rank + Case(
+                    When(**{f'{field}__icontains': term}, then=Value(FALLBACK_FIELD_WEIGHTS[field])),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            queryset = queryset.filter(condition)
+        return queryset.annotate(**{SEARCH_RANK: rank})
+
+
+class SqliteFtsSearchBackend(FallbackSearchBackend):
+    """
+    SQLite FTS5检索后端
+
+    FTS5外部内容表只保存倒排索引，通过测试用例表上的触发器保持同步；
+    trigram分词支持中文子串检索，检索词至少需要3个字符
+    """
+    name = 'sqlite_fts5'
+    min_term_length = 3
+    fts_table = 'testcases_testcase_fts'
+
+    def install(self, connection):
+        """
+        创建FTS5表和同步触发器
+
+        可重复执行；SQLite重建测试用例表时会丢失触发器，迁移完成后会再次调用以恢复
+
+        Args:
+            connection: 数据库连接
+        """
+        columns = ', '.join(SEARCH_FIELDS)
+        new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+        old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+        fts = self.fts_table
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [fts])
+            created = cursor.fetchone() is None
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, "
+                f"content='{TESTCASE_TABLE}', content_rowid='id', tokenize='trigram')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {TESTCASE_TABLE} BEGIN "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {TESTCASE_TABLE} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {TESTCASE_TABLE} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            if created:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def uninstall(self, connection):
+        """
+        删除FTS5表和同步触发器
+
+        Args:
+            connection: 数据库连接
+        """
+        fts = self.fts_table
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    def search(self, queryset, terms):
+        # 每个检索词作为短语加引号，多个检索词之间为AND关系
+        query = ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        fts = self.fts_table
+        if fts in queryset.query.extra_tables:
+            # 查询集已经关联过FTS5表时改用子查询，保留第一次检索的相关度
+            return queryset.extra(
+                where=[f'{TESTCASE_TABLE}.id IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)'],
+                params=[query],
+            )
+        return queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.rowid = {TESTCASE_TABLE}.id', f'{fts} MATCH %s'],
+            params=[query],
+            # FTS5的rank为bm25得分，越小越相关，取负值后按降序排列
+            select={SEARCH_RANK: f'-{fts}.rank'},
+        )
+
+
+class MysqlFulltextSearchBackend(FallbackSearchBackend):
+    """
+    MySQL FULLTEXT检索后端
+
+    使用ngram分词器建立FULLTEXT索引，检索词长度不能小于ngram_token_size(默认为2)
+    """
+    name = 'mysql_fulltext'
+    min_term_length = 2
+    index_name = 'testcase_fulltext_idx'
+
+    def install(self, connection):
+        """
+        创建FULLTEXT索引
+
+        Args:
+            connection: 数据库连接
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                [TESTCASE_TABLE, self.index_name]
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    f"ALTER TABLE {TESTCASE_TABLE} ADD FULLTEXT INDEX {self.index_name} "
+                    f"({', '.join(SEARCH_FIELDS)}) WITH PARSER ngram"
+                )
+
+    def uninstall(self, connection):
+        """
+        删除FULLTEXT索引
+
+        Args:
+            connection: 数据库连接
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                [TESTCASE_TABLE, self.index_name]
+            )
+            if cursor.fetchone() is not None:
+                cursor.execute(f"ALTER TABLE {TESTCASE_TABLE} DROP INDEX {self.index_name}")
+
+    def search(self, queryset, terms):
+        # 布尔模式下每个检索词作为必须出现的短语
+        query = ' '.join('+"{}"'.format(term.replace('"', ' ')) for term in terms)
+        match = f"MATCH ({', '.join(f'{TESTCASE_TABLE}.{field}' for field in SEARCH_FIELDS)}) AGAINST (%s IN BOOLEAN MODE)"
+        return queryset.extra(
+            where=[match],
+            params=[query],
+            select={SEARCH_RANK: match},
+            select_params=[query],
+        )
+
+
+SEARCH_BACKENDS = {
+    backend.name: backend
+    for backend in (FallbackSearchBackend(), SqliteFtsSearchBackend(), MysqlFulltextSearchBackend())
+}
+
+
+def get_search_backend(connection=None):
+    """
+    获取全文检索后端
+
+    可通过settings.TESTCASE_SEARCH_BACKEND指定后端名称，
+    未指定时根据数据库类型选择
+
+    Args:
+        connection: 数据库连接，默认为default连接
+
+    Returns:
+        FallbackSearchBackend: 检索后端
+    """
+    name = getattr(settings, 'TESTCASE_SEARCH_BACKEND', None)
+    if name:
+        return SEARCH_BACKENDS[name]
+
+    connection = connection or default_connection
+    if connection.vendor == 'sqlite':
+        return SEARCH_BACKENDS['sqlite_fts5']
+    if connection.vendor == 'mysql':
+        return SEARCH_BACKENDS['mysql_fulltext']
+    return SEARCH_BACKENDS['fallback']
+
+
+def search_testcases(queryset, keyword):
+    """
+    全文检索测试用例
+
+    检索词短于后端支持的最小长度时整体退回icontains查询
+
+    Args:
+        queryset: 测试用例查询集
+        keyword (str): 关键字，多个检索词用空格分隔
+
+    Returns:
+        QuerySet: 过滤后并带有search_rank注解的查询集
+    """
+    terms = split_terms(keyword)
+    if not terms:
+        return queryset
+
+    backend = get_search_backend()
+    if any(len(term) < backend.min_term_length for term in terms):
+        backend = SEARCH_BACKENDS['fallback']
+    return backend.search(queryset, terms)
+
+
+def install_search_index(using='default', **kwargs):
+    """
+    创建或修复全文索引
+
+    作为post_migrate信号处理函数使用，可重复执行
+
+    Args:
+        using (str): 数据库别名
+    """
+    connection = connections[using]
+    try:
+        get_search_backend(connection).install(connection)
+    except Exception as e:
+        logger.error(f"创建全文索引失败: {str(e)}")
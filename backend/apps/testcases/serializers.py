@@ -6,15 +6,18 @@
 最后修改: 2023-06-10
 """
 
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Project, TestCase
+from .models import Project, TestCase, ExportJob, ImportJob
+from .importers import IMPORT_MODE_CHOICES, IMPORT_MODE_BEST_EFFORT
+from utils.serializers import SparseFieldsetsMixin
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     项目序列化器
     
-    用于项目数据的序列化和反序列化
+    用于项目数据的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     creator_name = serializers.ReadOnlyField(source='creator.username')
     test_cases_count = serializers.SerializerMethodField()
@@ -24,6 +27,10 @@ class ProjectSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'status', 'creator', 'creator_name', 
                   'test_cases_count', 'created_at', 'updated_at']
         read_only_fields = ['creator', 'created_at', 'updated_at']
+        # 紧凑模式下返回的字段
+        compact_fields = ['id', 'name', 'status']
+        # 方法字段用到的模型字段，用例数量通过反向关联单独查询
+        field_sources = {'test_cases_count': ()}
     
     def get_test_cases_count(self, obj):
         """
@@ -52,11 +59,11 @@ class ProjectSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TestCaseSerializer(serializers.ModelSerializer):
+class TestCaseSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试用例序列化器
     
-    用于测试用例数据的序列化和反序列化
+    用于测试用例数据的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     creator_name = serializers.ReadOnlyField(source='creator.username')
     project_name = serializers.ReadOnlyField(source='project.name')
@@ -69,6 +76,8 @@ class TestCaseSerializer(serializers.ModelSerializer):
                   'status_display', 'steps', 'expected_results', 'project', 'project_name', 
                   'creator', 'creator_name', 'created_at', 'updated_at']
         read_only_fields = ['creator', 'created_at', 'updated_at']
+        # 紧凑模式下不返回描述、步骤和预期结果等大文本字段
+        compact_fields = ['id', 'name', 'priority', 'status', 'project', 'updated_at']
     
     def create(self, validated_data):
         """
@@ -85,7 +94,7 @@ class TestCaseSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TestCaseListSerializer(serializers.ModelSerializer):
+class TestCaseListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试用例列表序列化器
     
@@ -100,6 +109,28 @@ class TestCaseListSerializer(serializers.ModelSerializer):
         model = TestCase
         fields = ['id', 'name', 'priority', 'priority_display', 'status', 'status_display', 
                   'project', 'project_name', 'creator_name', 'created_at', 'updated_at']
+        # 紧凑模式下返回的字段
+        compact_fields = ['id', 'name', 'priority', 'status', 'project', 'updated_at']
+
+
+def validate_import_file(value):
+    """
+    验证导入文件格式
+    
+    Args:
+        value: 文件对象
+        
+    Returns:
+        FileField: 验证后的文件对象
+        
+    Raises:
+        serializers.ValidationError: 当文件格式不支持时抛出
+    """
+    # 获取文件扩展名
+    ext = value.name.split('.')[-1].lower()
+    if ext not in ['csv', 'xlsx', 'xls']:
+        raise serializers.ValidationError('仅支持CSV和Excel文件格式')
+    return value
 
 
 class TestCaseImportSerializer(serializers.Serializer):
@@ -110,6 +141,9 @@ class TestCaseImportSerializer(serializers.Serializer):
     """
     file = serializers.FileField(help_text='CSV或Excel文件')
     project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all(), help_text='项目ID')
+    mode = serializers.ChoiceField(choices=IMPORT_MODE_CHOICES, default=IMPORT_MODE_BEST_EFFORT, 
+                                   help_text='导入模式: atomic全部成功或全部回滚，best_effort跳过错误行，upsert按内容去重')
+    batch_size = serializers.IntegerField(required=False, min_value=1, max_value=10000, help_text='每批写入的行数')
     
     def validate_file(self, value):
         """
@@ -124,8 +158,83 @@ class TestCaseImportSerializer(serializers.Serializer):
         Raises:
             serializers.ValidationError: 当文件格式不支持时抛出
         """
-        # 获取文件扩展名
-        ext = value.name.split('.')[-1].lower()
-        if ext not in ['csv', 'xlsx', 'xls']:
-            raise serializers.ValidationError('仅支持CSV和Excel文件格式')
-        return value 
\ No newline at end of file
+        return validate_import_file(value)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """
+    导出任务序列化器
+    
+    用于后台导出任务状态的序列化，完成后附带下载链接
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'export_format', 'params', 'status', 'status_display', 'row_count', 
+                  'error_message', 'download_url', 'created_at', 'updated_at']
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        """
+        获取导出文件的下载链接
+        
+        Args:
+            obj: 导出任务对象
+            
+        Returns:
+            str: 下载链接，任务未完成或文件已过期删除时返回None
+        """
+        if obj.status != 'completed' or not obj.file_path:
+            return None
+        url = reverse('export-job-download', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    导入任务序列化器
+    
+    用于上传导入文件创建后台导入任务，以及查询导入进度
+    """
+    project_name = serializers.ReadOnlyField(source='project.name')
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    file = serializers.FileField(write_only=True, help_text='CSV或Excel文件')
+    batch_size = serializers.IntegerField(required=False, min_value=1, max_value=10000, help_text='每批写入的行数')
+    
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'file', 'project', 'project_name', 'mode', 'batch_size', 'status', 
+                  'status_display', 'total_count', 'processed_count', 'created_count', 
+                  'updated_count', 'skipped_count', 'failed_count', 'errors', 'error_message', 'created_at', 'updated_at']
+        read_only_fields = ['status', 'total_count', 'processed_count', 'created_count', 
+                            'updated_count', 'skipped_count', 'failed_count', 'errors', 'error_message', 'created_at', 'updated_at']
+    
+    def validate_file(self, value):
+        """
+        验证文件格式
+        
+        Args:
+            value: 文件对象
+            
+        Returns:
+            FileField: 验证后的文件对象
+        """
+        return validate_import_file(value)
+    
+    def create(self, validated_data):
+        """
+        创建导入任务
+        
+        Args:
+            validated_data: 验证后的数据
+            
+        Returns:
+            ImportJob: 创建的导入任务对象
+        """
+        # 设置创建者为当前用户
+        validated_data['creator'] = self.context['request'].user
+        return super().create(validated_data)
@@ -0,0 +1,62 @@
+"""
+测试用例信号处理模块
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from apps.users.models import User
+from .models import CONTENT_HASH_FIELDS, Project, TestCase, prepare_testcase_delete
+from .duplicates import index_cases
+
+
+@receiver(pre_delete, sender=Project)
+def record_project_tombstones(sender, instance, using, **kwargs):
+    """
+    删除项目前为其测试用例批量写入删除记录
+
+    项目删除在事务中执行，级联删除的测试用例不再逐行触发信号
+
+    Args:
+        sender: 模型类
+        instance: 被删除的项目
+        using: 数据库别名
+    """
+    prepare_testcase_delete(TestCase.objects.using(using).filter(project_id=instance.id))
+
+
+@receiver(pre_delete, sender=User)
+def record_user_tombstones(sender, instance, using, **kwargs):
+    """
+    删除用户前为其创建的测试用例批量写入删除记录
+
+    用户创建的项目会一起级联删除，其中的用例由项目的pre_delete处理，这里只处理其他项目中由该用户创建的用例
+
+    Args:
+        sender: 模型类
+        instance: 被删除的用户
+        using: 数据库别名
+    """
+    prepare_testcase_delete(
+        TestCase.objects.using(using).filter(creator_id=instance.id).exclude(project__creator_id=instance.id)
+    )
+
+
+@receiver(post_save, sender=TestCase)
+def update_testcase_signature(sender, instance, update_fields=None, **kwargs):
+    """
+    测试用例保存后更新MinHash签名和LSH桶
+
+    只更新了与内容无关的字段时跳过
+
+    Args:
+        sender: 模型类
+        instance: 保存的测试用例
+        update_fields: save时指定的字段
+    """
+    if update_fields is not None and not set(update_fields) & set(CONTENT_HASH_FIELDS + ('project',)):
+        return
+    index_cases([instance])
@@ -0,0 +1,259 @@
+"""
+测试用例异步任务模块
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import os
+import logging
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from .models import TestCase, ExportJob, ImportJob
+from .exporters import get_export_format
+from .filters import filter_testcases
+from .importers import IMPORT_MODE_ATOMIC, import_testcases
+from .duplicates import rebuild_index
+
+
+# 导入任务最多保存的错误明细条数
+IMPORT_JOB_MAX_ERRORS = 1000
+
+# 导出任务文件默认的保留时长(秒)，可通过settings.TESTCASE_EXPORT_JOB_EXPIRY配置
+DEFAULT_EXPORT_JOB_EXPIRY = 24 * 3600
+
+
+def get_exports_dir():
+    """
+    获取导出任务文件目录
+
+    目录位于PRIVATE_MEDIA_ROOT下，不能通过媒体文件URL直接访问，只能由导出任务的下载接口返回
+
+    Returns:
+        str: 目录路径
+    """
+    return os.path.join(settings.PRIVATE_MEDIA_ROOT, 'exports')
+
+
+def remove_export_file(file_path):
+    """
+    删除导出文件，文件不存在时忽略
+
+    Args:
+        file_path (str): 文件路径
+    """
+    if file_path:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+
+@shared_task
+def run_export_job(job_id):
+    """
+    异步执行测试用例导出任务
+
+    Args:
+        job_id: 导出任务ID
+
+    Returns:
+        dict: 操作结果
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"开始执行导出任务: job_id={job_id}")
+
+    job = ExportJob.objects.get(id=job_id)
+    job.status = 'running'
+    job.save(update_fields=['status', 'updated_at'])
+
+    file_path = None
+    try:
+        queryset = filter_testcases(TestCase.objects.all(), job.params)
+
+        # 创建导出目录
+        exports_dir = get_exports_dir()
+        os.makedirs(exports_dir, exist_ok=True)
+
+        export_format = get_export_format(job.export_format)
+        file_path = os.path.join(exports_dir, f"export_{job.id}_{timezone.now().strftime('%Y%m%d%H%M%S')}.{export_format.extension}")
+
+        if export_format.binary:
+            with open(file_path, 'wb') as f:
+                row_count = export_format.write(queryset, f)
+        else:
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                row_count = export_format.write(queryset, f)
+
+        job.status = 'completed'
+        job.file_path = file_path
+        job.row_count = row_count
+        job.save(update_fields=['status', 'file_path', 'row_count', 'updated_at'])
+
+        logger.info(f"导出任务完成: job_id={job_id}, row_count={row_count}")
+        return {
+            'status': 'success',
+            'job_id': job.id
+        }
+    except Exception as e:
+        logger.error(f"导出任务失败: job_id={job_id}, error={str(e)}")
+        # 删除写了一半的文件
+        remove_export_file(file_path)
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+
+
+@shared_task
+def cleanup_export_jobs(expiry=None):
+    """
+    删除过期的导出任务文件
+
+    完成时间早于保留时长的导出任务删除文件并清空文件路径，任务记录保留，
+    之后下载时返回文件不存在
+
+    Args:
+        expiry (int): 保留时长(秒)，默认为settings.TESTCASE_EXPORT_JOB_EXPIRY
+
+    Returns:
+        dict: 操作结果
+    """
+    logger = logging.getLogger(__name__)
+    if expiry is None:
+        expiry = getattr(settings, 'TESTCASE_EXPORT_JOB_EXPIRY', DEFAULT_EXPORT_JOB_EXPIRY)
+    expired_before = timezone.now() - timedelta(seconds=expiry)
+
+    count = 0
+    expired = ExportJob.objects.filter(updated_at__lt=expired_before).exclude(file_path='')
+    for job_id, file_path in list(expired.values_list('id', 'file_path')):
+        remove_export_file(file_path)
+        ExportJob.objects.filter(id=job_id).update(file_path='')
+        count += 1
+
+    if count:
+        logger.info(f"已删除过期的导出文件: count={count}")
+    return {
+        'status': 'success',
+        'count': count
+    }
+
+
+def remove_import_file(job):
+    """
+    删除导入任务的上传文件并清空文件字段
+
+    Args:
+        job (ImportJob): 导入任务
+    """
+    if not job.file:
+        return
+    try:
+        job.file.delete(save=False)
+    except OSError as e:
+        logging.getLogger(__name__).warning(f"删除导入文件失败: job_id={job.id}, error={str(e)}")
+    ImportJob.objects.filter(id=job.id).update(file='')
+
+
+@shared_task
+def run_import_job(job_id):
+    """
+    异步执行测试用例导入任务
+
+    每写入一批数据就更新一次任务进度，供前端轮询；任务结束后删除上传的文件
+
+    Args:
+        job_id: 导入任务ID
+
+    Returns:
+        dict: 操作结果
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"开始执行导入任务: job_id={job_id}")
+
+    job = ImportJob.objects.select_related('project', 'creator').get(id=job_id)
+    job.status = 'running'
+    job.save(update_fields=['status', 'updated_at'])
+
+    def update_progress(report):
+        ImportJob.objects.filter(id=job_id).update(
+            total_count=report.total_count,
+            processed_count=report.processed_count,
+            created_count=report.created_count,
+            updated_count=report.updated_count,
+            skipped_count=report.skipped_count,
+            failed_count=report.error_count,
+            updated_at=timezone.now()
+        )
+
+    try:
+        with job.file.open('rb') as f:
+            report = import_testcases(
+                f, job.project, job.creator,
+                mode=job.mode,
+                batch_size=job.batch_size,
+                progress=update_progress
+            )
+
+        result = report.to_dict()
+        job.total_count = report.total_count
+        job.processed_count = report.processed_count
+        job.created_count = report.created_count
+        job.updated_count = report.updated_count
+        job.skipped_count = report.skipped_count
+        job.failed_count = report.error_count
+        job.errors = result['error_details'][:IMPORT_JOB_MAX_ERRORS]
+        # 全部回滚模式下存在错误行时不写入任何数据，任务视为失败
+        job.status = 'failed' if job.mode == IMPORT_MODE_ATOMIC and report.error_count else 'completed'
+        job.save()
+
+        logger.info(f"导入任务完成: job_id={job_id}, created={report.created_count}, failed={report.error_count}")
+        return {
+            'status': 'success',
+            'job_id': job.id
+        }
+    except Exception as e:
+        logger.error(f"导入任务失败: job_id={job_id}, error={str(e)}")
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.save(update_fields=['status', 'error_message', 'updated_at'])
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+    finally:
+        # 导入结束后不再需要上传的文件
+        remove_import_file(job)
+
+
+@shared_task
+def rebuild_duplicate_index(project_id=None, missing_only=False):
+    """
+    重建测试用例的MinHash签名和LSH桶
+
+    用于为已有数据建立近似重复索引，或调整分段参数后重新计算；
+    部署时由manage.py rebuild_duplicate_index --missing为缺少签名的用例补建索引
+
+    Args:
+        project_id: 项目ID，为空时重建全部用例
+        missing_only (bool): 只处理还没有签名的用例
+
+    Returns:
+        dict: 操作结果
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"开始重建近似重复索引: project_id={project_id}, missing_only={missing_only}")
+
+    count = rebuild_index(project_id, missing_only=missing_only)
+
+    logger.info(f"近似重复索引重建完成: project_id={project_id}, count={count}")
+    return {
+        'status': 'success',
+        'count': count
+    }
@@ -8,14 +8,17 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet, TestCaseViewSet, export_testcases, simple_export
+from .views import ProjectViewSet, TestCaseViewSet, ExportJobViewSet, ImportJobViewSet, export_testcases, simple_export
 
 # 创建项目路由器 - 用于/api/projects/路径
 project_router = DefaultRouter()
 project_router.register(r'', ProjectViewSet, basename='project')
 
 # 创建测试用例路由器 - 用于/api/testcases/路径
+# 注意: 带前缀的视图集需先注册，否则会被测试用例详情路由匹配
 testcase_router = DefaultRouter()
+testcase_router.register(r'export-jobs', ExportJobViewSet, basename='export-job')
+testcase_router.register(r'import-jobs', ImportJobViewSet, basename='import-job')
 testcase_router.register(r'', TestCaseViewSet, basename='testcase')
 
 # 项目URL模式
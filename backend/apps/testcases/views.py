@@ -6,29 +6,46 @@
 最后修改: 2023-06-10
 """
 
-import csv
-import io
-import pandas as pd  # 启用pandas导入
-from django.http import HttpResponse, JsonResponse
-from django.db.models import Q
-from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action, api_view, permission_classes
+import os
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, mixins, status, filters
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from .models import Project, TestCase
+from .models import Project, TestCase, ExportJob, ImportJob
 from .serializers import (
     ProjectSerializer, 
     TestCaseSerializer, 
     TestCaseListSerializer,
-    TestCaseImportSerializer
+    TestCaseImportSerializer,
+    ExportJobSerializer,
+    ImportJobSerializer
 )
+from .exporters import (
+    ExportContentNegotiation, get_export_format,
+    export_delta, DELTA_DEFAULT_LIMIT, DELTA_MAX_LIMIT
+)
+from .duplicates import find_duplicate_clusters
+from .export_cache import cached_export_response
+from .facets import get_facets
+from .filters import TestCaseSearchFilter, filter_testcases, extract_filter_params
+from .importers import IMPORT_MODE_ATOMIC, IMPORT_MODE_UPSERT, import_testcases
+from .tasks import run_export_job, run_import_job
 from django.urls import get_resolver
+from utils.pagination import StandardResultsSetPagination
+from utils.serializers import SparseQuerysetMixin, iter_json_array
 from django.conf import settings
 from django.views.decorators.http import require_GET
 from django.views.decorators.csrf import csrf_exempt
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+# 测试用例列表支持的排序字段
+TESTCASE_ORDERING_FIELDS = ['name', 'priority', 'status', 'created_at', 'updated_at']
+
+
+class ProjectViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     项目视图集
     
@@ -57,11 +74,20 @@ class ProjectViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(status=status)
         return queryset
     
-    @action(detail=True, methods=['get'])
+    # 项目下测试用例列表的键集分页排序键
+    cursor_ordering = ('-created_at', '-id')
+    
+    @action(detail=True, methods=['get'], pagination_class=StandardResultsSetPagination,
+            ordering_fields=TESTCASE_ORDERING_FIELDS, ordering=['-created_at'])
     def test_cases(self, request, pk=None):
         """
         获取项目下的测试用例
         
+        支持与测试用例列表相同的status、priority、keyword、search和ordering参数，
+        默认分页返回，使用cursor参数或pagination=cursor时改用键集分页；
+        stream参数为1或true时不分页，以流式JSON数组按ID降序返回全部用例，
+        流式返回不支持ordering参数，检索时也不按相关度排序
+        
         Args:
             request: 请求对象
             pk: 项目ID
@@ -69,13 +95,37 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Returns:
             Response: 测试用例列表
         """
-        project = self.get_object()
-        test_cases = project.test_cases.all()
-        serializer = TestCaseListSerializer(test_cases, many=True)
-        return Response(serializer.data)
+        # 直接按主键查找项目，避免项目列表的搜索和状态过滤作用于用例的同名参数
+        project = get_object_or_404(Project, pk=pk)
+        self.check_object_permissions(request, project)
+        
+        stream = request.query_params.get('stream') in ['1', 'true']
+        if stream and request.query_params.get('ordering'):
+            return Response({
+                'message': '流式返回按ID降序排列，不支持ordering参数'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        params = request.query_params.copy()
+        params['project'] = project.id
+        queryset = filter_testcases(TestCase.objects.select_related('project', 'creator'), params)
+        for backend in (filters.OrderingFilter, TestCaseSearchFilter):
+            queryset = backend().filter_queryset(request, queryset, self)
+        
+        context = self.get_serializer_context()
+        queryset = self.sparse_queryset(queryset, TestCaseListSerializer(context=context))
+        
+        if stream:
+            return StreamingHttpResponse(
+                iter_json_array(queryset, TestCaseListSerializer, context),
+                content_type='application/json'
+            )
+        
+        page = self.paginate_queryset(queryset)
+        serializer = TestCaseListSerializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
 
-class TestCaseViewSet(viewsets.ModelViewSet):
+class TestCaseViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     测试用例视图集
     
@@ -84,9 +134,11 @@ class TestCaseViewSet(viewsets.ModelViewSet):
     queryset = TestCase.objects.all()
     serializer_class = TestCaseSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name', 'description', 'steps', 'expected_results']
-    ordering_fields = ['name', 'priority', 'status', 'created_at', 'updated_at']
+    pagination_class = StandardResultsSetPagination
+    # 键集分页的排序键，使用cursor参数或pagination=cursor时生效
+    cursor_ordering = ('-created_at', '-id')
+    filter_backends = [filters.OrderingFilter, TestCaseSearchFilter]
+    ordering_fields = TESTCASE_ORDERING_FIELDS
     ordering = ['-created_at']
     
     def get_serializer_class(self):
@@ -113,41 +165,16 @@ class TestCaseViewSet(viewsets.ModelViewSet):
         Returns:
             QuerySet: 过滤后的测试用例查询集
         """
-        queryset = super().get_queryset()
-        
-        # 项目过滤
-        project_id = self.request.query_params.get('project')
-        if project_id:
-            queryset = queryset.filter(project_id=project_id)
-        
-        # 状态过滤
-        status = self.request.query_params.get('status')
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        # 优先级过滤
-        priority = self.request.query_params.get('priority')
-        if priority:
-            queryset = queryset.filter(priority=priority)
-        
-        # 关键字搜索
-        keyword = self.request.query_params.get('keyword')
-        if keyword:
-            queryset = queryset.filter(
-                Q(name__icontains=keyword) | 
-                Q(description__icontains=keyword) | 
-                Q(steps__icontains=keyword) | 
-                Q(expected_results__icontains=keyword)
-            )
-        
-        return queryset
+        return filter_testcases(super().get_queryset(), self.request.query_params)
     
     @action(detail=False, methods=['post'], url_path='import')
     def import_cases(self, request):
         """
         导入测试用例
         
-        支持CSV和Excel格式的测试用例导入
+        支持CSV和Excel格式的测试用例导入，数据先整体校验再分批写入，
+        mode参数可选atomic(全部成功或全部回滚)、best_effort(跳过错误行)
+        或upsert(按内容哈希去重，新增或更新)
         
         Args:
             request: 请求对象
@@ -160,69 +187,38 @@ class TestCaseViewSet(viewsets.ModelViewSet):
         
         file = serializer.validated_data['file']
         project = serializer.validated_data['project']
-        
-        # 获取文件扩展名
-        ext = file.name.split('.')[-1].lower()
+        mode = serializer.validated_data['mode']
+        batch_size = serializer.validated_data.get('batch_size')
         
         try:
-            # 根据文件类型读取数据
-            if ext == 'csv':
-                # 读取CSV文件
-                csv_data = file.read().decode('utf-8')
-                reader = csv.DictReader(io.StringIO(csv_data))
-                rows = list(reader)
-            elif ext in ['xlsx', 'xls']:
-                # 读取Excel文件
-                df = pd.read_excel(file)
-                rows = df.to_dict('records')
-            else:
-                return Response({
-                    'message': '不支持的文件格式，请使用CSV或Excel格式',
-                    'errors': ['不支持的文件格式']
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # 导入测试用例
-            created_count = 0
-            error_count = 0
-            errors = []
-            
-            for row in rows:
-                try:
-                    # 创建测试用例
-                    TestCase.objects.create(
-                        name=row.get('name', ''),
-                        description=row.get('description', ''),
-                        priority=row.get('priority', 'P2'),
-                        status=row.get('status', 'draft'),
-                        steps=row.get('steps', ''),
-                        expected_results=row.get('expected_results', ''),
-                        project=project,
-                        creator=request.user
-                    )
-                    created_count += 1
-                except Exception as e:
-                    error_count += 1
-                    errors.append(f"行 {rows.index(row) + 2}: {str(e)}")
-            
-            return Response({
-                'message': f'导入完成，成功导入 {created_count} 条测试用例，失败 {error_count} 条',
-                'created_count': created_count,
-                'error_count': error_count,
-                'errors': errors
-            }, status=status.HTTP_201_CREATED)
-            
+            report = import_testcases(file, project, request.user, mode=mode, batch_size=batch_size)
         except Exception as e:
             return Response({
                 'message': f'导入失败: {str(e)}',
                 'errors': [str(e)]
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = report.to_dict()
+        
+        # 全部回滚模式下存在错误行时不写入任何数据
+        if mode == IMPORT_MODE_ATOMIC and report.error_count:
+            result['message'] = f'导入失败，共 {report.error_count} 行数据有误，未导入任何测试用例'
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        
+        if mode == IMPORT_MODE_UPSERT:
+            result['message'] = (f'导入完成，新增 {report.created_count} 条，更新 {report.updated_count} 条，'
+                                 f'跳过 {report.skipped_count} 条，失败 {report.error_count} 条')
+        else:
+            result['message'] = f'导入完成，成功导入 {report.created_count} 条测试用例，失败 {report.error_count} 条'
+        return Response(result, status=status.HTTP_201_CREATED)
     
-    @action(detail=False, methods=['get'], url_path='export', url_name='export', permission_classes=[AllowAny])
+    @action(detail=False, methods=['get'], url_path='export', url_name='export', permission_classes=[AllowAny],
+            content_negotiation_class=ExportContentNegotiation)
     def export_cases(self, request):
         """
         导出测试用例
         
-        支持CSV和Excel格式的测试用例导出
+        format参数指定导出格式，支持excel、csv、jsonl和parquet
         
         Args:
             request: 请求对象
@@ -234,84 +230,143 @@ class TestCaseViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
         
         # 获取导出格式，默认为excel
-        export_format = request.query_params.get('format', 'excel').lower()
-        
-        # 记录日志
-        print(f"导出测试用例，格式: {export_format}, 查询参数: {request.query_params}")
-        
-        # 准备导出数据
-        data = []
-        for case in queryset:
-            data.append({
-                'ID': case.id,
-                '用例名称': case.name,
-                '描述': case.description,
-                '优先级': case.get_priority_display(),
-                '状态': case.get_status_display(),
-                '测试步骤': case.steps,
-                '预期结果': case.expected_results,
-                '项目': case.project.name,
-                '创建者': case.creator.username,
-                '创建时间': case.created_at,
-                '更新时间': case.updated_at
-            })
-        
-        if export_format == 'csv':
-            # 创建CSV响应
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename="test_cases.csv"'
-            
-            # 写入CSV头
-            writer = csv.writer(response)
-            writer.writerow(['ID', '用例名称', '描述', '优先级', '状态', '测试步骤', '预期结果', '项目', '创建者', '创建时间', '更新时间'])
-            
-            # 写入测试用例数据
-            for case in queryset:
-                writer.writerow([
-                    case.id,
-                    case.name,
-                    case.description,
-                    case.get_priority_display(),
-                    case.get_status_display(),
-                    case.steps,
-                    case.expected_results,
-                    case.project.name,
-                    case.creator.username,
-                    case.created_at,
-                    case.updated_at
-                ])
-            
-            return response
-        else:
-            # 创建Excel响应
-            df = pd.DataFrame(data)
+        export_format = get_export_format(request.query_params.get('format'))
+        if export_format is None:
+            return Response({
+                'message': '不支持的导出格式'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 后台导出：提交任务后立即返回，完成后通过任务接口获取下载链接
+        if request.query_params.get('async') in ['1', 'true']:
+            if not request.user.is_authenticated:
+                return Response({
+                    'message': '后台导出需要登录'
+                }, status=status.HTTP_401_UNAUTHORIZED)
             
-            # 创建一个字节流
-            output = io.BytesIO()
+            job = ExportJob.objects.create(
+                export_format=export_format.name,
+                params=extract_filter_params(request.query_params),
+                creator=request.user
+            )
+            run_export_job.delay(job.id)
             
-            # 使用ExcelWriter写入Excel
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='测试用例', index=False)
-                
-                # 获取xlsxwriter工作簿和工作表对象
-                workbook = writer.book
-                worksheet = writer.sheets['测试用例']
-                
-                # 设置列宽
-                for i, col in enumerate(df.columns):
-                    # 设置列宽为标题长度和内容最大长度的1.2倍
-                    max_len = max(df[col].astype(str).map(len).max(), len(col)) * 1.2
-                    worksheet.set_column(i, i, max_len)
+            serializer = ExportJobSerializer(job, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+        
+        return cached_export_response(request, queryset, export_format)
+    
+    @action(detail=False, methods=['get'], url_path='export/delta', url_name='export-delta')
+    def export_delta(self, request):
+        """
+        增量导出测试用例
+        
+        返回cursor之后新增、修改和删除的测试用例，以及下一次请求使用的游标，
+        不带cursor时从头导出全部测试用例；
+        最近几秒(settings.TESTCASE_DELTA_SAFETY_WINDOW)内的修改暂不返回，下一次请求时再返回，
+        晚提交的事务不会被游标跳过
+        
+        Args:
+            request: 请求对象
             
-            # 设置响应头
-            output.seek(0)
-            response = HttpResponse(
-                output.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        Returns:
+            Response: 增量数据和下一页游标
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', DELTA_DEFAULT_LIMIT)), DELTA_MAX_LIMIT)
+        except ValueError:
+            limit = DELTA_DEFAULT_LIMIT
+        if limit < 1:
+            limit = DELTA_DEFAULT_LIMIT
+        
+        try:
+            result = export_delta(
+                self.get_queryset(),
+                cursor=request.query_params.get('cursor'),
+                limit=limit,
+                project_id=request.query_params.get('project')
             )
-            response['Content-Disposition'] = 'attachment; filename="test_cases.xlsx"'
+        except ValueError as e:
+            return Response({
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(result)
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        获取测试用例分面统计
+        
+        返回当前过滤条件下各状态、优先级和项目的用例数，用于列表页的筛选侧栏
+        
+        Args:
+            request: 请求对象
             
-            return response
+        Returns:
+            Response: 分面统计数据
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        params = extract_filter_params(request.query_params)
+        search = request.query_params.get('search')
+        if search:
+            params['search'] = search
+        
+        return Response(get_facets(queryset, params))
+    
+    @action(detail=False, methods=['get'])
+    def duplicates(self, request):
+        """
+        查找项目中的近似重复测试用例
+        
+        基于MinHash签名和LSH桶查找内容相似的用例，threshold参数指定相似度阈值(0到1)
+        
+        Args:
+            request: 请求对象
+            
+        Returns:
+            Response: 近似重复用例簇列表
+        """
+        project_id = request.query_params.get('project')
+        if not project_id:
+            return Response({
+                'message': '请指定项目'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            project_id = int(project_id)
+        except ValueError:
+            return Response({
+                'message': '项目ID必须是整数'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            threshold = float(request.query_params['threshold']) if request.query_params.get('threshold') else None
+        except ValueError:
+            threshold = -1
+        if threshold is not None and not 0 < threshold <= 1:
+            return Response({
+                'message': '相似度阈值必须在0到1之间'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        clusters = find_duplicate_clusters(project_id, threshold)
+        
+        case_ids = {case_id for cluster in clusters for case_id in cluster['case_ids']}
+        cases = {
+            case['id']: case
+            for case in TestCase.objects.filter(id__in=case_ids).values('id', 'name', 'priority', 'status')
+        }
+        
+        return Response({
+            'count': len(clusters),
+            'clusters': [
+                {
+                    'size': len(cluster['case_ids']),
+                    'min_similarity': cluster['min_similarity'],
+                    'cases': [cases[case_id] for case_id in cluster['case_ids'] if case_id in cases],
+                }
+                for cluster in clusters
+            ]
+        })
     
     @action(detail=False, methods=['get'], url_path='debug-urls', permission_classes=[AllowAny])
     def debug_urls(self, request):
@@ -340,189 +395,144 @@ class TestCaseViewSet(viewsets.ModelViewSet):
             'testcase_urls': testcase_urls
         })
 
-# 添加一个独立的视图函数来处理导出功能
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def export_testcases(request):
+class ExportJobViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    导出测试用例
+    导出任务视图集
     
-    支持CSV和Excel格式的测试用例导出
+    提供后台导出任务的状态查询和文件下载功能
+    """
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
     
-    Args:
-        request: 请求对象
+    def get_queryset(self):
+        """
+        获取查询集
         
-    Returns:
-        HttpResponse: 包含测试用例数据的文件
-    """
-    # 获取TestCase模型的所有实例
-    queryset = TestCase.objects.all()
+        普通用户只能查看自己创建的导出任务
+        
+        Returns:
+            QuerySet: 导出任务查询集
+        """
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(creator=self.request.user)
+        return queryset
     
-    # 获取导出格式，默认为excel
-    export_format = request.query_params.get('format', 'excel').lower()
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        下载导出文件
+        
+        Args:
+            request: 请求对象
+            pk: 导出任务ID
+            
+        Returns:
+            FileResponse: 文件响应
+        """
+        job = self.get_object()
+        
+        if job.status != 'completed' or not os.path.exists(job.file_path):
+            return Response({
+                'message': '导出文件不存在或任务尚未完成'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        filename = f'test_cases.{get_export_format(job.export_format).extension}'
+        return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=filename)
+
+
+class ImportJobViewSet(mixins.CreateModelMixin,
+                       mixins.RetrieveModelMixin,
+                       mixins.ListModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    导入任务视图集
     
-    # 记录日志
-    print(f"导出测试用例，格式: {export_format}, 查询参数: {request.query_params}")
+    上传文件后创建后台导入任务，并提供导入进度查询功能
+    """
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
     
-    # 准备导出数据
-    data = []
-    for case in queryset:
-        data.append({
-            'ID': case.id,
-            '用例名称': case.name,
-            '描述': case.description,
-            '优先级': case.get_priority_display(),
-            '状态': case.get_status_display(),
-            '测试步骤': case.steps,
-            '预期结果': case.expected_results,
-            '项目': case.project.name,
-            '创建者': case.creator.username,
-            '创建时间': case.created_at,
-            '更新时间': case.updated_at
-        })
+    def get_queryset(self):
+        """
+        获取查询集
+        
+        普通用户只能查看自己创建的导入任务
+        
+        Returns:
+            QuerySet: 导入任务查询集
+        """
+        queryset = super().get_queryset().select_related('project')
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(creator=self.request.user)
+        return queryset
     
-    if export_format == 'csv':
-        # 创建CSV响应
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="test_cases.csv"'
-        
-        # 写入CSV头
-        writer = csv.writer(response)
-        writer.writerow(['ID', '用例名称', '描述', '优先级', '状态', '测试步骤', '预期结果', '项目', '创建者', '创建时间', '更新时间'])
-        
-        # 写入测试用例数据
-        for item in data:
-            writer.writerow([
-                item['ID'],
-                item['用例名称'],
-                item['描述'],
-                item['优先级'],
-                item['状态'],
-                item['测试步骤'],
-                item['预期结果'],
-                item['项目'],
-                item['创建者'],
-                item['创建时间'],
-                item['更新时间']
-            ])
-        
-        return response
-    else:
-        # 创建Excel响应
-        df = pd.DataFrame(data)
-        
-        # 创建一个字节流
-        output = io.BytesIO()
-        
-        # 使用ExcelWriter写入Excel
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='测试用例', index=False)
+    def create(self, request, *args, **kwargs):
+        """
+        创建导入任务
+        
+        保存上传的文件并提交异步导入任务，立即返回任务信息
+        
+        Args:
+            request: 请求对象
             
-            # 获取xlsxwriter工作簿和工作表对象
-            workbook = writer.book
-            worksheet = writer.sheets['测试用例']
+        Returns:
+            Response: 导入任务信息
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        
+        run_import_job.delay(job.id)
+        
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class TestCaseExportView(APIView):
+    """
+    测试用例导出视图
+    
+    导出全部测试用例，format参数指定导出格式
+    """
+    permission_classes = [AllowAny]
+    content_negotiation_class = ExportContentNegotiation
+    
+    def get(self, request):
+        """
+        导出测试用例
+        
+        Args:
+            request: 请求对象
             
-            # 设置列宽
-            for i, col in enumerate(df.columns):
-                # 设置列宽为标题长度和内容最大长度的1.2倍
-                max_len = max(df[col].astype(str).map(len).max(), len(col)) * 1.2
-                worksheet.set_column(i, i, max_len)
-        
-        # 设置响应头
-        output.seek(0)
-        response = HttpResponse(
-            output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename="test_cases.xlsx"'
-        
-        return response
+        Returns:
+            HttpResponse: 包含测试用例数据的文件
+        """
+        export_format = get_export_format(request.query_params.get('format'))
+        if export_format is None:
+            return Response({
+                'message': '不支持的导出格式'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return cached_export_response(request, TestCase.objects.all(), export_format)
+
+
+export_testcases = TestCaseExportView.as_view()
+
 
 @require_GET
 @csrf_exempt
 def simple_export(request):
     """
     简单的导出视图函数
-    """
-    # 获取导出格式，默认为excel
-    export_format = request.GET.get('format', 'excel').lower()
-    
-    # 记录日志
-    print(f"简单导出测试用例，格式: {export_format}, 查询参数: {request.GET}")
-    
-    # 获取TestCase模型的所有实例
-    queryset = TestCase.objects.all()
     
-    # 准备导出数据
-    data = []
-    for case in queryset:
-        data.append({
-            'ID': case.id,
-            '用例名称': case.name,
-            '描述': case.description,
-            '优先级': case.get_priority_display(),
-            '状态': case.get_status_display(),
-            '测试步骤': case.steps,
-            '预期结果': case.expected_results,
-            '项目': case.project.name,
-            '创建者': case.creator.username,
-            '创建时间': case.created_at,
-            '更新时间': case.updated_at
-        })
+    不经过DRF认证和内容协商，导出全部测试用例
+    """
+    export_format = get_export_format(request.GET.get('format'))
+    if export_format is None:
+        return JsonResponse({
+            'message': '不支持的导出格式'
+        }, status=400)
     
-    if export_format == 'csv':
-        # 创建CSV响应
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="test_cases.csv"'
-        
-        # 写入CSV头
-        writer = csv.writer(response)
-        writer.writerow(['ID', '用例名称', '描述', '优先级', '状态', '测试步骤', '预期结果', '项目', '创建者', '创建时间', '更新时间'])
-        
-        # 写入测试用例数据
-        for item in data:
-            writer.writerow([
-                item['ID'],
-                item['用例名称'],
-                item['描述'],
-                item['优先级'],
-                item['状态'],
-                item['测试步骤'],
-                item['预期结果'],
-                item['项目'],
-                item['创建者'],
-                item['创建时间'],
-                item['更新时间']
-            ])
-        
-        return response
-    else:
-        # 创建Excel响应
-        df = pd.DataFrame(data)
-        
-        # 创建一个字节流
-        output = io.BytesIO()
-        
-        # 使用ExcelWriter写入Excel
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='测试用例', index=False)
-            
-            # 获取xlsxwriter工作簿和工作表对象
-            workbook = writer.book
-            worksheet = writer.sheets['测试用例']
-            
-            # 设置列宽
-            for i, col in enumerate(df.columns):
-                # 设置列宽为标题长度和内容最大长度的1.2倍
-                max_len = max(df[col].astype(str).map(len).max(), len(col)) * 1.2
-                worksheet.set_column(i, i, max_len)
-        
-        # 设置响应头
-        output.seek(0)
-        response = HttpResponse(
-            output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename="test_cases.xlsx"'
-        
-        return response 
\ No newline at end of file
+    return cached_export_response(request, TestCase.objects.all(), export_format)
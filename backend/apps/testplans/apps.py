@@ -16,4 +16,14 @@ class TestplansConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.testplans'
-    verbose_name = _('测试计划管理') 
\ No newline at end of file
+    verbose_name = _('测试计划管理')
+
+    def ready(self):
+        """
+        注册查询计划检查，登记列表计数会被缓存的模型
+        """
+        from utils.pagination import track_table_versions
+        from . import checks  # noqa: F401
+        from .models import TestPlan
+
+        track_table_versions(TestPlan)
@@ -0,0 +1,38 @@
+"""
+测试计划查询计划检查
+
+检查测试计划列表和计划用例读取等热点查询能否使用索引，
+执行manage.py check --database default时运行
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+from django.core import checks
+from utils.query_plan import check_query_plans
+
+
+def hot_queries():
+    """
+    测试计划的热点查询
+
+    Returns:
+        list: (名称, 查询集)元组列表
+    """
+    from .models import TestPlan, TestPlanCase
+
+    return [
+        ('按项目和状态过滤的计划列表',
+         TestPlan.objects.filter(project_id=1, status='in_progress').order_by('-created_at')),
+        ('按执行顺序读取计划中的用例',
+         TestPlanCase.objects.filter(plan_id=1).order_by('order')),
+    ]
+
+
+@checks.register(checks.Tags.database)
+def check_testplan_query_plans(app_configs=None, databases=None, **kwargs):
+    """
+    检查测试计划热点查询的执行计划
+    """
+    return check_query_plans(hot_queries, 'testplans.E001', databases)
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testplans', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testplan',
+            index=models.Index(fields=['project', 'status', 'created_at'], name='testplan_proj_stat_crt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testplancase',
+            index=models.Index(fields=['plan', 'order'], name='testplancase_plan_order_idx'),
+        ),
+    ]
@@ -40,6 +40,10 @@ class TestPlan(models.Model):
         verbose_name = _('测试计划')
         verbose_name_plural = _('测试计划')
         ordering = ['-created_at']
+        indexes = [
+            # 按项目和状态过滤测试计划并按创建时间排序
+            models.Index(fields=['project', 'status', 'created_at'], name='testplan_proj_stat_crt_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -60,6 +64,10 @@ class TestPlanCase(models.Model):
         verbose_name_plural = _('测试计划-用例关联')
         ordering = ['order']
         unique_together = ('plan', 'case')
+        indexes = [
+            # 按执行顺序读取计划中的用例
+            models.Index(fields=['plan', 'order'], name='testplancase_plan_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.plan.name} - {self.case.name}" 
\ No newline at end of file
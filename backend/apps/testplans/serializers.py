@@ -10,6 +10,7 @@ from rest_framework import serializers
 from .models import TestPlan, TestPlanCase
 from apps.testcases.models import TestCase
 from apps.testcases.serializers import TestCaseListSerializer
+from utils.serializers import SparseFieldsetsMixin
 
 
 class TestPlanCaseSerializer(serializers.ModelSerializer):
@@ -26,11 +27,11 @@ class TestPlanCaseSerializer(serializers.ModelSerializer):
         read_only_fields = ['plan']
 
 
-class TestPlanSerializer(serializers.ModelSerializer):
+class TestPlanSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     测试计划序列化器
     
-    用于测试计划数据的序列化和反序列化
+    用于测试计划数据的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     creator_name = serializers.ReadOnlyField(source='creator.username')
     project_name = serializers.ReadOnlyField(source='project.name')
@@ -43,6 +44,10 @@ class TestPlanSerializer(serializers.ModelSerializer):
                   'end_time', 'project', 'project_name', 'creator', 'creator_name', 
                   'test_cases_count', 'created_at', 'updated_at']
         read_only_fields = ['creator', 'created_at', 'updated_at']
+        # 紧凑模式下返回的字段
+        compact_fields = ['id', 'name', 'status', 'start_time', 'end_time', 'project']
+        # 方法字段用到的模型字段，用例数量通过关联表单独查询
+        field_sources = {'test_cases_count': ()}
     
     def get_test_cases_count(self, obj):
         """
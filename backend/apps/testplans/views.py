@@ -20,9 +20,10 @@ from .serializers import (
     TestCaseAddSerializer
 )
 from apps.testcases.models import TestCase
+from utils.serializers import SparseQuerysetMixin
 
 
-class TestPlanViewSet(viewsets.ModelViewSet):
+class TestPlanViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     测试计划视图集
     
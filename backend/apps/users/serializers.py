@@ -10,15 +10,16 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from utils.serializers import SparseFieldsetsMixin
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     用户序列化器
     
-    用于用户信息的序列化和反序列化
+    用于用户信息的序列化和反序列化，支持fields、omit和compact参数裁剪输出字段
     """
     class Meta:
         model = User
@@ -26,6 +27,8 @@ class UserSerializer(serializers.ModelSerializer):
                  'phone', 'department', 'position', 'avatar', 'is_active', 
                  'date_joined', 'created_at', 'updated_at']
         read_only_fields = ['id', 'date_joined', 'created_at', 'updated_at']
+        # 紧凑模式下返回的字段
+        compact_fields = ['id', 'username', 'first_name', 'last_name', 'department']
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -19,6 +19,7 @@ from .serializers import (
     ChangePasswordSerializer,
     CustomTokenObtainPairSerializer
 )
+from utils.serializers import SparseQuerysetMixin
 
 User = get_user_model()
 
@@ -43,7 +44,7 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     用户视图集
     
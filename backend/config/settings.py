@@ -116,6 +116,9 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# 不对外公开的文件目录，导出文件等只能通过接口鉴权后下载，不能放在MEDIA_ROOT下
+PRIVATE_MEDIA_ROOT = os.path.join(BASE_DIR, 'private_media')
+
 # 默认主键字段类型
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -134,6 +137,10 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# 分页计数策略: 查询计划估算行数超过阈值时使用缓存计数或估算值，缓存计数的有效期(秒)
+PAGINATION_EXACT_COUNT_THRESHOLD = 10000
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
 # JWT设置
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -161,6 +168,53 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# 设置环境变量CELERY_TASK_ALWAYS_EAGER=True时任务在当前进程同步执行，便于本地调试和测试
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+# 定时任务，需要运行celery beat
+CELERY_BEAT_SCHEDULE = {
+    # 按测试结果表修复测试执行上的结果计数
+    'reconcile-result-counters': {
+        'task': 'apps.executions.tasks.reconcile_result_counters',
+        'schedule': 3600,
+    },
+    # 删除过期的导出任务文件
+    'cleanup-export-jobs': {
+        'task': 'apps.testcases.tasks.cleanup_export_jobs',
+        'schedule': 3600,
+    },
+}
+
+# 测试用例导入每批写入的行数
+TESTCASE_IMPORT_BATCH_SIZE = 1000
+
+# 测试用例导出缓存目录和缓存总大小上限(字节)，超出后按最近访问时间淘汰
+TESTCASE_EXPORT_CACHE_DIR = os.path.join(PRIVATE_MEDIA_ROOT, 'export_cache')
+TESTCASE_EXPORT_CACHE_MAX_SIZE = 500 * 1024 * 1024
+
+# 后台导出任务生成的文件保留时长(秒)，过期后由定时任务删除
+TESTCASE_EXPORT_JOB_EXPIRY = 24 * 3600
+
+# 增量导出的安全窗口(秒)，只返回早于该窗口的修改，需大于最长事务时长与服务器时钟偏差之和
+TESTCASE_DELTA_SAFETY_WINDOW = 5
+
+# 测试用例全文检索后端，为None时根据数据库类型选择(sqlite_fts5、mysql_fulltext或fallback)
+TESTCASE_SEARCH_BACKEND = None
+
+# 导入测试用例时是否检查近似重复，以及判定为近似重复的相似度阈值
+TESTCASE_DUPLICATE_CHECK = True
+TESTCASE_DUPLICATE_THRESHOLD = 0.8
+
+# 测试用例分面统计的缓存有效期(秒)，用例或项目修改后缓存立即失效
+TESTCASE_FACETS_CACHE_TIMEOUT = 300
+
+# 创建测试执行时，计划中的用例数超过该值则由后台任务分批创建测试结果
+EXECUTION_RESULTS_ASYNC_THRESHOLD = 5000
+EXECUTION_RESULTS_BATCH_SIZE = 2000
+
+# 测试执行事件流的消息代理(local为进程内广播，多进程部署使用redis)、心跳间隔和单个连接的最长时长(秒)
+EXECUTION_EVENTS_BROKER = 'local'
+EXECUTION_EVENTS_HEARTBEAT = 15
+EXECUTION_EVENTS_MAX_DURATION = 300
 
 # Swagger设置
 SWAGGER_SETTINGS = {
@@ -34,6 +34,10 @@ CACHES = {
     }
 }
 
+# 测试执行事件流通过Redis发布订阅在各进程间分发
+EXECUTION_EVENTS_BROKER = 'redis'
+EXECUTION_EVENTS_REDIS_URL = REDIS_URL
+
 # Celery设置
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -49,6 +53,8 @@ STATIC_URL = '/static/'
 # 媒体文件设置
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+PRIVATE_MEDIA_ROOT = os.path.join(BASE_DIR, 'private_media')
+TESTCASE_EXPORT_CACHE_DIR = os.path.join(PRIVATE_MEDIA_ROOT, 'export_cache')
 
 # 日志设置
 LOGGING = {
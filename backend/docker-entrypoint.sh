@@ -11,6 +11,10 @@ echo "Database is ready!"
 echo "Applying database migrations..."
 python manage.py migrate
 
+# 为建立近似重复索引之前已有的测试用例补建签名，已建立索引的用例会被跳过
+echo "Indexing test cases for duplicate detection..."
+python manage.py rebuild_duplicate_index --missing
+
 # 创建超级用户（如果不存在）
 echo "Creating superuser..."
 python manage.py shell -c "
@@ -6,10 +6,483 @@
 最后修改: 2023-06-10
 """
 
-from rest_framework.pagination import PageNumberPagination
+import json
+import base64
+import hashlib
+import datetime
+import logging
+import threading
+from functools import partial
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, PageNotAnInteger, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class StandardResultsSetPagination(PageNumberPagination):
+logger = logging.getLogger(__name__)
+
+
+# 计数策略的默认配置，可通过settings.PAGINATION_EXACT_COUNT_THRESHOLD和
+# settings.PAGINATION_COUNT_CACHE_TIMEOUT配置
+DEFAULT_EXACT_COUNT_THRESHOLD = 10000
+DEFAULT_COUNT_CACHE_TIMEOUT = 60
+
+COUNT_CACHE_PREFIX = 'pagination_count'
+TABLE_VERSION_PREFIX = 'pagination_table_version'
+
+
+def get_table_version(table):
+    """
+    获取数据表的版本号
+
+    Args:
+        table (str): 表名
+
+    Returns:
+        int: 版本号，表中数据通过save或delete变化后递增
+    """
+    return cache.get_or_set(f'{TABLE_VERSION_PREFIX}:{table}', 1, None)
+
+
+def bump_table_version(sender, **kwargs):
+    """
+    数据变化后递增表版本号，使该表相关的缓存计数失效
+
+    只对通过track_table_versions登记的模型作为信号处理函数；
+    bulk_create和QuerySet.update不会触发信号，由调用方显式调用或由缓存过期时间兜底
+
+    Args:
+        sender: 模型类
+    """
+    key = f'{TABLE_VERSION_PREFIX}:{sender._meta.db_table}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def track_table_versions(*models, deletes=True):
+    """
+    登记列表计数会被缓存的模型
+
+    这些模型save后递增表版本号；其他模型的写入不访问缓存。
+    常被级联批量删除的模型应传入deletes=False，避免删除信号使级联删除逐行进行，
+    由删除路径自行调用一次bump_table_version
+
+    Args:
+        models: 模型类
+        deletes (bool): 是否同时在delete后递增表版本号
+    """
+    for model in models:
+        dispatch_uid = f'bump_table_version:{model._meta.label}'
+        post_save.connect(bump_table_version, sender=model, dispatch_uid=dispatch_uid)
+        if deletes:
+            post_delete.connect(bump_table_version, sender=model, dispatch_uid=dispatch_uid)
+
+
+def estimate_count(queryset):
+    """
+    从数据库查询计划中估算查询集的行数
+
+    MySQL取EXPLAIN中第一张表的rows乘以filtered，PostgreSQL取计划的Plan Rows，
+    其他数据库不支持估算
+
+    Args:
+        queryset: 查询集
+
+    Returns:
+        int: 估算的行数，不支持时返回None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor not in ('mysql', 'postgresql'):
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(f'EXPLAIN {sql}', params)
+                columns = [column[0] for column in cursor.description]
+                row = dict(zip(columns, cursor.fetchone()))
+                return int((row.get('rows') or 0) * float(row.get('filtered') or 100) / 100)
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f"估算行数失败: {str(e)}")
+        return None
+
+
+def refresh_count_cache(queryset, key, timeout):
+    """
+    在后台线程中执行精确计数并写入缓存
+
+    同一个缓存键同时只有一个线程在计数；在当前事务提交后启动，不阻塞本次请求的响应
+
+    Args:
+        queryset: 查询集
+        key (str): 计数缓存键
+        timeout (int): 缓存有效期(秒)
+    """
+    lock_key = f'{key}:refreshing'
+    if not cache.add(lock_key, 1, timeout):
+        return
+
+    def refresh():
+        try:
+            cache.set(key, queryset.count(), timeout)
+        except Exception as e:
+            logger.warning(f"后台计数失败: {str(e)}")
+        finally:
+            cache.delete(lock_key)
+            # 只关闭本线程打开的数据库连接
+            connections.close_all()
+
+    transaction.on_commit(
+        lambda: threading.Thread(target=refresh, name='pagination-count', daemon=True).start(),
+        using=queryset.db
+    )
+
+
+class CountStrategy:
+    """
+    分页计数策略
+
+    - 查询计划估算的行数不超过阈值时执行精确的COUNT(*)
+    - 超过阈值时优先使用缓存的精确计数，缓存键包含查询语句和相关表的版本号
+    - 没有缓存时返回查询计划的估算值并标记为近似值，同时在后台执行精确计数写入缓存，
+      之后相同过滤条件的请求直接使用缓存的计数
+    - 数据库不支持估算或请求指定count=exact时执行精确计数并写入缓存
+    """
+
+    def __init__(self, exact=False):
+        self.exact = exact
+        self.approximate = False
+
+    def get_cache_key(self, queryset):
+        """
+        计算缓存键
+
+        Args:
+            queryset: 查询集
+
+        Returns:
+            str: 缓存键
+        """
+        query = queryset.order_by().query
+        sql, params = query.sql_with_params()
+        tables = sorted({alias.table_name for alias in query.alias_map.values()})
+        payload = json.dumps([sql, [str(param) for param in params], [(table, get_table_version(table)) for table in tables]])
+        return f'{COUNT_CACHE_PREFIX}:{hashlib.sha1(payload.encode()).hexdigest()}'
+
+    def count(self, queryset):
+        """
+        获取查询集的行数
+
+        Args:
+            queryset: 查询集
+
+        Returns:
+            int: 行数，approximate属性标记是否为近似值
+        """
+        threshold = getattr(settings, 'PAGINATION_EXACT_COUNT_THRESHOLD', DEFAULT_EXACT_COUNT_THRESHOLD)
+        timeout = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', DEFAULT_COUNT_CACHE_TIMEOUT)
+
+        estimate = None if self.exact else estimate_count(queryset)
+        if estimate is not None and estimate <= threshold:
+            return queryset.count()
+
+        key = self.get_cache_key(queryset)
+        if not self.exact:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            if estimate is not None:
+                refresh_count_cache(queryset.all(), key, timeout)
+                self.approximate = True
+                return estimate
+
+        count = queryset.count()
+        cache.set(key, count, timeout)
+        return count
+
+
+class ApproximatePage(Page):
+    """
+    近似计数下的分页页面
+
+    是否有下一页由多读取的一行判断，不依赖近似的总页数
+    """
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class StrategyCountPaginator(Paginator):
+    """
+    使用计数策略的分页器
+
+    计数为近似值时不校验页码上限，也不按计数截断页面，
+    估算值偏小时仍可翻到实际存在的后续页，超出实际范围的页返回空列表
+    """
+
+    def __init__(self, object_list, per_page, count_strategy=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy or CountStrategy()
+
+    @property
+    def count(self):
+        if not hasattr(self, '_count'):
+            self._count = self.count_strategy.count(self.object_list)
+        return self._count
+
+    def validate_number(self, number):
+        # 先完成计数，计数策略才能确定是否为近似值
+        self.count
+        if not self.count_strategy.approximate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise InvalidPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_strategy.approximate:
+            return super().page(number)
+        # 多取一行判断是否还有下一页
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return ApproximatePage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+class KeysetPagination(BasePagination):
+    """
+    键集分页类
+
+    按(created_at, id)等排序键记录上一页最后一行的位置，下一页用
+    WHERE (created_at, id) < (上一页最后一行) 直接从索引定位，
+    不需要OFFSET和COUNT(*)，任意深度的翻页耗时都相同；只支持向后翻页。
+    视图可通过cursor_ordering属性指定排序键，最后一个字段必须唯一
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = '无效的游标'
+
+    def get_page_size(self, request):
+        """
+        获取每页数量
+
+        Args:
+            request: 请求对象
+
+        Returns:
+            int: 每页数量
+        """
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, view):
+        """
+        获取排序键
+
+        Args:
+            view: 视图对象
+
+        Returns:
+            tuple: 排序字段
+        """
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+    def encode_cursor(self, position):
+        """
+        编码游标
+
+        Args:
+            position (list): 最后一行的排序键取值
+
+        Returns:
+            str: URL安全的游标字符串
+        """
+        # 时间保留微秒精度，DjangoJSONEncoder会截断到毫秒导致同一毫秒内的行被跳过
+        position = [value.isoformat() if isinstance(value, (datetime.datetime, datetime.date)) else value
+                    for value in position]
+        return base64.urlsafe_b64encode(json.dumps(position, cls=DjangoJSONEncoder).encode()).decode()
+
+    def decode_cursor(self, request, ordering):
+        """
+        解码游标
+
+        Args:
+            request: 请求对象
+            ordering (tuple): 排序字段
+
+        Returns:
+            list: 排序键取值，请求中没有游标时返回None
+
+        Raises:
+            NotFound: 游标格式无效
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def build_filter(self, ordering, position):
+        """
+        构建位于游标之后的过滤条件
+
+        (a, b) < (x, y) 展开为 a < x OR (a = x AND b < y)
+
+        Args:
+            ordering (tuple): 排序字段
+            position (list): 游标中的排序键取值
+
+        Returns:
+            Q: 过滤条件
+        """
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = Q(**{ordering[j].lstrip('-'): position[j] for j in range(i)})
+            condition |= equal & Q(**{f'{name}__{lookup}': position[i]})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(view)
+        position = self.decode_cursor(request, ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.build_filter(ordering, position))
+            except (TypeError, ValueError, ValidationError) as e:
+                raise NotFound(self.invalid_cursor_message) from e
+
+        # 多取一行用于判断是否还有下一页
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        self.next_position = None
+        if self.has_next:
+            last = self.page[-1]
+            self.next_position = [getattr(last, field.lstrip('-')) for field in ordering]
+        return self.page
+
+    def get_next_link(self):
+        """
+        获取下一页链接
+
+        Returns:
+            str: 下一页链接，没有下一页时返回None
+        """
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        """
+        键集分页响应格式
+
+        Args:
+            data: 分页后的数据
+
+        Returns:
+            Response: 包含下一页链接的响应
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'page_size': self.page_size,
+            'results': data
+        })
+
+
+class CursorSwitchMixin:
+    """
+    分页方式切换混入类
+
+    请求中带有cursor参数或pagination=cursor时使用键集分页，否则使用页码分页
+    """
+    keyset_pagination_class = KeysetPagination
+    pagination_query_param = 'pagination'
+
+    def use_cursor(self, request):
+        """
+        判断是否使用键集分页
+
+        Args:
+            request: 请求对象
+
+        Returns:
+            bool: 是否使用键集分页
+        """
+        return (request.query_params.get(self.pagination_query_param) == 'cursor'
+                or self.keyset_pagination_class.cursor_query_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_cursor(request):
+            self.keyset = self.keyset_pagination_class()
+            self.keyset.page_size = self.page_size
+            self.keyset.max_page_size = self.max_page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class CountStrategyMixin:
+    """
+    分页计数策略混入类
+
+    页码分页使用CountStrategy计数，请求参数count=exact时强制精确计数
+    """
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_strategy = CountStrategy(exact=request.query_params.get(self.count_query_param) == 'exact')
+        self.django_paginator_class = partial(StrategyCountPaginator, count_strategy=self.count_strategy)
+        return super().paginate_queryset(queryset, request, view)
+
+
+class StandardResultsSetPagination(CursorSwitchMixin, CountStrategyMixin, PageNumberPagination):
     """
     标准分页类，提供默认分页功能
     """
@@ -27,8 +500,11 @@ class StandardResultsSetPagination(PageNumberPagination):
         Returns:
             Response: 包含分页信息的响应
         """
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response({
             'count': self.page.paginator.count,
+            'count_approximate': self.count_strategy.approximate,
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'current_page': self.page.number,
@@ -37,7 +513,7 @@ class StandardResultsSetPagination(PageNumberPagination):
             'results': data
         })
 
-class LargeResultsSetPagination(PageNumberPagination):
+class LargeResultsSetPagination(CursorSwitchMixin, CountStrategyMixin, PageNumberPagination):
     """
     大结果集分页类，用于需要显示更多数据的场景
     """
@@ -55,8 +531,11 @@ class LargeResultsSetPagination(PageNumberPagination):
         Returns:
             Response: 包含分页信息的响应
         """
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response({
             'count': self.page.paginator.count,
+            'count_approximate': self.count_strategy.approximate,
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'current_page': self.page.number,
@@ -65,7 +544,7 @@ class LargeResultsSetPagination(PageNumberPagination):
             'results': data
         })
 
-class SmallResultsSetPagination(PageNumberPagination):
+class SmallResultsSetPagination(CursorSwitchMixin, CountStrategyMixin, PageNumberPagination):
     """
     小结果集分页类，用于需要显示较少数据的场景
     """
@@ -83,8 +562,11 @@ class SmallResultsSetPagination(PageNumberPagination):
         Returns:
             Response: 包含分页信息的响应
         """
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response({
             'count': self.page.paginator.count,
+            'count_approximate': self.count_strategy.approximate,
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'current_page': self.page.number,
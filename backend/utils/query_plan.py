@@ -0,0 +1,124 @@
+"""
+查询计划检查模块
+
+对关键查询执行EXPLAIN，找出没有可用索引、只能全表扫描的查询，
+通过数据库系统检查(manage.py check --database default)报告
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import re
+from django.core import checks
+from django.db import connections
+
+
+def explain(queryset):
+    """
+    获取查询集的执行计划
+
+    Args:
+        queryset: 查询集
+
+    Returns:
+        list: 执行计划中的各行，每行为字典
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        elif connection.vendor == 'postgresql':
+            # 关闭顺序扫描后仍出现Seq Scan，说明没有可用的索引
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+        else:
+            cursor.execute(f'EXPLAIN {sql}', params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def find_full_scans(queryset):
+    """
+    找出执行计划中的全表扫描
+
+    - SQLite: 不带索引的SCAN(虚拟表除外)
+    - MySQL: type为ALL且possible_keys为空，数据量小时优化器可能放弃可用的索引，不视为问题
+    - PostgreSQL: 关闭顺序扫描后仍为Seq Scan
+
+    Args:
+        queryset: 查询集
+
+    Returns:
+        list: 全表扫描的描述，没有时返回空列表
+    """
+    vendor = connections[queryset.db].vendor
+    scans = []
+    for row in explain(queryset):
+        if vendor == 'sqlite':
+            detail = row.get('detail', '')
+            if re.match(r'SCAN (TABLE )?\w+$', detail):
+                scans.append(detail)
+        elif vendor == 'mysql':
+            if row.get('type') == 'ALL' and not row.get('possible_keys'):
+                scans.append(f"{row.get('table')}: type=ALL")
+        elif vendor == 'postgresql':
+            plan = next(iter(row.values()))
+            if 'Seq Scan' in plan:
+                scans.append(plan.strip())
+    return scans
+
+
+def get_query_tables(queryset):
+    """
+    获取查询集涉及的数据表
+
+    Args:
+        queryset: 查询集
+
+    Returns:
+        set: 表名集合
+    """
+    query = queryset.query
+    # 未编译的查询集alias_map为空，主表由模型得到
+    return {queryset.model._meta.db_table} | {alias.table_name for alias in query.alias_map.values()}
+
+
+def check_query_plans(queries, check_id, databases=None):
+    """
+    检查一组关键查询的执行计划
+
+    migrate首次建表前也会运行系统检查，涉及的表还不存在的查询直接跳过
+
+    Args:
+        queries: 返回(名称, 查询集)列表的函数，在检查时才调用以避免导入期访问数据库
+        check_id (str): 检查项ID，如testcases.E001
+        databases: 需要检查的数据库别名，未指定数据库时跳过检查
+
+    Returns:
+        list: 检查错误列表
+    """
+    errors = []
+    for database in databases or []:
+        table_names = set(connections[database].introspection.table_names())
+        for name, queryset in queries():
+            if not get_query_tables(queryset) <= table_names:
+                continue
+            try:
+                scans = find_full_scans(queryset.using(database))
+            except Exception as e:
+                errors.append(checks.Warning(
+                    f'无法获取查询计划: {name}',
+                    hint=str(e),
+                    id=check_id.replace('.E', '.W'),
+                ))
+                continue
+            if scans:
+                errors.append(checks.Error(
+                    f'查询发生全表扫描: {name}',
+                    hint='；'.join(scans),
+                    id=check_id,
+                ))
+    return errors
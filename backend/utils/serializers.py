@@ -0,0 +1,323 @@
+"""
+稀疏字段集模块
+
+支持通过查询参数裁剪序列化器的输出字段:
+- fields: 只返回指定的字段，多个字段用逗号分隔
+- omit: 不返回指定的字段
+- compact: 为1或true时只返回序列化器Meta.compact_fields中的字段
+
+视图集混入SparseQuerysetMixin后，列表和详情查询只读取输出字段用到的列，
+未输出的大文本字段不再从数据库取出
+
+作者: AiTestPlantForm团队
+创建日期: 2026-10-18
+最后修改: 2026-10-18
+"""
+
+import re
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+# 查询参数名称
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+COMPACT_PARAM = 'compact'
+
+# 流式输出时每批序列化的行数
+STREAM_CHUNK_SIZE = 1000
+
+# get_xxx_display方法对应的模型字段
+DISPLAY_METHOD_PATTERN = re.compile(r'^get_(\w+)_display$')
+
+
+def parse_field_names(value):
+    """
+    解析逗号分隔的字段名
+
+    Args:
+        value (str): 查询参数值
+
+    Returns:
+        list: 字段名列表
+    """
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def is_compact(request):
+    """
+    判断请求是否使用紧凑模式
+
+    Args:
+        request: 请求对象
+
+    Returns:
+        bool: 是否使用紧凑模式
+    """
+    return request.query_params.get(COMPACT_PARAM, '').lower() in ['1', 'true']
+
+
+def is_sparse_request(request):
+    """
+    判断请求是否指定了稀疏字段集
+
+    Args:
+        request: 请求对象
+
+    Returns:
+        bool: 是否指定了fields、omit或compact参数
+    """
+    params = request.query_params
+    return bool(parse_field_names(params.get(FIELDS_PARAM)) or parse_field_names(params.get(OMIT_PARAM))
+                or is_compact(request))
+
+
+class SparseFieldsetsMixin:
+    """
+    稀疏字段集序列化器混入类
+
+    只对直接用于响应的序列化器生效，嵌套的序列化器保持完整；
+    被裁剪的字段标记为只写，不影响写入时的数据校验
+
+    序列化器Meta中可声明:
+    - compact_fields: 紧凑模式下返回的字段
+    - field_sources: SerializerMethodField等无法自动推断的字段所用的模型字段路径，
+      未声明的字段输出时会读取完整的行
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or not self.is_root():
+            return fields
+
+        selected = self.get_selected_field_names(request, fields)
+        for name, field in fields.items():
+            if name not in selected:
+                field.write_only = True
+        return fields
+
+    def is_root(self):
+        """
+        判断是否为直接用于响应的序列化器
+
+        Returns:
+            bool: 未嵌套在其他序列化器中时返回True
+        """
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_selected_field_names(self, request, fields):
+        """
+        计算需要输出的字段
+
+        Args:
+            request: 请求对象
+            fields (dict): 序列化器的全部字段
+
+        Returns:
+            set: 需要输出的字段名
+        """
+        selected = set(fields)
+        if is_compact(request):
+            selected &= set(getattr(self.Meta, 'compact_fields', fields))
+
+        requested = parse_field_names(request.query_params.get(FIELDS_PARAM))
+        if requested:
+            selected &= set(requested)
+
+        selected -= set(parse_field_names(request.query_params.get(OMIT_PARAM)))
+        return selected
+
+
+def resolve_source(model, attrs):
+    """
+    把字段的source属性转换为模型字段路径
+
+    Args:
+        model: 模型类
+        attrs (list): 字段的source_attrs
+
+    Returns:
+        tuple: (字段路径, 需要关联查询的外键路径列表, 最后一级的模型字段)，
+            无法转换时返回(None, None, None)
+    """
+    path = []
+    relations = []
+    for index, attr in enumerate(attrs):
+        match = DISPLAY_METHOD_PATTERN.match(attr)
+        if match and index == len(attrs) - 1:
+            attr = match.group(1)
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            if attr == 'pk':
+                model_field = model._meta.pk
+            else:
+                return None, None, None
+        if model_field.many_to_many or model_field.one_to_many or not model_field.concrete:
+            return None, None, None
+
+        path.append(model_field.name)
+        if model_field.is_relation and index < len(attrs) - 1:
+            relations.append('__'.join(path))
+            model = model_field.related_model
+    return '__'.join(path), relations, model_field
+
+
+def get_queryset_fields(serializer, model, prefix=''):
+    """
+    计算序列化器输出字段需要读取的模型字段
+
+    Args:
+        serializer: 序列化器实例
+        model: 序列化器对应的模型类
+        prefix (str): 嵌套序列化器的字段路径前缀
+
+    Returns:
+        tuple: (字段路径集合, 关联查询路径集合)，存在无法推断的字段时返回(None, None)
+    """
+    meta = getattr(serializer, 'Meta', None)
+    field_sources = getattr(meta, 'field_sources', {})
+    paths = {f'{prefix}{model._meta.pk.name}'}
+    relations = set()
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in field_sources:
+            for source in field_sources[name]:
+                paths.add(f'{prefix}{source}')
+                if '__' in source:
+                    relations.add(f"{prefix}{source.rsplit('__', 1)[0]}")
+            continue
+        if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+            return None, None
+
+        path, field_relations, model_field = resolve_source(model, field.source_attrs)
+        if path is None:
+            return None, None
+
+        if isinstance(field, serializers.BaseSerializer):
+            if isinstance(field, serializers.ListSerializer) or not model_field.is_relation:
+                return None, None
+            nested_paths, nested_relations = get_queryset_fields(
+                field, model_field.related_model, f'{prefix}{path}__'
+            )
+            if nested_paths is None:
+                return None, None
+            paths.add(f'{prefix}{path}')
+            paths.update(nested_paths)
+            relations.add(f'{prefix}{path}')
+            relations.update(nested_relations)
+            continue
+
+        paths.add(f'{prefix}{path}')
+        relations.update(f'{prefix}{relation}' for relation in field_relations)
+
+    # 关联查询的外键本身也必须读取
+    paths.update(relations)
+    return paths, relations
+
+
+def normalize_relations(relations):
+    """
+    展开关联路径的各级前缀
+
+    select_related('a__b')与only('a__b__c')搭配时，a本身也需要在only中
+
+    Args:
+        relations (set): 关联查询路径
+
+    Returns:
+        set: 包含各级前缀的关联路径
+    """
+    expanded = set()
+    for relation in relations:
+        parts = relation.split('__')
+        expanded.update('__'.join(parts[:index]) for index in range(1, len(parts) + 1))
+    return expanded
+
+
+class SparseQuerysetMixin:
+    """
+    稀疏字段集视图集混入类
+
+    GET请求的列表和详情操作中，按序列化器实际输出的字段对查询集应用
+    select_related()和only()；请求未指定稀疏字段集、或输出字段无法推断时查询集保持不变
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.request
+        if request is None or request.method != 'GET' or self.action not in self.sparse_actions:
+            return queryset
+        return self.sparse_queryset(queryset, self.get_serializer())
+
+    def sparse_queryset(self, queryset, serializer):
+        """
+        按序列化器的输出字段裁剪查询集
+
+        Args:
+            queryset: 查询集
+            serializer: 带有请求上下文的序列化器实例
+
+        Returns:
+            QuerySet: 应用select_related()和only()后的查询集
+        """
+        if not is_sparse_request(self.request):
+            return queryset
+
+        paths, relations = get_queryset_fields(serializer, queryset.model)
+        if paths is None:
+            return queryset
+
+        # 键集分页需要读取排序字段生成游标
+        paths.update(field.lstrip('-') for field in getattr(self, 'cursor_ordering', ()))
+        relations = normalize_relations(relations)
+        paths.update(relations)
+        # 已有的关联查询可能包含未输出的外键，与only()同时使用会报错，改为只关联需要的外键
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*sorted(paths))
+
+
+def iter_json_array(queryset, serializer_class, context=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    分批序列化查询集并逐段生成JSON数组
+
+    按主键降序使用键集条件逐批读取，内存占用只与批大小有关，
+    适合配合StreamingHttpResponse返回全部数据；查询集原有的排序会被替换为主键降序
+
+    Args:
+        queryset: 查询集
+        serializer_class: 序列化器类
+        context (dict): 序列化器上下文
+        chunk_size (int): 每批读取的行数
+
+    Yields:
+        str: JSON数组的片段
+    """
+    queryset = queryset.order_by('-pk')
+    encoder = JSONEncoder(ensure_ascii=False)
+    last_pk = None
+    first = True
+
+    yield '['
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__lt=last_pk)
+        rows = list(batch[:chunk_size])
+        if not rows:
+            break
+        data = serializer_class(rows, many=True, context=context).data
+        chunk = ','.join(encoder.encode(item) for item in data)
+        yield chunk if first else f',{chunk}'
+        first = False
+        if len(rows) < chunk_size:
+            break
+        last_pk = rows[-1].pk
+    yield ']'